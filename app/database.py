@@ -2,14 +2,18 @@ import os
 import oracledb
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-# .env 불러오기
+# .env 불러오기 (db_config가 import 시점에 풀 설정을 읽으므로 그보다 먼저)
 load_dotenv()
 
-# Oracle Instant Client 초기화
-instant_client_path = r"C:\Users\4Class_14\instantclient_23_9"
-if os.path.exists(instant_client_path):
+from app import db_config  # noqa: E402
+
+# Oracle Instant Client 초기화 (thick 모드, ORACLE_THICK_MODE=1 일 때만)
+# - 비동기 세션(get_async_db)은 oracledb thin 모드에서만 동작하므로 기본은 thin 모드
+instant_client_path = os.getenv("ORACLE_CLIENT_LIB_DIR", r"C:\Users\4Class_14\instantclient_23_9")
+if os.getenv("ORACLE_THICK_MODE") == "1" and os.path.exists(instant_client_path):
     oracledb.init_oracle_client(lib_dir=instant_client_path)
 
 # 환경 변수 불러오기
@@ -23,12 +27,30 @@ DB_SERVICE = os.getenv("ORACLE_SERVICE")
 DATABASE_URL = (
     f"oracle+oracledb://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/?service_name={DB_SERVICE}"
 )
+ASYNC_DATABASE_URL = (
+    f"oracle+oracledb_async://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/?service_name={DB_SERVICE}"
+)
 
-# 엔진 및 세션 설정
-engine = create_engine(DATABASE_URL, echo=True, pool_pre_ping=True)
+# 엔진 및 세션 설정 (풀 크기/타임아웃/로그 등은 app/db_config.py의 환경 변수로)
+session_pool = (
+    db_config.create_session_pool(DB_USER, DB_PASS, f"{DB_HOST}:{DB_PORT}/{DB_SERVICE}")
+    if db_config.USE_SESSION_POOL else None
+)
+engine = create_engine(DATABASE_URL, **db_config.engine_options(session_pool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# async 라우트용 엔진/세션 (DB 대기 중에도 이벤트 루프를 막지 않음)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **db_config.async_engine_options())
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+def pool_stats() -> dict:
+    """동기/비동기 엔진의 현재 연결 풀 상태"""
+    return {
+        "sync": db_config.pool_stats(engine.pool, session_pool),
+        "async": db_config.pool_stats(async_engine.sync_engine.pool),
+    }
+
 # DB 세션 종속성
 def get_db():
     db = SessionLocal()
@@ -36,3 +58,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# async 라우트용 DB 세션 종속성
+# - 동기 헬퍼(Session을 받는 함수)는 await db.run_sync(func, ...)로 호출
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
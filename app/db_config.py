@@ -0,0 +1,178 @@
+# app/db_config.py
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# ------------------------------
+# 환경 변수 설정
+# ------------------------------
+POOL_SIZE = _env_int("DB_POOL_SIZE", 10)                # 항상 유지하는 연결 수
+MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)          # POOL_SIZE 초과로 잠깐 더 여는 연결 수
+POOL_TIMEOUT = _env_float("DB_POOL_TIMEOUT", 30)        # 연결이 모두 사용 중일 때 기다리는 최대 시간 (초)
+POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)        # 이 시간(초)보다 오래된 연결은 새로 연결 (-1: 사용 안 함)
+POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", False)    # 체크아웃마다 ping (왕복 1번 추가)
+STMT_CACHE_SIZE = _env_int("DB_STMT_CACHE_SIZE", 50)    # 연결별 oracledb 문장 캐시 크기
+ECHO = _env_bool("DB_ECHO", False)                      # SQL을 stdout으로 출력 (개발용)
+LOG_LEVEL = os.getenv("DB_LOG_LEVEL", "WARNING").upper()
+
+# oracledb 세션 풀 사용 (SQLAlchemy 풀 대신 드라이버 풀, 동기 엔진만)
+USE_SESSION_POOL = _env_bool("DB_USE_SESSION_POOL", False)
+SESSION_POOL_MIN = _env_int("DB_SESSION_POOL_MIN", 2)
+SESSION_POOL_INCREMENT = _env_int("DB_SESSION_POOL_INCREMENT", 1)
+
+logging.getLogger("sqlalchemy.engine").setLevel(LOG_LEVEL)
+
+
+# ------------------------------
+# 풀 지표
+# ------------------------------
+class PoolMetrics:
+    """연결 체크아웃 대기 시간 / 시간 초과 횟수 누적"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+
+class _MeteredPoolMixin:
+    """_do_get(풀에서 연결 꺼내기)에 걸린 시간을 기록"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - start)
+        return conn
+
+
+class MeteredQueuePool(_MeteredPoolMixin, QueuePool):
+    pass
+
+
+class MeteredAsyncQueuePool(_MeteredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+# ------------------------------
+# 엔진 옵션
+# ------------------------------
+def _queue_pool_options() -> dict:
+    return dict(
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        pool_recycle=POOL_RECYCLE,
+        pool_pre_ping=POOL_PRE_PING,
+    )
+
+
+def create_session_pool(user: str, password: str, dsn: str):
+    """oracledb 세션 풀 (USE_SESSION_POOL일 때 동기 엔진의 creator로 사용)"""
+    import oracledb
+
+    return oracledb.create_pool(
+        user=user,
+        password=password,
+        dsn=dsn,
+        min=SESSION_POOL_MIN,
+        max=POOL_SIZE + MAX_OVERFLOW,
+        increment=SESSION_POOL_INCREMENT,
+        stmtcachesize=STMT_CACHE_SIZE,
+        getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+        wait_timeout=int(POOL_TIMEOUT * 1000),
+    )
+
+
+def engine_options(session_pool=None) -> dict:
+    """동기 create_engine 인자"""
+    if session_pool is not None:
+        # 연결 재사용은 oracledb 풀이 맡고 SQLAlchemy는 매번 acquire/release만
+        return dict(echo=ECHO, creator=session_pool.acquire, poolclass=NullPool)
+    return dict(
+        echo=ECHO,
+        poolclass=MeteredQueuePool,
+        connect_args={"stmtcachesize": STMT_CACHE_SIZE},
+        **_queue_pool_options()
+    )
+
+
+def async_engine_options() -> dict:
+    """create_async_engine 인자"""
+    return dict(
+        echo=ECHO,
+        poolclass=MeteredAsyncQueuePool,
+        connect_args={"stmtcachesize": STMT_CACHE_SIZE},
+        **_queue_pool_options()
+    )
+
+
+def pool_stats(pool, session_pool=None) -> dict:
+    """현재 풀 상태 (사용 중 / 초과 연결 수 / 대기 시간)"""
+    if session_pool is not None:
+        return {
+            "type": "oracledb",
+            "opened": session_pool.opened,
+            "checked_out": session_pool.busy,
+            "max": session_pool.max,
+        }
+    stats = {
+        "type": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": MAX_OVERFLOW,
+        "timeout": POOL_TIMEOUT,
+    }
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.snapshot())
+    return stats
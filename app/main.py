@@ -1,7 +1,17 @@
-from fastapi import FastAPI
+import os
+import secrets
+
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import Base, engine
+from app.database import Base, engine, async_engine, pool_stats
+from app.migrations import run_migrations
 from app.routers import auth, folders, categories, files, download
+from app.utils.extractor import extractor_dispatcher
+from app.utils.classifier import classification_worker
+from app.utils.folder_stats import stats_reconciler
+from app.utils.session_cache import session_cache
+from app.utils.security import password_hasher
+from app.utils.storage import blob_sweeper
 
 #  1. FastAPI 앱 생성
 app = FastAPI()
@@ -15,8 +25,9 @@ app.add_middleware(
     allow_headers=["*"],    # 모든 헤더 허용
 )
 
-#  3. DB 테이블 생성
+#  3. DB 테이블 생성 + 기존 테이블 마이그레이션 (컬럼/인덱스 추가)
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 
 #  4. 라우터 등록
 app.include_router(auth.router)
@@ -25,7 +36,40 @@ app.include_router(categories.router)
 app.include_router(files.router)
 app.include_router(download.router)
 
-#  5. 테스트용 루트 엔드포인트
+#  5. 백그라운드 작업 (extractor 전송, 분류 작업 전송, 폴더 통계 보정, last_work 반영, 고아 blob 정리, 비밀번호 해시 풀)
+@app.on_event("startup")
+async def start_background_workers():
+    await password_hasher.start()
+    await extractor_dispatcher.start()
+    await classification_worker.start()
+    await stats_reconciler.start()
+    await session_cache.start()
+    await blob_sweeper.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    await blob_sweeper.stop()
+    await session_cache.stop()
+    await stats_reconciler.stop()
+    await classification_worker.stop()
+    await extractor_dispatcher.stop()
+    await async_engine.dispose()
+    password_hasher.shutdown()
+
+#  6. 테스트용 루트 엔드포인트
 @app.get("/")
 def root():
     return {"message": "Backend Running"}
+
+#  7. DB 연결 풀 상태 (풀 크기 조정용, DB_POOL_STATS_TOKEN이 설정된 경우에만 X-Admin-Token으로 조회)
+DB_POOL_STATS_TOKEN = os.getenv("DB_POOL_STATS_TOKEN", "")
+
+
+@app.get("/db/pool", include_in_schema=False)
+def get_pool_stats(x_admin_token: str = Header(default="")):
+    if not DB_POOL_STATS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(x_admin_token.encode(), DB_POOL_STATS_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="관리자 토큰이 올바르지 않습니다.")
+    return pool_stats()
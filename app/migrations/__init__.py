@@ -0,0 +1,46 @@
+# app/migrations/__init__.py
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.migrations.steps import STEPS, sync_missing_columns
+
+
+def applied_versions(conn) -> set:
+    rows = conn.execute(text("SELECT VERSION FROM SCHEMA_VERSION")).all()
+    return {version for (version,) in rows}
+
+
+def run_migrations(engine: Engine):
+    """
+    모델과 기존 테이블의 차이를 맞춘 뒤 SCHEMA_VERSION에 없는 단계만 순서대로 적용
+    - create_all 이후에 호출 (create_all은 이미 있는 테이블에 컬럼/인덱스를 추가하지 않음)
+    - 빠진 컬럼(sync_missing_columns)은 매 시작 시 맞추므로 어느 커밋을 배포해도 안전
+    - MAX(PK)보다 뒤처진 시퀀스는 한 번만 실행되는 단계(v6)에서 맞춤
+      (매 시작마다 NEXTVAL/ALTER SEQUENCE를 하지 않도록)
+    - 각 단계는 이미 적용된 상태여도 안전하게 다시 실행될 수 있어야 함
+      (Oracle DDL은 자동 commit이라 여러 워커가 동시에 시작해도 잠금으로 막을 수 없음)
+    """
+    from app.database import Base
+
+    with engine.connect() as conn:
+        sync_missing_columns(conn, Base.metadata)
+        done = applied_versions(conn)
+
+    for version, description, step in STEPS:
+        if version in done:
+            continue
+        with engine.connect() as conn:
+            step(conn)
+            try:
+                conn.execute(
+                    text("INSERT INTO SCHEMA_VERSION (VERSION, DESCRIPTION, APPLIED_AT) "
+                         "VALUES (:v, :d, :t)"),
+                    {"v": version, "d": description, "t": datetime.now()}
+                )
+                conn.commit()
+            except Exception:
+                # 다른 워커가 먼저 기록함
+                conn.rollback()
+        print(f"[DB 마이그레이션] {version}: {description}")
@@ -0,0 +1,117 @@
+# app/migrations/check_plans.py
+"""
+주요 라우트 쿼리의 실행 계획이 인덱스를 타는지 확인
+
+    python -m app.migrations.check_plans [folder_id] [user_id]
+
+각 쿼리가 의도한 인덱스를 쓰지 않거나, 인덱스 순서로 읽어야 하는 페이지 쿼리에
+SORT ORDER BY가 있으면 종료 코드 1
+(데이터가 아주 적으면 옵티마이저가 full scan을 고를 수 있으므로 통계 수집 후 실행할 것)
+"""
+import sys
+import uuid
+
+from sqlalchemy import text
+
+from app.database import SessionLocal, engine
+from app.models import File, Folder
+
+
+def hot_queries(db, folder_id: int, user_id: int):
+    """
+    (이름, 쿼리, 써야 하는 인덱스, 정렬 없이 인덱스 순서로 읽어야 하는지)
+    - 라우트에서 쓰는 조건/정렬 그대로
+    """
+    return [
+        (
+            "files.get_folder_files (폴더별 목록, 최신순 페이지)",
+            db.query(File.file_id, File.file_name, File.uploaded_at)
+            .filter(File.folder_id == folder_id, File.uploaded_at != None)
+            .order_by(File.uploaded_at.desc(), File.file_id.desc())
+            .limit(101),
+            "IX_FILES_FOLDER_UPLOADED",
+            True,
+        ),
+        (
+            "categories.get_files_by_category (폴더 + 카테고리, 최신순 페이지)",
+            db.query(File.file_id, File.file_name, File.uploaded_at)
+            .filter(File.folder_id == folder_id, File.category == "sample", File.uploaded_at != None)
+            .order_by(File.uploaded_at.desc(), File.file_id.desc())
+            .limit(101),
+            "IX_FILES_FOLDER_CAT_UPLOADED",
+            True,
+        ),
+        (
+            "files.get_folder_files (폴더별 목록, 시각 없는 파일 페이지)",
+            db.query(File.file_id, File.file_name, File.uploaded_at)
+            .filter(File.folder_id == folder_id, File.uploaded_at == None)
+            .order_by(File.file_id.desc())
+            .limit(101),
+            "IX_FILES_FOLDER_UPLOADED",
+            True,
+        ),
+        (
+            "folders.get_folder_progress (폴더 집계)",
+            db.query(File.is_transform, File.is_classification)
+            .filter(File.folder_id == folder_id),
+            "IX_FILES_FOLDER_UPLOADED",
+            False,
+        ),
+        (
+            # 사용자별 폴더 수는 적고 라우트는 FOLDER_STATS와 조인하므로 정렬은 허용
+            "folders.get_user_folders (사용자별 폴더, 최신 작업순)",
+            db.query(Folder.folder_id, Folder.folder_name, Folder.last_work)
+            .filter(Folder.user_id == user_id)
+            .order_by(Folder.last_work.desc().nullslast()),
+            "IX_FOLDERS_USER_LAST_WORK",
+            False,
+        ),
+    ]
+
+
+def check_plan(plan, index: str, ordered: bool) -> list:
+    """실행 계획의 문제점 목록 (없으면 통과)"""
+    problems = []
+    if index not in {object_name for _, _, object_name in plan if object_name}:
+        problems.append(f"{index} 미사용")
+    if ordered and any(operation == "SORT" and options == "ORDER BY" for operation, options, _ in plan):
+        problems.append("SORT ORDER BY (인덱스 순서와 ORDER BY가 다름)")
+    return problems
+
+
+def explain(db, query) -> list:
+    """EXPLAIN PLAN 후 PLAN_TABLE에서 (operation, options, object_name) 목록 반환"""
+    sql = str(query.statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    statement_id = uuid.uuid4().hex[:30]
+    db.execute(text(f"EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR {sql}"))
+    rows = db.execute(
+        text("SELECT OPERATION, OPTIONS, OBJECT_NAME FROM PLAN_TABLE "
+             "WHERE STATEMENT_ID = :sid ORDER BY ID"),
+        {"sid": statement_id}
+    ).all()
+    db.execute(text("DELETE FROM PLAN_TABLE WHERE STATEMENT_ID = :sid"), {"sid": statement_id})
+    db.commit()
+    return rows
+
+
+def main(argv) -> int:
+    folder_id = int(argv[1]) if len(argv) > 1 else 1
+    user_id = int(argv[2]) if len(argv) > 2 else 1
+
+    db = SessionLocal()
+    failed = 0
+    try:
+        for name, query, index, ordered in hot_queries(db, folder_id, user_id):
+            plan = explain(db, query)
+            problems = check_plan(plan, index, ordered)
+            failed += 1 if problems else 0
+            print(f"[{'FAIL' if problems else 'OK'}] {name}" + (f" — {', '.join(problems)}" if problems else ""))
+            for operation, options, object_name in plan:
+                print(f"    {operation} {options or ''} {object_name or ''}".rstrip())
+    finally:
+        db.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,176 @@
+# app/migrations/steps.py
+from sqlalchemy import Sequence, text
+
+# 동시에 시작한 다른 워커가 먼저 적용해서 나는 Oracle 오류
+# (이미 존재하는 이름/컬럼/인덱스, 이미 삭제된 시퀀스/인덱스)
+_ALREADY_DONE = ("ORA-00955", "ORA-01430", "ORA-01408", "ORA-02289", "ORA-01418")
+
+
+def _execute_ddl(conn, sql: str):
+    try:
+        conn.execute(text(sql))
+    except Exception as e:
+        if not any(code in str(e) for code in _ALREADY_DONE):
+            raise
+
+
+def _has_column(conn, table: str, column: str) -> bool:
+    return conn.execute(
+        text("SELECT COUNT(*) FROM USER_TAB_COLUMNS WHERE TABLE_NAME = :t AND COLUMN_NAME = :c"),
+        {"t": table, "c": column}
+    ).scalar() > 0
+
+
+def _has_index(conn, index: str) -> bool:
+    return conn.execute(
+        text("SELECT COUNT(*) FROM USER_INDEXES WHERE INDEX_NAME = :i"),
+        {"i": index}
+    ).scalar() > 0
+
+
+def add_column(conn, table: str, column: str, definition: str):
+    if not _has_column(conn, table, column):
+        _execute_ddl(conn, f"ALTER TABLE {table} ADD ({column} {definition})")
+
+
+def create_index(conn, index: str, table: str, columns: str):
+    if not _has_index(conn, index):
+        _execute_ddl(conn, f"CREATE INDEX {index} ON {table} ({columns})")
+
+
+def drop_index(conn, index: str):
+    if _has_index(conn, index):
+        _execute_ddl(conn, f"DROP INDEX {index}")
+
+
+# ------------------------------
+# 매 시작 시 확인 (버전과 무관하게 항상 실행, 이미 맞으면 아무것도 안 함)
+# ------------------------------
+def sync_missing_columns(conn, metadata):
+    """
+    모델에는 있지만 기존 테이블에 없는 컬럼을 추가
+    - create_all은 이미 있는 테이블을 건드리지 않으므로, 컬럼을 추가한 커밋을 배포하면
+      단계(STEPS)를 따로 만들지 않아도 여기서 채워짐
+    - 기존 행이 있으므로 NOT NULL 없이 추가 (서버 기본값은 그대로)
+    """
+    existing = {}
+    for table_name, column_name in conn.execute(text(
+        "SELECT TABLE_NAME, COLUMN_NAME FROM USER_TAB_COLUMNS"
+    )).all():
+        existing.setdefault(table_name, set()).add(column_name)
+
+    # 소문자로 선언한 이름(FoldersCategory 등)은 Oracle에 대문자로 저장되므로 같은 규칙으로 맞춰 비교
+    denormalize = conn.dialect.denormalize_name
+    for table in metadata.sorted_tables:
+        table_name = denormalize(table.name)
+        columns = existing.get(table_name)
+        if columns is None:
+            continue    # create_all이 만든 새 테이블 (또는 아직 없는 테이블)
+        for column in table.columns:
+            column_name = denormalize(column.name)
+            if column_name in columns:
+                continue
+            definition = column.type.compile(dialect=conn.dialect)
+            default = column.server_default
+            if default is not None and isinstance(getattr(default, "arg", None), str):
+                definition += f" DEFAULT {default.arg}"
+            add_column(conn, table_name, column_name, definition)
+
+
+def sync_sequence_start(conn, sequence: str, table: str, column: str):
+    """
+    시퀀스의 다음 값이 기존 MAX(column) 이하이면 MAX보다 커지도록 앞당김
+    - 기존 DB에서 create_all이 시퀀스를 1부터 새로 만든 경우 (MAX+1 방식에서 전환 등)
+    - USER_SEQUENCES.LAST_NUMBER는 캐시 상한이라 실제 다음 값과 다르므로 NEXTVAL로 직접 확인
+    - DROP/CREATE 없이 INCREMENT BY를 잠시 키워서 한 번 건너뜀 → 그 사이 다른 세션의 NEXTVAL도
+      실패하지 않고 (더 큰 값을 받을 뿐), 여러 워커가 동시에 실행해도 값이 커지기만 함
+    """
+    exists = conn.execute(
+        text("SELECT COUNT(*) FROM USER_SEQUENCES WHERE SEQUENCE_NAME = :s"),
+        {"s": sequence}
+    ).scalar()
+    max_id = conn.execute(text(f"SELECT NVL(MAX({column}), 0) FROM {table}")).scalar()
+    if not exists:
+        _execute_ddl(conn, f"CREATE SEQUENCE {sequence} START WITH {max_id + 1} INCREMENT BY 1")
+        return
+
+    next_id = conn.execute(text(f"SELECT {sequence}.NEXTVAL FROM DUAL")).scalar()
+    if next_id > max_id:
+        return
+    gap = max_id - next_id + 1
+    conn.execute(text(f"ALTER SEQUENCE {sequence} INCREMENT BY {gap}"))
+    try:
+        conn.execute(text(f"SELECT {sequence}.NEXTVAL FROM DUAL")).scalar()
+    finally:
+        conn.execute(text(f"ALTER SEQUENCE {sequence} INCREMENT BY 1"))
+    print(f"[DB 마이그레이션] {sequence} 다음 값 → {max_id + 2}")
+
+
+def sync_sequences(conn, metadata):
+    """시퀀스를 기본값으로 쓰는 모든 PK 컬럼에 sync_sequence_start 적용"""
+    for table in metadata.sorted_tables:
+        for column in table.primary_key.columns:
+            if isinstance(column.default, Sequence):
+                sync_sequence_start(conn, column.default.name, table.name, column.name)
+
+
+# ------------------------------
+# 단계 (버전 순서대로, 한 번 배포된 단계는 수정하지 말고 새 단계를 추가할 것)
+# ------------------------------
+def v1_file_columns(conn):
+    """기존 FILES/FOLDERS 테이블에 이후 추가된 컬럼"""
+    add_column(conn, "FILES", "FILE_SIZE", "NUMBER")
+    add_column(conn, "FILES", "FILE_HASH", "VARCHAR2(64)")
+    add_column(conn, "FILES", "CLASSIFIED_VERSION", "NUMBER")
+    add_column(conn, "FOLDERS", "CATEGORY_VERSION", "NUMBER DEFAULT 0")
+
+
+def v2_file_id_seq(conn):
+    """FILE_ID_SEQ를 기존 MAX(FILE_ID) 이후부터 시작하도록 맞춤 (MAX+1 방식에서 전환)"""
+    sync_sequence_start(conn, "FILE_ID_SEQ", "FILES", "FILE_ID")
+
+
+def v3_access_path_indexes(conn):
+    """라우트별 조회 패턴에 맞춘 복합 인덱스"""
+    create_index(conn, "IX_FILES_FOLDER_UPLOADED", "FILES", "FOLDER_ID, UPLOADED_AT, FILE_ID")
+    create_index(conn, "IX_FILES_FOLDER_CATEGORY", "FILES", "FOLDER_ID, CATEGORY")
+    create_index(conn, "IX_FILES_USER", "FILES", "USER_ID")
+    create_index(conn, "IX_FOLDERS_USER_LAST_WORK", "FOLDERS", "USER_ID, LAST_WORK")
+
+
+def v4_folder_stats_dirty(conn):
+    """통계 재계산 대상 표시 인덱스 + 기존 폴더는 모두 한 번씩 재계산되도록 표시"""
+    create_index(conn, "IX_FOLDERS_STATS_DIRTY", "FOLDERS", "STATS_DIRTY_AT")
+    conn.execute(text("UPDATE FOLDERS SET STATS_DIRTY_AT = SYSDATE WHERE STATS_DIRTY_AT IS NULL"))
+
+
+def v5_category_list_index(conn):
+    """폴더 + 카테고리 목록을 정렬 없이 인덱스 순서로 읽도록 UPLOADED_AT, FILE_ID까지 포함 (기존 인덱스는 앞부분이 같아 삭제)"""
+    create_index(conn, "IX_FILES_FOLDER_CAT_UPLOADED", "FILES", "FOLDER_ID, CATEGORY, UPLOADED_AT, FILE_ID")
+    drop_index(conn, "IX_FILES_FOLDER_CATEGORY")
+
+
+def v6_sequences(conn):
+    """시퀀스를 쓰는 모든 PK의 시퀀스를 기존 MAX(PK) 이후로 조정 (v2는 FILE_ID_SEQ만)"""
+    from app.database import Base
+    sync_sequences(conn, Base.metadata)
+
+
+def v7_folder_stats_reconciled(conn):
+    """폴더별 마지막 통계 재계산 시각 + 순환 재계산용 인덱스 (기존 폴더는 가장 먼저 돌도록 오래된 시각으로 채움)"""
+    add_column(conn, "FOLDERS", "STATS_RECONCILED_AT", "DATE")
+    create_index(conn, "IX_FOLDERS_STATS_RECONCILED", "FOLDERS", "STATS_RECONCILED_AT")
+    conn.execute(text(
+        "UPDATE FOLDERS SET STATS_RECONCILED_AT = DATE '1970-01-01' WHERE STATS_RECONCILED_AT IS NULL"
+    ))
+
+
+STEPS = [
+    (1, "FILES.FILE_SIZE/FILE_HASH/CLASSIFIED_VERSION, FOLDERS.CATEGORY_VERSION 추가", v1_file_columns),
+    (2, "FILE_ID_SEQ 시작값을 MAX(FILE_ID) 이후로 조정", v2_file_id_seq),
+    (3, "FILES/FOLDERS 조회용 복합 인덱스", v3_access_path_indexes),
+    (4, "FOLDERS.STATS_DIRTY_AT 인덱스, 기존 폴더 통계 재계산 표시", v4_folder_stats_dirty),
+    (5, "IX_FILES_FOLDER_CATEGORY → IX_FILES_FOLDER_CAT_UPLOADED", v5_category_list_index),
+    (6, "모든 ID 시퀀스를 MAX(PK) 이후로 조정", v6_sequences),
+    (7, "FOLDERS.STATS_RECONCILED_AT 추가 + 인덱스", v7_folder_stats_reconciled),
+]
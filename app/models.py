@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, Date, Sequence, ForeignKey, DateTime
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Date, Sequence, ForeignKey, DateTime, Text, Index
 from app.database import Base
 from sqlalchemy.orm import relationship
 
@@ -43,6 +45,14 @@ folder_id_seq = Sequence('FOLDER_ID_SEQ', start = 1, increment = 1)
 
 class Folder(Base):
     __tablename__ = "FOLDERS"
+    __table_args__ = (
+        # 사용자별 폴더 목록 (최신 작업순)
+        Index("IX_FOLDERS_USER_LAST_WORK", "USER_ID", "LAST_WORK"),
+        # 통계 재계산 대상 폴더
+        Index("IX_FOLDERS_STATS_DIRTY", "STATS_DIRTY_AT"),
+        # 전체 폴더 순환 재계산 (오래전에 재계산한 폴더부터)
+        Index("IX_FOLDERS_STATS_RECONCILED", "STATS_RECONCILED_AT"),
+    )
 
     folder_id = Column("FOLDER_ID", Integer, folder_id_seq,
                        primary_key=True,
@@ -52,33 +62,151 @@ class Folder(Base):
     file_cnt = Column("FILE_CNT", Integer, default=0)
     connected_directory = Column("CONNECTED_DIRECTORY", String(300))
     classification_after_change = Column("CLASSIFICATION_AFTER_CHANGE", Integer, default=0)
+    category_version = Column("CATEGORY_VERSION", Integer, default=0)     # 카테고리 추가 시 +1 (delta 재분류 기준)
+    stats_dirty_at = Column("STATS_DIRTY_AT", DateTime)   # extractor/분류 서버에 마지막으로 작업을 넘긴 시각 (NULL: 통계 재계산 불필요)
+    stats_reconciled_at = Column("STATS_RECONCILED_AT", DateTime, default=datetime.now)    # 마지막으로 통계를 재계산한 시각
     last_work = Column("LAST_WORK", Date)
 
     user = relationship("User", back_populates="folders")
     files = relationship("File", back_populates="folder", cascade="all, delete")
     categories = relationship("FoldersCategory", back_populates="folder", cascade="all, delete")
 
+# FILES 테이블용 시퀀스 (업로드/압축해제 시 여러 개를 한 번에 할당)
+file_id_seq = Sequence('FILE_ID_SEQ', start=1, increment=1)
+
 # FILES
 class File(Base):
     __tablename__ = "FILES"
-
-    file_id = Column("FILE_ID", Integer, primary_key=True)
+    __table_args__ = (
+        # 폴더별 파일 목록 (업로드 최신순 + keyset 페이지)
+        Index("IX_FILES_FOLDER_UPLOADED", "FOLDER_ID", "UPLOADED_AT", "FILE_ID"),
+        # 폴더 + 카테고리별 파일 목록(업로드 최신순 페이지)/다운로드
+        Index("IX_FILES_FOLDER_CAT_UPLOADED", "FOLDER_ID", "CATEGORY", "UPLOADED_AT", "FILE_ID"),
+        Index("IX_FILES_USER", "USER_ID"),
+    )
+
+    file_id = Column("FILE_ID", Integer, file_id_seq,
+                     primary_key=True,
+                     server_default=file_id_seq.next_value())
     user_id = Column("USER_ID", Integer, ForeignKey("USERS.USER_ID"), nullable=False)
     folder_id = Column("FOLDER_ID", Integer, ForeignKey("FOLDERS.FOLDER_ID"))
     file_name = Column("FILE_NAME", String(200))
     file_type = Column("FILE_TYPE", String(50))
     file_path = Column("FILE_PATH", String(300))
+    file_size = Column("FILE_SIZE", Integer)        # 바이트 단위
+    file_hash = Column("FILE_HASH", String(64))     # SHA-256 (hex)
     is_transform = Column("IS_TRANSFORM", Integer, default=0)   # 0: 대기, 1: 추출중, 2: 추출완료
     transform_txt_path = Column("TRANSFORM_TXT_PATH", String(300))      # 0: 대기, 1: 분류중, 2: 분류완료
     is_classification = Column("IS_CLASSIFICATION", Integer, default=0)
     category = Column("CATEGORY", String(200))
-    uploaded_at = Column("UPLOADED_AT", Date)
+    classified_version = Column("CLASSIFIED_VERSION", Integer)     # 분류 요청이 전달된 시점의 폴더 CATEGORY_VERSION (NULL: 분류 필요 또는 전달 전)
+    uploaded_at = Column("UPLOADED_AT", DateTime)      # Oracle DATE (초 단위 시각 포함, Date로 매핑하면 날짜만 남음)
 
     # 관계
     user = relationship("User", back_populates="files")
     folder = relationship("Folder", back_populates="files")
 
 
+# 폴더 통계 (파일 추가/삭제/상태 변경과 같은 트랜잭션에서 증감, 주기적으로 재계산해 보정)
+# STAT_KEY: files, bytes, transform:{상태}, classification:{상태}, category:{이름}, uncategorized
+class FolderStat(Base):
+    __tablename__ = "FOLDER_STATS"
+
+    folder_id = Column("FOLDER_ID", Integer, ForeignKey("FOLDERS.FOLDER_ID"), primary_key=True)
+    stat_key = Column("STAT_KEY", String(300), primary_key=True)
+    stat_value = Column("STAT_VALUE", Integer, default=0)
+
+
+# 업로드 파일 실체 (SHA-256 기준 내용 주소 저장소)
+class Blob(Base):
+    __tablename__ = "BLOBS"
+
+    blob_hash = Column("BLOB_HASH", String(64), primary_key=True)
+    blob_path = Column("BLOB_PATH", String(300), nullable=False)
+    blob_size = Column("BLOB_SIZE", Integer)
+    ref_cnt = Column("REF_CNT", Integer, default=0)     # 이 blob을 가리키는 FILES 행 수
+    created_at = Column("CREATED_AT", DateTime)
+
+
+# extractor 서버 전송 대기열 (outbox)
+extract_outbox_id_seq = Sequence('EXTRACT_OUTBOX_ID_SEQ', start=1, increment=1)
+
+class ExtractOutbox(Base):
+    __tablename__ = "EXTRACT_OUTBOX"
+    __table_args__ = (
+        Index("IX_EXTRACT_OUTBOX_STATUS", "STATUS", "NEXT_TRY_AT"),
+        Index("IX_EXTRACT_OUTBOX_CLAIM", "CLAIM_TOKEN"),
+    )
+
+    outbox_id = Column("OUTBOX_ID", Integer, extract_outbox_id_seq,
+                       primary_key=True,
+                       server_default=extract_outbox_id_seq.next_value())
+    file_id = Column("FILE_ID", Integer, nullable=False)
+    file_type = Column("FILE_TYPE", String(50))
+    status = Column("STATUS", Integer, default=0)       # 0: 대기, 1: 전송중, 2: 실패 (재시도 횟수 초과, 더 보내지 않음)
+    attempts = Column("ATTEMPTS", Integer, default=0)
+    claim_token = Column("CLAIM_TOKEN", String(32))     # 전송을 맡은 워커 표시
+    claimed_at = Column("CLAIMED_AT", DateTime)
+    next_try_at = Column("NEXT_TRY_AT", DateTime)
+    error = Column("ERROR", String(1000))               # 마지막 실패 사유
+    created_at = Column("CREATED_AT", DateTime)
+
+
+# 분류 작업 (폴더 단위 요청 1건)
+classify_job_id_seq = Sequence('CLASSIFY_JOB_ID_SEQ', start=1, increment=1)
+
+class ClassifyJob(Base):
+    __tablename__ = "CLASSIFY_JOBS"
+    __table_args__ = (
+        Index("IX_CLASSIFY_JOBS_FOLDER", "FOLDER_ID", "JOB_ID"),
+    )
+
+    job_id = Column("JOB_ID", Integer, classify_job_id_seq,
+                    primary_key=True,
+                    server_default=classify_job_id_seq.next_value())
+    user_id = Column("USER_ID", Integer, ForeignKey("USERS.USER_ID"), nullable=False)
+    folder_id = Column("FOLDER_ID", Integer, nullable=False)
+    mode = Column("MODE", String(20))                   # full: 전체, delta: 변경분, failed: 실패분 재분류
+    status = Column("STATUS", Integer, default=0)       # 0: 대기, 1: 진행중, 2: 완료, 3: 일부 실패
+    file_cnt = Column("FILE_CNT", Integer, default=0)
+    chunk_cnt = Column("CHUNK_CNT", Integer, default=0)
+    category_version = Column("CATEGORY_VERSION", Integer)     # 요청 시점의 폴더 CATEGORY_VERSION (chunk 전달 성공 시 파일에 기록)
+    created_at = Column("CREATED_AT", DateTime)
+    updated_at = Column("UPDATED_AT", DateTime)
+
+    chunks = relationship("ClassifyChunk", back_populates="job", cascade="all, delete")
+
+
+# 분류 작업을 나눈 전송 단위
+classify_chunk_id_seq = Sequence('CLASSIFY_CHUNK_ID_SEQ', start=1, increment=1)
+
+class ClassifyChunk(Base):
+    __tablename__ = "CLASSIFY_CHUNKS"
+    __table_args__ = (
+        Index("IX_CLASSIFY_CHUNKS_STATUS", "STATUS", "NEXT_TRY_AT"),
+        Index("IX_CLASSIFY_CHUNKS_JOB", "JOB_ID", "CHUNK_NO"),
+    )
+
+    chunk_id = Column("CHUNK_ID", Integer, classify_chunk_id_seq,
+                      primary_key=True,
+                      server_default=classify_chunk_id_seq.next_value())
+    job_id = Column("JOB_ID", Integer, ForeignKey("CLASSIFY_JOBS.JOB_ID"), nullable=False)
+    chunk_no = Column("CHUNK_NO", Integer)
+    user_id = Column("USER_ID", Integer)                # 공정 스케줄링용 (job에서 복사)
+    folder_id = Column("FOLDER_ID", Integer)
+    payload = Column("PAYLOAD", Text)                   # [{"FILE_ID":..., "FILE_TYPE":...}, ...] JSON
+    file_cnt = Column("FILE_CNT", Integer, default=0)
+    status = Column("STATUS", Integer, default=0)       # 0: 대기, 1: 전송중, 2: 완료, 3: 실패
+    attempts = Column("ATTEMPTS", Integer, default=0)
+    claim_token = Column("CLAIM_TOKEN", String(32))
+    claimed_at = Column("CLAIMED_AT", DateTime)
+    next_try_at = Column("NEXT_TRY_AT", DateTime)
+    error = Column("ERROR", String(1000))
+    updated_at = Column("UPDATED_AT", DateTime)
+
+    job = relationship("ClassifyJob", back_populates="chunks")
+
+
 #  LOGS -
 class Log(Base):
     __tablename__ = "LOGS"
@@ -93,6 +221,16 @@ class Log(Base):
 
 
 
+# 스키마 버전 (app/migrations에서 적용한 단계 기록)
+class SchemaVersion(Base):
+    __tablename__ = "SCHEMA_VERSION"
+
+    version = Column("VERSION", Integer, primary_key=True)
+    description = Column("DESCRIPTION", String(300))
+    applied_at = Column("APPLIED_AT", DateTime)
+
+
+
 # 카테고리
 class FoldersCategory(Base):
     __tablename__ = "FOLDERS_CATEGORY"
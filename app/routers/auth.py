@@ -1,23 +1,38 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from datetime import date, datetime, timedelta
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models import User, Folder
-from app.utils.security import hash_password, verify_password, create_access_token, decode_access_token
+from app.utils.security import (
+    AUTH_VERIFY_MODE, HashPoolBusy, hash_password_async, verify_password_async,
+    create_access_token, decode_access_token
+)
 from app.schemas import UserRegister, UserLogin
+from app.utils.session_cache import session_cache
 from jose import JWTError
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
+async def _hash_or_busy(coro):
+    """해시 풀이 가득 차면 대기시키지 않고 503 (잠시 후 재시도)"""
+    try:
+        return await coro
+    except HashPoolBusy:
+        raise HTTPException(status_code=503, detail="요청이 많습니다. 잠시 후 다시 시도해주세요.",
+                            headers={"Retry-After": "1"})
+
+
 # 회원가입
 @router.post("/register")
-def register_user(user: UserRegister, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(User.user_login_id == user.user_login_id).first()
+async def register_user(user: UserRegister, db: AsyncSession = Depends(get_async_db)):
+    existing_user = await db.scalar(select(User).where(User.user_login_id == user.user_login_id))
     if existing_user:
         raise HTTPException(status_code=400, detail="이미 존재하는 아이디입니다.")
 
-    hashed_pw = hash_password(user.user_password)
+    hashed_pw = await _hash_or_busy(hash_password_async(user.user_password))
     new_user = User(
         user_login_id=user.user_login_id,
         email=user.email,
@@ -26,7 +41,7 @@ def register_user(user: UserRegister, db: Session = Depends(get_db)):
         last_work=datetime.now()
     )
     db.add(new_user)
-    db.flush()          # USER_ID 확보
+    await db.flush()    # USER_ID 확보
 
     # 폴더 생성
     folder_name = (user.folder_name or "unknown").strip()
@@ -38,26 +53,26 @@ def register_user(user: UserRegister, db: Session = Depends(get_db)):
     )
 
     db.add(new_folder)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
     return {"message": "회원가입 성공", 
             "user_id": new_user.user_id,
             "folder_name": folder_name}
 
 # 로그인
 @router.post("/login")
-def login_user(user: UserLogin, db: Session = Depends(get_db)):
+async def login_user(user: UserLogin, db: AsyncSession = Depends(get_async_db)):
     print(" 로그인 요청 body:", user.dict())  
-    db_user = db.query(User).filter(User.user_login_id == user.user_login_id).first()
+    db_user = await db.scalar(select(User).where(User.user_login_id == user.user_login_id))
 
-    if not db_user or not verify_password(user.user_password, db_user.user_password):
+    if not db_user or not await _hash_or_busy(verify_password_async(user.user_password, db_user.user_password)):
         print("로그인 실패: 유저 없음 or 비밀번호 불일치")
         raise HTTPException(status_code=401, detail="아이디 또는 비밀번호가 올바르지 않습니다.")
 
     token = create_access_token({"sub": str(db_user.user_id)})
     db_user.access_key = token
     db_user.last_work = datetime.now()
-    db.commit()
+    await db.commit()
+    session_cache.invalidate(db_user.user_id)    # 이전 토큰 캐시 폐기
     print("로그인 성공:", db_user.user_login_id)
     return {"message": "로그인 성공", "token": token, "user_id": db_user.user_id, "user_login_id": db_user.user_login_id}
 
@@ -71,22 +86,39 @@ def verify_token(request: Request, db: Session = Depends(get_db)):
 
     token = auth.split(" ")[1]
     try:
-        db_user = db.query(User).filter(User.user_id == userId).first()
-
-        # access_key 검증
-        if not db_user or db_user.access_key != token:
-            raise HTTPException(status_code=401, detail={"error" : "invalid tey"})
+        if AUTH_VERIFY_MODE == "stateless":
+            # 서명/만료만 확인 (DB 조회 없음, 어느 워커/노드에서도 같은 결과)
+            payload = decode_access_token(token)
+            if payload.get("sub") != str(userId):
+                raise HTTPException(status_code=401, detail={"error" : "invalid tey"})
+            return {"valid": True, "user_id": userId}
 
         now = datetime.now()
-        last_work = db_user.last_work
-        if isinstance(last_work, str):
-            last_work = datetime.fromisoformat(last_work)
-        
+
+        # 캐시에 같은 토큰이 있으면 DB 조회 없이 검증
+        last_work = session_cache.get(userId, token)
+        if last_work is None:
+            db_user = (
+                db.query(User.access_key, User.last_work)
+                .filter(User.user_id == userId)
+                .first()
+            )
+
+            # access_key 검증
+            if not db_user or db_user.access_key != token:
+                raise HTTPException(status_code=401, detail={"error" : "invalid tey"})
+
+            last_work = db_user.last_work
+            if isinstance(last_work, str):
+                last_work = datetime.fromisoformat(last_work)
+            last_work = session_cache.load(userId, token, last_work)
+
         if now - last_work > timedelta(minutes=30):
+            session_cache.invalidate(userId)
             raise HTTPException(status_code=401, detail={"error" : "timeout"})
 
-        db_user.last_work = now
-        db.commit()
+        # last_work는 모아서 주기적으로 DB에 반영 (요청마다 commit하지 않음)
+        session_cache.touch(userId, now)
         return {"valid": True, "user_id": userId}
 
     except JWTError as e:
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.database import get_db
 from datetime import datetime
+from typing import Optional
 from app.models import FoldersCategory, Folder
 from pydantic import BaseModel
 from app.models import File as FileModel
+from app.utils.folder_stats import move_category, read_stats
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate_files
 
 router = APIRouter(prefix="/folders", tags=["Categories"])
 
@@ -41,6 +44,8 @@ def create_category(folder_id: int, cat: CategoryCreate, db: Session = Depends(g
     folder = db.query(Folder).filter(Folder.folder_id == folder_id).first()
     if folder:
         folder.classification_after_change = 0
+        # 새 카테고리는 모든 파일의 분류 결과를 바꿀 수 있으므로 버전 증가
+        folder.category_version = (folder.category_version or 0) + 1
         folder.last_work = datetime.utcnow()
 
     db.commit()
@@ -64,6 +69,14 @@ def rename_category(folder_id: int, old_name: str, body: CategoryRename, db: Ses
 
     cat.category_name = body.new_name
 
+    # 이름만 바뀐 것이므로 파일의 카테고리도 그대로 옮김 (재분류 불필요, 버전 유지)
+    moved = (
+        db.query(FileModel)
+        .filter(FileModel.folder_id == folder_id, FileModel.category == old_name)
+        .update({FileModel.category: body.new_name}, synchronize_session=False)
+    )
+    move_category(db, folder_id, old_name, body.new_name, moved)
+
     folder = db.query(Folder).filter(Folder.folder_id == folder_id).first()
     if folder:
         folder.classification_after_change = 0
@@ -93,6 +106,8 @@ def delete_category(folder_id: int, cat_name: str, db: Session = Depends(get_db)
             )
     for f in files:
         f.category = None
+        f.classified_version = None     # 이 파일들만 delta 재분류 대상
+    move_category(db, folder.folder_id, cat_name, None, len(files))
     if folder:
         folder.classification_after_change = 0
         folder.last_work = datetime.utcnow()
@@ -103,7 +118,13 @@ def delete_category(folder_id: int, cat_name: str, db: Session = Depends(get_db)
 
 # 카테고리별 파일 목록 조회
 @router.get("/{folder_id}/categories/{category_name}/files")
-def get_files_by_category(folder_id: int, category_name: str, db: Session = Depends(get_db)):
+def get_files_by_category(
+    folder_id: int,
+    category_name: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     """
     특정 폴더 내의 특정 카테고리에 속한 파일 목록을 반환
     """
@@ -116,14 +137,17 @@ def get_files_by_category(folder_id: int, category_name: str, db: Session = Depe
     if not category:
         raise HTTPException(status_code=404, detail="카테고리를 찾을 수 없습니다.")
 
-    # 해당 카테고리의 파일 목록 조회
-    files = (
-        db.query(FileModel)
+    # 해당 카테고리의 파일 목록 조회 (필요한 컬럼만, 페이지 단위)
+    query = (
+        db.query(
+            FileModel.file_id, FileModel.file_name, FileModel.file_type,
+            FileModel.is_transform, FileModel.is_classification, FileModel.uploaded_at
+        )
         .filter(FileModel.folder_id == folder_id)
         .filter(FileModel.category == category_name)
-        .order_by(FileModel.uploaded_at.desc().nullslast())
-        .all()
     )
+    files, next_cursor = paginate_files(query, cursor, limit)
+    stats = read_stats(db, [folder_id])[folder_id]
 
     result = [
         {
@@ -139,23 +163,28 @@ def get_files_by_category(folder_id: int, category_name: str, db: Session = Depe
 
     return {
         "category_name": category_name,
-        "file_count": len(result),
-        "files": result
+        "file_count": stats.get(f"category:{category_name}", 0),   # 카테고리 전체 파일 수 (폴더 통계)
+        "files": result,
+        "next_cursor": next_cursor
     }
 
 # 카테고리 없는 파일 목록 조회
 @router.get("/{folder_id}/files")
-def get_files_without_category(folder_id: int, db: Session = Depends(get_db)):
+def get_files_without_category(
+    folder_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     """
     특정 폴더 안에서 카테고리(category)가 없는 파일들만 조회
     """
-    files = (
-        db.query(FileModel)
+    query = (
+        db.query(FileModel.file_id, FileModel.file_name, FileModel.file_type, FileModel.uploaded_at)
         .filter(FileModel.folder_id == folder_id)
         .filter((FileModel.category == None) | (FileModel.category == ""))  # NULL 또는 빈값
-        .order_by(FileModel.uploaded_at.desc().nullslast())
-        .all()
     )
+    files, next_cursor = paginate_files(query, cursor, limit)
 
     result = [
         {
@@ -167,4 +196,4 @@ def get_files_without_category(folder_id: int, db: Session = Depends(get_db)):
         for f in files
     ]
 
-    return {"files": result}
+    return {"files": result, "next_cursor": next_cursor}
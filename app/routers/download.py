@@ -1,15 +1,42 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from fastapi.responses import StreamingResponse, FileResponse
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models import File, Folder
-import zipfile
+from app.utils.archive_cache import ArchiveBusy, archive_cache, content_version
+from app.utils.http_range import file_etag, range_file_response
+from app.utils.offload import offload_response
 import urllib.parse
-import io
 import os
 
 router = APIRouter(prefix="/folders", tags=["download"])
 
+
+def archive_response(cache_path: str, entries, download_name: str):
+    """
+    같은 내용 버전의 ZIP이 캐시에 있으면 파일 그대로 전송
+    없으면 압축하면서 전송하고 동시에 캐시에 저장 (같은 아카이브를 만드는 중이면 그 출력을 같이 받음)
+    """
+    headers = {
+        "Content-Disposition": f"attachment; filename*=UTF-8''{urllib.parse.quote(download_name)}"
+    }
+    cached = archive_cache.lookup(cache_path)
+    if cached:
+        return (
+            offload_response(cached, "application/x-zip-compressed", headers)
+            or FileResponse(cached, media_type="application/x-zip-compressed", headers=headers)
+        )
+    try:
+        body = archive_cache.stream(cache_path, entries)
+    except ArchiveBusy:
+        raise HTTPException(status_code=503, detail="같은 파일을 받는 요청이 많습니다. 잠시 후 다시 시도해주세요.",
+                            headers={"Retry-After": "1"})
+    return StreamingResponse(
+        body,
+        media_type="application/x-zip-compressed",
+        headers=headers
+    )
+
 # ------------------------------
 # 전체 다운로드
 # ------------------------------
@@ -24,27 +51,23 @@ def download_folder(folder_id: int, db: Session = Depends(get_db)):
     if not files:
         raise HTTPException(status_code=404, detail="폴더 안에 파일이 존재하지 않습니다.")
 
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-        for file in files:
-            if file.file_path and os.path.exists(file.file_path):
-                # 카테고리 이름을 포함해 ZIP 안에서 폴더 구조를 만듦
-                if file.category:
-                    arcname = os.path.join(file.category, file.file_name)
-                else:
-                    arcname = os.path.join("분류되지 않은 문서", file.file_name)
-                zip_file.write(file.file_path, arcname=arcname)
+    # 응답 전에 (경로, ZIP 내부 이름) 목록만 만들어 두고, 압축은 전송하면서 진행
+    entries = []
+    for file in files:
+        if file.file_path and os.path.exists(file.file_path):
+            # 카테고리 이름을 포함해 ZIP 안에서 폴더 구조를 만듦
+            if file.category:
+                arcname = os.path.join(file.category, file.file_name)
             else:
-                print(f"⚠ 전체 다운로드 실패 : {file.file_path}")
-
-    zip_buffer.seek(0)
+                arcname = os.path.join("분류되지 않은 문서", file.file_name)
+            entries.append((file.file_path, arcname))
+        else:
+            print(f"⚠ 전체 다운로드 실패 : {file.file_path}")
 
-    return StreamingResponse(
-        zip_buffer,
-        media_type="application/x-zip-compressed",
-        headers={
-            "Content-Disposition": f"attachment; filename*=UTF-8''{urllib.parse.quote(folder.folder_name + '.zip')}"
-        }
+    return archive_response(
+        archive_cache.path_for(folder_id, "folder", None, content_version(entries)),
+        entries,
+        folder.folder_name + ".zip"
     )
 # ------------------------------
 # 카테고리 다운로드
@@ -65,42 +88,50 @@ def download_category(folder_id: int, category_name: str, db: Session = Depends(
     if not files:
         raise HTTPException(status_code=404, detail="카테고리에 파일이 존재 하지 않습니다.")
 
-    # 3. ZIP 생성
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-        for file in files:
-            if file.file_path and os.path.exists(file.file_path):
-                zip_file.write(file.file_path, arcname=file.file_name)
-            else:
-                print(f"⚠ 카테고리 다운로드 실패 : {file.file_path}")
+    # 3. ZIP 스트리밍 생성
+    entries = []
+    for file in files:
+        if file.file_path and os.path.exists(file.file_path):
+            entries.append((file.file_path, file.file_name))
+        else:
+            print(f"⚠ 카테고리 다운로드 실패 : {file.file_path}")
 
-    zip_buffer.seek(0)
-    return StreamingResponse(
-    zip_buffer,
-    media_type="application/x-zip-compressed",
-    headers={
-        "Content-Disposition": f"attachment; filename*=UTF-8''{urllib.parse.quote(category_name + '.zip')}"
-    }
-)
+    return archive_response(
+        archive_cache.path_for(folder_id, "category", category_name, content_version(entries)),
+        entries,
+        category_name + ".zip"
+    )
 
 # ------------------------------
 # 개별 파일 다운로드
 # ------------------------------
 
 @router.get("/download/file/{file_id}")
-def download_file(file_id: int, db: Session = Depends(get_db)):
+def download_file(file_id: int, request: Request, db: Session = Depends(get_db)):
     file = db.query(File).filter(File.file_id == file_id).first()
-    if not file or not file.file_path or not os.path.exists(file.file_path):
+    if not file or not file.file_path:
         raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다.")
 
     # 파일명 한글 깨짐 방지
     encoded_name = urllib.parse.quote(file.file_name.encode("utf-8"))
+    headers = {
+        "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_name}"
+    }
 
-    return FileResponse(
+    # 프록시 전송 모드면 바이트 전송(Range/조건부 요청 포함)은 프록시가
+    # (파일이 없으면 프록시가 404를 주므로 여기서 디스크를 확인하지 않음)
+    offloaded = offload_response(file.file_path, "application/octet-stream", headers)
+    if offloaded:
+        return offloaded
+
+    if not os.path.exists(file.file_path):
+        raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다.")
+
+    # Range(이어받기) / If-None-Match·If-Range(재검증) 처리
+    return range_file_response(
+        request,
         path=file.file_path,
-        filename=file.file_name,  # 실제 다운로드 시 표시될 이름
+        etag=file_etag(file.file_path, file.file_hash),
         media_type="application/octet-stream",
-        headers={
-            "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_name}"
-        }
-)
+        headers=headers
+    )
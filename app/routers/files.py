@@ -1,124 +1,129 @@
 # app/routers/files.py
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert, select, text
 from datetime import datetime
-from typing import List
-import os, asyncio, zipfile
+from typing import List, Optional
+import os, zipfile
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models import File as FileModel, Folder, User
+from app.utils.archive import ArchiveLimitError, extract_to_temp
+from app.utils.extractor import discard_extraction, enqueue_extraction, extractor_dispatcher
+from app.utils.folder_stats import apply_delta, file_stats, mark_dirty, stats_of
+from app.utils.naming import NameResolver
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate_files
+from app.utils.progress_stream import progress_hub
+from app.utils.storage import save_temp, acquire_blob, release_blob, reclaim_blobs
 
 router = APIRouter(prefix="/files", tags=["Files"])
 
-EXTRACTOR_SERVER_URL = "http://localhost:8001/new_file/"
 SUPPORTED_EXTENSIONS = {"pdf", "hwp", "docx", "pptx", "xlsx",
                         "jpg", "jpeg", "png", "zip", "txt"}
 
+# 파일 목록 응답에 필요한 컬럼만 조회
+LIST_COLUMNS = (
+    FileModel.file_id, FileModel.user_id, FileModel.folder_id, FileModel.file_name,
+    FileModel.file_type, FileModel.file_path, FileModel.is_transform,
+    FileModel.transform_txt_path, FileModel.is_classification, FileModel.category,
+    FileModel.uploaded_at,
+)
 
-def get_new_idx(db):
-    max_id = db.query(func.max(FileModel.file_id)).scalar()
-    if max_id is None:
-        new_file_id = 1
-    else:
-        new_file_id = max_id + 1
-    return new_file_id
 
+def allocate_file_ids(db: Session, count: int) -> List[int]:
+    """FILE_ID_SEQ에서 count개의 FILE_ID를 한 번에 받아옴 (동시 업로드에도 중복 없음)"""
+    if count <= 0:
+        return []
+    return db.execute(
+        text("SELECT FILE_ID_SEQ.NEXTVAL FROM DUAL CONNECT BY LEVEL <= :n"),
+        {"n": count}
+    ).scalars().all()
 
-# ------------------------------
-# extractor 서버에 비동기 요청
-# ------------------------------
-async def notify_extractor(file_id: int, file_type: str):
-    import httpx
-    payload = {"files": [{"FILE_ID": file_id, "FILE_TYPE": file_type}]}
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        try:
-            await client.post(EXTRACTOR_SERVER_URL, json=payload)
-            print(f"[Extractor 요청 전송 완료] file_id={file_id}")
-        except Exception as e:
-            print(f"[Extractor 요청 실패] file_id={file_id}, error={e}")
+
+def insert_files(db: Session, folder_id: int, rows: List[dict]):
+    """
+    표시 이름 중복 처리 후 FILES 행을 executemany 한 번으로 등록
+    - 폴더 이름 목록은 배치당 한 번만 조회 (NameResolver가 폴더 행을 잠금)
+    - commit은 호출한 쪽에서
+    """
+    if not rows:
+        return
+    resolver = NameResolver(db, folder_id)
+    for row in rows:
+        row["file_name"] = resolver.resolve(row["file_name"])
+    db.execute(insert(FileModel), rows)
+
+
+def enqueue_new_files(db: Session, rows: List[dict]):
+    """
+    extractor 전송 대상을 outbox에 기록 (ZIP/미지원 확장자 제외, commit은 호출한 쪽에서)
+    - 결과가 FILES에 직접 기록되므로 폴더 통계 재계산 대상으로 표시
+    """
+    targets = [
+        row for row in rows
+        if row["file_type"] != "zip" and row["file_type"] in SUPPORTED_EXTENSIONS
+    ]
+    enqueue_extraction(db, targets)
+    mark_dirty(db, [row["folder_id"] for row in targets])
 
 
 # ------------------------------
-# 공통: 파일 저장 + DB 등록 + extractor 호출
+# 공통: 파일 저장 + FILES 행 준비
 # ------------------------------
-async def save_file_to_db(
+def register_files(db: Session, user_id: int, folder_id: int, items: List[tuple]) -> List[dict]:
+    """
+    저장/해시가 끝난 임시 파일들을 한 번에 blob으로 등록하고 FILES에 넣을 행(dict) 목록 반환 (입력 순서 그대로)
+    - items: [(file_id, file_name, tmp_path, file_size, file_hash), ...]
+    - 파일 복사/해시는 모두 끝난 뒤 호출 → BLOBS 행 잠금은 이 단계부터 commit까지만 잡힘
+    - 해시 순서로 잠가서, 같은 파일들을 다른 순서로 올리는 요청끼리 교착(ORA-00060)되지 않게 함
+    """
+    rows = {}
+    for file_id, file_name, tmp_path, file_size, file_hash in sorted(items, key=lambda item: item[4]):
+        rows[file_id] = register_file(db, user_id, folder_id, file_id, file_name,
+                                      tmp_path, file_size, file_hash)
+    return [rows[item[0]] for item in items]
+
+
+def register_file(
+    db: Session,
     user_id: int,
     folder_id: int,
     file_id: int,
     file_name: str,
-    file_bytes: bytes,
-    folder_dir: str,
-    file_type: str,
-    db: Session
-) -> FileModel:
+    tmp_path: str,
+    file_size: int,
+    file_hash: str
+) -> dict:
     """
-    파일 저장, DB 등록, extractor 서버 호출
-    - 지원되지 않는 확장자도 DB에는 기록, 파일 저장 X
-    - ZIP 파일은 저장 + DB 기록, extractor 요청 제외
+    임시 파일을 blob으로 등록하고 FILES에 넣을 행(dict) 반환
+    - 지원되지 않는 확장자도 DB에는 기록
+    - file_name은 원본 이름 그대로, 중복 이름 처리는 insert 직전 insert_files에서
     """
-    name, ext = os.path.splitext(file_name)
-    ext = ext.lstrip(".").lower()
+    ext = os.path.splitext(file_name)[1].lstrip(".").lower()
 
     # -----------------
-    # DB용 중복 이름 처리 (같은 폴더 내)
+    # 실제 저장: sha256 기준 blob으로 등록 (같은 내용은 1개만 보관)
     # -----------------
-    existing_files = (
-        db.query(FileModel)
-        .filter(FileModel.folder_id == folder_id)
-        .filter(FileModel.file_name.like(f"{name}%"))
-        .all()
-    )
-
-    count = 0
-    for f in existing_files:
-        if f.file_name == f"{name}.{ext}":
-            count = max(count, 1)
-        elif f.file_name.startswith(f"{name}(") and f.file_name.endswith(f").{ext}"):
-            try:
-                n = int(f.file_name[len(name)+1:-len(ext)-2])
-                count = max(count, n+1)
-            except:
-                continue
-
-    if count == 0:
-        display_name = f"{name}.{ext}"
-    else:
-        display_name = f"{name}({count}).{ext}"
-
-    save_path = None
+    save_path = acquire_blob(db, tmp_path, file_size, file_hash)
 
     # -----------------
-    # 실제 저장은 지원되는 확장자만
+    # DB에 넣을 행
     # -----------------
-    save_filename = f"{file_id}.{ext}"
-    save_path = os.path.join(folder_dir, save_filename)
-    with open(save_path, "wb") as f_out:
-        f_out.write(file_bytes)
-
-    # -----------------
-    # DB 저장
-    # -----------------
-    new_file = FileModel(
+    return dict(
         user_id=user_id,
         folder_id=folder_id,
         file_id=file_id,
-        file_name=display_name,  # DB에 표시될 제목
+        file_name=file_name,     # 원본 이름 (insert 시 표시용 이름으로 변경)
         file_type=ext,           # 확장자 그대로
-        file_path=save_path,     # 실제 저장 경로
+        file_path=save_path,     # 실제 저장 경로 (blob)
+        file_size=file_size,
+        file_hash=file_hash,
         is_transform=0,
         is_classification=0,
         uploaded_at=datetime.now()
     )
-    db.add(new_file)
-    db.commit()
-    db.refresh(new_file)
-
-    # extractor 서버 호출 (ZIP 제외)
-    if ext != "zip" and ext in SUPPORTED_EXTENSIONS:
-        asyncio.create_task(notify_extractor(new_file.file_id, ext))
-
-    return new_file
 
 
 
@@ -126,14 +131,14 @@ async def save_file_to_db(
 # 폴더별 파일 목록 조회 (최신순)
 # ------------------------------
 @router.get("/{folder_id}")
-def get_folder_files(folder_id: int, db: Session = Depends(get_db)):
-    update_folder_file_count(folder_id, db)     # 조회 전에 동기화
-    files = (
-        db.query(FileModel)
-        .filter(FileModel.folder_id == folder_id)
-        .order_by(FileModel.uploaded_at.desc().nullslast())
-        .all()
-    )
+def get_folder_files(
+    folder_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    query = db.query(*LIST_COLUMNS).filter(FileModel.folder_id == folder_id)
+    files, next_cursor = paginate_files(query, cursor, limit)
 
     result = [
         {
@@ -152,18 +157,7 @@ def get_folder_files(folder_id: int, db: Session = Depends(get_db)):
         for f in files
     ]
 
-    return {"files": result}
-
-
-# DB 기준으로 실제 파일 수 자동으로 세고 갱신
-def update_folder_file_count(folder_id: int, db: Session):
-    """폴더의 실제 파일 개수를 DB에서 다시 계산해 Folder.file_cnt 갱신"""
-    count = db.query(FileModel).filter(FileModel.folder_id == folder_id).count()
-    folder = db.query(Folder).filter(Folder.folder_id == folder_id).first()
-    if folder:
-        folder.file_cnt = count
-        folder.last_work = datetime.now()
-        db.commit()
+    return {"files": result, "next_cursor": next_cursor}
 
 
 # ------------------------------
@@ -174,11 +168,12 @@ async def upload_files(
     user_id: int,
     folder_id: int,
     files: List[UploadFile] = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    new_idx = get_new_idx(db)
-    user = db.query(User).filter(User.user_id == user_id).first()
-    folder = db.query(Folder).filter(Folder.folder_id == folder_id, Folder.user_id == user_id).first()
+    user = await db.get(User, user_id)
+    folder = await db.scalar(
+        select(Folder).where(Folder.folder_id == folder_id, Folder.user_id == user_id)
+    )
 
     if not user:
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
@@ -187,32 +182,32 @@ async def upload_files(
     if not files:
         raise HTTPException(status_code=400, detail="업로드할 파일이 없습니다.")
 
-    # 저장 경로
-    base_dir = "../uploaded_files"
-    folder_dir = os.path.join(base_dir)
-    os.makedirs(folder_dir, exist_ok=True)
-
-    uploaded_files = []
-
-    for upload_file in files:
-        file_bytes = await upload_file.read()
-        new_file = await save_file_to_db(
-            user_id=user_id,
-            folder_id=folder_id,
-            file_id=new_idx,
-            file_name=upload_file.filename,
-            file_bytes=file_bytes,
-            folder_dir=folder_dir,
-            file_type=os.path.splitext(upload_file.filename)[1].lstrip("."),
-            db=db
-        )
-        new_idx += 1
-        uploaded_files.append(new_file)
-
-    # 폴더 상태 업데이트
-    folder.file_cnt = (folder.file_cnt or 0) + len(uploaded_files)
+    # 1) 모든 파일을 임시 파일로 저장 + 해시 (threadpool, DB 잠금 없음)
+    saved = []
+    try:
+        for upload_file in files:
+            saved.append((upload_file.filename, *await save_temp(upload_file.file)))
+
+        # 2) FILE_ID는 시퀀스에서 한 번에 할당, blob 등록은 한 단계로 (해시 순서로 잠금)
+        file_ids = await db.run_sync(allocate_file_ids, len(saved))
+        uploaded_files = await db.run_sync(register_files, user_id, folder_id, [
+            (file_id, filename, tmp_path, size, file_hash)
+            for file_id, (filename, tmp_path, size, file_hash) in zip(file_ids, saved)
+        ])
+    finally:
+        # blob으로 옮기지 못한 임시 파일 정리
+        for _, tmp_path, _, _ in saved:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    # 일괄 insert + 폴더 상태 업데이트 후 한 번만 commit
+    await db.run_sync(insert_files, folder_id, uploaded_files)
+    await db.run_sync(enqueue_new_files, uploaded_files)
+    await db.run_sync(apply_delta, folder_id, added=stats_of(uploaded_files))     # 폴더 통계 (파일 수 포함)
     folder.last_work = datetime.now()
-    db.commit()
+    await db.commit()
+    extractor_dispatcher.notify()
+    progress_hub.touch(folder_id)
 
     # 지원/미지원 파일 분리
     result_supported = []
@@ -220,13 +215,13 @@ async def upload_files(
 
     for f in uploaded_files:
         entry = {
-            "file_id": f.file_id,
-            "file_name": f.file_name,
-            "file_path": f.file_path,
-            "file_type": f.file_type,
-            "uploaded_at": f.uploaded_at
+            "file_id": f["file_id"],
+            "file_name": f["file_name"],
+            "file_path": f["file_path"],
+            "file_type": f["file_type"],
+            "uploaded_at": f["uploaded_at"]
         }
-        if f.file_type not in SUPPORTED_EXTENSIONS:
+        if f["file_type"] not in SUPPORTED_EXTENSIONS:
             result_unsupported.append(entry)
         else:
             result_supported.append(entry)
@@ -248,16 +243,26 @@ def delete_file(file_id: int, db: Session = Depends(get_db)):
     if not file:
         raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다.")
 
-    # 실제 파일도 삭제 (파일 경로 존재 시)
-    if file.file_path and os.path.exists(file.file_path):
+    file_hash = file.file_hash
+    if file_hash:
+        # blob 참조 해제 (마지막 참조일 때만 실제 파일 삭제)
+        release_blob(db, file_hash)
+    elif file.file_path and os.path.exists(file.file_path):
+        # 해시가 없는 예전 파일은 경로를 바로 삭제
         try:
             os.remove(file.file_path)
         except Exception as e:
             print(f"[파일 삭제 실패] {e}")
 
-    # DB에서 삭제
+    # DB에서 삭제 (아직 보내지 않은 extractor 요청 포함)
+    discard_extraction(db, file_id=file_id)
+    folder_id = file.folder_id
+    if folder_id:
+        apply_delta(db, folder_id, removed=file_stats(file))
     db.delete(file)
     db.commit()
+    reclaim_blobs(db, [file_hash])
+    progress_hub.touch(folder_id)
 
     return {"message": f"{file.file_name} 삭제 완료", "file_id": file_id}
 
@@ -269,11 +274,10 @@ def delete_file(file_id: int, db: Session = Depends(get_db)):
 async def unzip_zip(
     folder_id: int,
     zip_file_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    new_idx = get_new_idx(db)
-    folder = db.query(Folder).filter(Folder.folder_id == folder_id).first()
-    zip_file = db.query(FileModel).filter(FileModel.file_id == zip_file_id).first()
+    folder = await db.get(Folder, folder_id)
+    zip_file = await db.get(FileModel, zip_file_id)
     if not folder:
         raise HTTPException(status_code=404, detail="폴더를 찾을 수 없습니다.")
     if not zip_file:
@@ -285,45 +289,37 @@ async def unzip_zip(
     if not os.path.exists(zip_path):
         raise HTTPException(status_code=400, detail="zip 파일 경로가 존재하지 않습니다.")
 
-    base_dir = "../uploaded_files"
-    folder_dir = os.path.join(base_dir)
-    extracted_files = []
-
-    with zipfile.ZipFile(zip_path, "r") as zip_ref:
-        for member in zip_ref.infolist():
-            if member.is_dir():
-                continue
-            try:
-                # zip 내부 기본 인코딩(cp437)으로 변환 시도
-                raw_name = member.filename.encode('cp437')
-                try:
-                    decoded_name = raw_name.decode('euc-kr')   # 알집 등 한글 ZIP
-                except UnicodeDecodeError:
-                    decoded_name = raw_name.decode('utf-8', errors='replace')
-            except Exception:
-                # cp437 인코딩 실패 시 그냥 utf-8로 시도
-                decoded_name = member.filename
-            
-            filename = os.path.basename(decoded_name)
-                    
-            file_bytes = zip_ref.read(member)
-            new_file = await save_file_to_db(
-                file_id=new_idx,
-                user_id=zip_file.user_id,
-                folder_id=folder_id,
-                file_name=filename,
-                file_bytes=file_bytes,
-                folder_dir=folder_dir,
-                file_type=os.path.splitext(member.filename)[1].lstrip("."),
-                db=db
-            )
-            new_idx += 1
-            extracted_files.append(new_file)
-
-    folder.file_cnt = (folder.file_cnt or 0) + len(extracted_files)
+
+    # 압축 해제는 threadpool에서 chunk 단위로 (제한 초과 시 중단)
+    try:
+        members = await run_in_threadpool(extract_to_temp, zip_path)
+    except ArchiveLimitError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="올바른 zip 파일이 아닙니다.")
+
+    try:
+        file_ids = await db.run_sync(allocate_file_ids, len(members))
+        extracted_files = await db.run_sync(register_files, zip_file.user_id, folder_id, [
+            (file_id, filename, tmp_path, size, file_hash)
+            for (filename, tmp_path, size, file_hash), file_id in zip(members, file_ids)
+        ])
+    finally:
+        # blob으로 옮기지 못한 임시 파일 정리
+        for _, tmp_path, _, _ in members:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    await db.run_sync(insert_files, folder_id, extracted_files)
+    await db.run_sync(enqueue_new_files, extracted_files)
+    await db.run_sync(apply_delta, folder_id, added=stats_of(extracted_files))
     folder.last_work = datetime.now()
+    zip_before = file_stats(zip_file)
     zip_file.is_classification = 4
-    db.commit()
+    await db.run_sync(apply_delta, zip_file.folder_id, added=file_stats(zip_file), removed=zip_before)
+    await db.commit()
+    extractor_dispatcher.notify()
+    progress_hub.touch(folder_id)
 
     # 지원/미지원 파일 분리
     result_supported = []
@@ -331,13 +327,13 @@ async def unzip_zip(
 
     for f in extracted_files:
         entry = {
-            "file_id": f.file_id,
-            "file_name": f.file_name,
-            "file_path": f.file_path,
-            "file_type": f.file_type,
-            "uploaded_at": f.uploaded_at
+            "file_id": f["file_id"],
+            "file_name": f["file_name"],
+            "file_path": f["file_path"],
+            "file_type": f["file_type"],
+            "uploaded_at": f["uploaded_at"]
         }
-        if f.file_type not in SUPPORTED_EXTENSIONS:
+        if f["file_type"] not in SUPPORTED_EXTENSIONS:
             result_unsupported.append(entry)
         else:
             result_supported.append(entry)
@@ -353,18 +349,22 @@ async def unzip_zip(
 # 분류되지 않은(카테고리 없는) 파일만 조회
 # ------------------------------
 @router.get("/{folder_id}/unclassified")
-def get_unclassified_files(folder_id: int, db: Session = Depends(get_db)):
+def get_unclassified_files(
+    folder_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     """
     카테고리(category)가 NULL인 파일만 반환합니다.
     즉, 분류되지 않은 파일 목록입니다.
     """
-    files = (
-        db.query(FileModel)
+    query = (
+        db.query(*LIST_COLUMNS)
         .filter(FileModel.folder_id == folder_id)
         .filter(FileModel.category == None)
-        .order_by(FileModel.uploaded_at.desc().nullslast())
-        .all()
     )
+    files, next_cursor = paginate_files(query, cursor, limit)
 
     result = [
         {
@@ -383,4 +383,4 @@ def get_unclassified_files(folder_id: int, db: Session = Depends(get_db)):
         for f in files
     ]
 
-    return {"files": result}
+    return {"files": result, "next_cursor": next_cursor}
@@ -1,16 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from datetime import datetime
-from app.database import get_db
-from app.models import Folder, File, FoldersCategory
+from typing import Optional
+from app.database import get_db, get_async_db
+from app.models import Folder, File, FoldersCategory, ClassifyJob, FolderStat
 from app.schemas import FolderCreate
+from app.utils.storage import release_blob, reclaim_blobs
+from app.utils.archive_cache import archive_cache
+from app.utils.folder_summary import summarize_folders, folder_progress
+from app.utils.folder_stats import apply_delta, stats_of
+from app.utils.classifier import submit_job, job_status, classification_worker, cancel_folder_jobs
+from app.utils.extractor import discard_extraction
+from app.utils.progress_stream import progress_hub
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate_files
 from pydantic import BaseModel
-import httpx
+import json
 
 router = APIRouter(prefix="/folders", tags=["Folders"])
 SUPPORTED_EXTENSIONS = {"pdf", "hwp", "docx", "pptx", "xlsx",
                         "jpg", "jpeg", "png", "txt"}
-CLASSIFICATOR_URL = "http://localhost:8002/new_file/"
 
 # 폴더 생성
 @router.post("/create")
@@ -51,29 +62,10 @@ def create_folder(folder: FolderCreate, db: Session = Depends(get_db)):
     }
 
 # 폴더 목록 조회 (최신순)
+# - 파일 수, 상태별/카테고리별 파일 수를 폴더 통계(FOLDER_STATS)에서 쿼리 1번으로 함께 반환
 @router.get("/{user_id}")
 def get_user_folders(user_id: int, db: Session = Depends(get_db)):
-    folders = (
-        db.query(Folder)
-        .filter(Folder.user_id == user_id)
-        .order_by(Folder.last_work.desc().nullslast())
-        .all()
-    )
-
-    result = []
-    for f in folders:
-        # 파일 개수 실시간 계산 (Files 테이블에서 COUNT)
-        file_count = db.query(File).filter(File.folder_id == f.folder_id).count()
-
-        result.append({
-            "folder_id": f.folder_id,
-            "user_id": f.user_id,   
-            "folder_name": f.folder_name,
-            "file_cnt": file_count,   # DB 실시간 카운트 반영
-            "last_work": f.last_work.isoformat() if f.last_work else None
-        })
-
-    return {"folders": result}
+    return {"folders": summarize_folders(db, user_id=user_id)}
 
 # 폴더 이름 수정
 class FolderRename(BaseModel):
@@ -122,6 +114,20 @@ def delete_folder(folder_id: int, db: Session = Depends(get_db)):
     if not folder:
         raise HTTPException(status_code=404, detail="폴더를 찾을 수 없습니다.")
     
+    # 폴더 안 파일들이 가리키는 blob 참조 해제
+    blob_refs = (
+        db.query(File.file_hash, func.count(File.file_id))
+        .filter(File.folder_id == folder_id, File.file_hash != None)
+        .group_by(File.file_hash)
+        .all()
+    )
+    for file_hash, ref_count in blob_refs:
+        release_blob(db, file_hash, ref_count)
+
+    # 아직 보내지 않은 extractor/분류 요청 취소 (삭제된 파일을 계속 보내지 않도록)
+    discard_extraction(db, folder_id=folder_id)
+    cancel_folder_jobs(db, folder_id)
+
     # 카테고리 삭제
     categories = db.query(FoldersCategory).filter(FoldersCategory.folder_id == folder_id).all()
 
@@ -135,10 +141,17 @@ def delete_folder(folder_id: int, db: Session = Depends(get_db)):
     # 폴더 안의 카테고리 없는 파일 삭제
     db.query(File).filter(File.folder_id == folder_id).delete()
 
+    # 폴더 통계 삭제
+    db.query(FolderStat).filter(FolderStat.folder_id == folder_id).delete()
+
     # 폴더 삭제
     db.delete(folder)
     db.commit()
 
+    # 참조가 0이 된 blob만 실제 삭제
+    reclaim_blobs(db, [h for h, _ in blob_refs])
+    archive_cache.drop_folder(folder_id)
+
     return {"message": "폴더 삭제 완료", "folder_id": folder_id}
 
 # 폴더 새로고침
@@ -171,12 +184,21 @@ def refresh_folder(folder_id: int, db: Session = Depends(get_db)):
 
 #  특정 폴더 내 파일 전체 조회
 @router.get("/{folder_id}/files")
-def get_files_in_folder(folder_id: int, db: Session = Depends(get_db)):
-    folder = db.query(Folder).filter(Folder.folder_id == folder_id).first()
+def get_files_in_folder(
+    folder_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    folder = db.query(Folder.folder_id).filter(Folder.folder_id == folder_id).first()
     if not folder:
         raise HTTPException(status_code=404, detail="폴더를 찾을 수 없습니다.")
 
-    files = db.query(File).filter(File.folder_id == folder_id).all()
+    query = db.query(
+        File.file_id, File.file_name, File.file_type,
+        File.is_transform, File.is_classification, File.uploaded_at
+    ).filter(File.folder_id == folder_id)
+    files, next_cursor = paginate_files(query, cursor, limit)
     file_list = [
         {
             "file_id": f.file_id,
@@ -188,137 +210,180 @@ def get_files_in_folder(folder_id: int, db: Session = Depends(get_db)):
         for f in files
     ]
 
-    return {"folder_id": folder_id, "files": file_list}
+    return {"folder_id": folder_id, "files": file_list, "next_cursor": next_cursor}
 
 # 진행현황 계산 API
 @router.get("/{folder_id}/progress")
 def get_folder_progress(folder_id: int, db: Session = Depends(get_db)):
-    folder = db.query(Folder).filter(Folder.folder_id == folder_id).first()
-    if not folder:
+    progress = folder_progress(db, folder_id=folder_id)
+    if not progress:
+        raise HTTPException(status_code=404, detail="폴더를 찾을 수 없습니다.")
+    return progress[0]
+
+# 진행현황 실시간 스트림 (Server-Sent Events)
+# - 처음에 snapshot 이벤트로 전체 값을, 이후 상태가 바뀔 때마다 progress 이벤트로 변경된 값만 전송
+@router.get("/{folder_id}/progress/stream")
+async def stream_folder_progress(folder_id: int):
+    events = progress_hub.subscribe(folder_id)
+    try:
+        first = await events.__anext__()
+    except StopAsyncIteration:
         raise HTTPException(status_code=404, detail="폴더를 찾을 수 없습니다.")
 
-    files = db.query(File).filter(File.folder_id == folder_id).all()
-    total = len(files)
-
-    if total == 0:
-        return {
-            "folder_id": folder_id,
-            "total": 0,
-            "transform_done": 0,
-            "transform_pending": 0,
-            "transform_waiting": 0,
-            "classification_done": 0,
-            "classification_pending": 0,
-            "classification_waiting": 0,
-            "transform_rate": 0,
-            "classification_rate": 0
-        }
+    async def event_stream():
+        try:
+            name, data = first
+            yield _sse(name, data)
+            async for name, data in events:
+                yield _sse(name, data)
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-    # 상태별 계산 (대기 포함)
-    transform_done = sum(f.is_transform == 2 for f in files)
-    transform_pending = sum(f.is_transform == 1 for f in files)
-    transform_waiting = sum(f.is_transform == 0 for f in files)
 
-    classification_done = sum(f.is_classification == 2 for f in files)
-    classification_pending = sum(f.is_classification == 1 for f in files)
-    classification_waiting = sum(f.is_classification == 0 for f in files)
+def _sse(name: str, data) -> str:
+    if name == "ping":
+        return ": ping\n\n"
+    return f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
 
-    transform_rate = round((transform_done / total) * 100, 1)
-    classification_rate = round((classification_done / total) * 100, 1)
+# 사용자의 모든 폴더 진행현황 (대시보드용, 폴더별 polling 대신 1번 호출)
+@router.get("/user/{user_id}/progress")
+def get_user_progress(user_id: int, db: Session = Depends(get_db)):
+    return {"user_id": user_id, "folders": folder_progress(db, user_id=user_id)}
 
-    return {
-        "folder_id": folder_id,
-        "total": total,
-        "transform_done": transform_done,
-        "transform_pending": transform_pending,
-        "transform_waiting": transform_waiting,
-        "classification_done": classification_done,
-        "classification_pending": classification_pending,
-        "classification_waiting": classification_waiting,
-        "transform_rate": transform_rate,
-        "classification_rate": classification_rate
-    }
+# 분류 요청 (작업으로 등록 후 바로 job_id 반환, 전송은 백그라운드 워커가 처리)
+# - mode=full: 변환 완료된 모든 파일을 초기화 후 재분류
+# - mode=delta: 마지막 분류 이후 카테고리 구성이 바뀌었거나 아직 분류 요청되지 않은 파일만
+@router.post("/{folder_id}/classify", status_code=202)
+async def classify_folder(folder_id: int, mode: str = "full", db: AsyncSession = Depends(get_async_db)):
+    if mode not in ("full", "delta"):
+        raise HTTPException(status_code=400, detail="mode는 full 또는 delta만 가능합니다.")
 
-# 분류 요청 
-@router.post("/{folder_id}/classify")
-async def classify_folder(folder_id: int, db: Session = Depends(get_db)):
-    folder = db.query(Folder).filter(Folder.folder_id == folder_id).first()
+    folder = await db.get(Folder, folder_id)
     if not folder:
         raise HTTPException(status_code=404, detail="폴더를 찾을 수 없습니다.")
     folder.classification_after_change = 1
+    version = folder.category_version or 0
 
-    # 해당 폴더 내 모든 파일 조회
-    files = db.query(File).filter(File.folder_id == folder_id).all()
-    if not files:
+    if not await db.scalar(select(File.file_id).where(File.folder_id == folder_id).limit(1)):
         raise HTTPException(status_code=404, detail="해당 폴더에 파일이 없습니다.")
-    
+
+    # 변환 완료된 파일만 재분류 대상
+    stmt = (
+        select(File)
+        .where(File.folder_id == folder_id)
+        .where(File.is_transform == 2)
+        .where(File.file_type.in_(SUPPORTED_EXTENSIONS))
+    )
+    if mode == "delta":
+        stmt = stmt.where((File.classified_version == None) | (File.classified_version != version))
+    files = (await db.scalars(stmt)).all()
+
     payload_files = []
+    before = stats_of(files)
     for f in files:
-        # 변환 완료된 파일만 재분류 대상
-        if f.is_transform == 2 and f.file_type in SUPPORTED_EXTENSIONS:
-            f.is_classification = 0
-            f.category = None  # 기존 카테고리 초기화
-            payload_files.append({"FILE_ID":f.file_id, "FILE_TYPE":f.file_type})
-    
-    db.commit()
+        f.is_classification = 0
+        f.category = None  # 기존 카테고리 초기화
+        f.classified_version = None     # chunk 전달에 성공하면 classifier가 version을 기록
+        payload_files.append({"FILE_ID":f.file_id, "FILE_TYPE":f.file_type})
+    await db.run_sync(apply_delta, folder_id, added=stats_of(files), removed=before)
 
     if not payload_files:
+        if mode == "delta":
+            await db.commit()
+            return {"message": "변경된 파일이 없습니다.", "job_id": None, "file_count": 0, "chunk_count": 0}
         raise HTTPException(status_code=400, detail="분류할 수 있는 파일이 없습니다.")
 
-    payload = {"files": payload_files}
+    job = await db.run_sync(submit_job, folder.user_id, folder_id, mode, payload_files, version)
+    await db.commit()
+    classification_worker.notify()
+    progress_hub.touch(folder_id)
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            res = await client.post(CLASSIFICATOR_URL, json=payload)
-            res.raise_for_status()
-            return {
-                "message": "분류 요청 완료",
-                "file_count": len(payload_files),
-                "response": res.json()
-            }
-        except httpx.ConnectError:
-            raise HTTPException(status_code=503, detail="분류 서버에 연결할 수 없습니다.")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"분류 요청 중 오류: {e}")
+    return {
+        "message": "분류 요청 접수",
+        "job_id": job.job_id,
+        "file_count": len(payload_files),
+        "chunk_count": job.chunk_cnt
+    }
 
 # 분류 실패 문서 재분류
-@router.post("/{folder_id}/classify/failed")
-async def classify_folder(folder_id: int, db: Session = Depends(get_db)):
-    folder = db.query(Folder).filter(Folder.folder_id == folder_id).first()
+@router.post("/{folder_id}/classify/failed", status_code=202)
+async def classify_failed_files(folder_id: int, db: AsyncSession = Depends(get_async_db)):
+    folder = await db.get(Folder, folder_id)
     if not folder:
         raise HTTPException(status_code=404, detail="폴더를 찾을 수 없습니다.")
     folder.classification_after_change = 1
 
     # 해당 폴더 내 모든 파일 조회
-    files = db.query(File).filter(File.folder_id == folder_id).all()
+    files = (await db.scalars(select(File).where(File.folder_id == folder_id))).all()
     if not files:
         raise HTTPException(status_code=404, detail="해당 폴더에 파일이 없습니다.")
     
     payload_files = []
+    changed = []
     for f in files:
         # 분류 실패한 파일만 재분류 대상
         if f.is_classification == 2 and f.file_type in SUPPORTED_EXTENSIONS and f.category is None:
-            f.is_classification = 0
-            f.category = None  # 기존 카테고리 초기화
-            payload_files.append({"FILE_ID":f.file_id, "FILE_TYPE":f.file_type})
-    
-    db.commit()
+            changed.append(f)
+    before = stats_of(changed)
+    for f in changed:
+        f.is_classification = 0
+        f.category = None  # 기존 카테고리 초기화
+        f.classified_version = None
+        payload_files.append({"FILE_ID":f.file_id, "FILE_TYPE":f.file_type})
+    await db.run_sync(apply_delta, folder_id, added=stats_of(changed), removed=before)
 
     if not payload_files:
         raise HTTPException(status_code=400, detail="분류할 수 있는 파일이 없습니다.")
 
-    payload = {"files": payload_files}
+    job = await db.run_sync(submit_job, folder.user_id, folder_id, "failed", payload_files,
+                            folder.category_version or 0)
+    await db.commit()
+    classification_worker.notify()
+    progress_hub.touch(folder_id)
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            res = await client.post(CLASSIFICATOR_URL, json=payload)
-            res.raise_for_status()
-            return {
-                "message": "분류 요청 완료",
-                "file_count": len(payload_files),
-                "response": res.json()
+    return {
+        "message": "분류 요청 접수",
+        "job_id": job.job_id,
+        "file_count": len(payload_files),
+        "chunk_count": job.chunk_cnt
+    }
+
+# 폴더의 분류 작업 목록 (최신순)
+@router.get("/{folder_id}/classify/jobs")
+def get_classify_jobs(folder_id: int, db: Session = Depends(get_db)):
+    jobs = (
+        db.query(ClassifyJob)
+        .filter(ClassifyJob.folder_id == folder_id)
+        .order_by(ClassifyJob.job_id.desc())
+        .limit(20)
+        .all()
+    )
+    return {
+        "folder_id": folder_id,
+        "jobs": [
+            {
+                "job_id": j.job_id,
+                "mode": j.mode,
+                "status": j.status,
+                "file_count": j.file_cnt,
+                "chunk_count": j.chunk_cnt,
+                "created_at": j.created_at,
+                "updated_at": j.updated_at
             }
-        except httpx.ConnectError:
-            raise HTTPException(status_code=503, detail="분류 서버에 연결할 수 없습니다.")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"분류 요청 중 오류: {e}")
\ No newline at end of file
+            for j in jobs
+        ]
+    }
+
+# 분류 작업 상태 조회 (chunk별 상태 포함)
+@router.get("/classify/jobs/{job_id}")
+def get_classify_job(job_id: int, db: Session = Depends(get_db)):
+    job = db.query(ClassifyJob).filter(ClassifyJob.job_id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="분류 작업을 찾을 수 없습니다.")
+    return job_status(db, job)
@@ -0,0 +1,93 @@
+# app/utils/archive.py
+import os
+import zipfile
+
+from app.utils.storage import write_temp
+
+# 압축 해제 제한 (환경 변수로 조정)
+MAX_TOTAL_SIZE = int(os.getenv("UNZIP_MAX_TOTAL_SIZE", str(2 * 1024 ** 3)))    # 해제 후 전체 크기 (기본 2GB)
+MAX_MEMBERS = int(os.getenv("UNZIP_MAX_MEMBERS", "5000"))                     # 파일 개수
+MAX_RATIO = float(os.getenv("UNZIP_MAX_RATIO", "100"))                        # 파일별 압축률 (해제 크기 / 압축 크기)
+RATIO_CHECK_MIN_SIZE = 1024 * 1024     # 이보다 작은 파일은 압축률 검사 제외 (작은 텍스트는 원래 잘 압축됨)
+
+
+class ArchiveLimitError(Exception):
+    """압축 해제 제한 초과 (압축 폭탄 등)"""
+
+
+def decode_member_name(member: zipfile.ZipInfo) -> str:
+    """ZIP 내부 파일 이름 디코딩 (알집 등 한글 ZIP은 cp437로 읽힌 euc-kr)"""
+    try:
+        # zip 내부 기본 인코딩(cp437)으로 변환 시도
+        raw_name = member.filename.encode('cp437')
+        try:
+            return raw_name.decode('euc-kr')   # 알집 등 한글 ZIP
+        except UnicodeDecodeError:
+            return raw_name.decode('utf-8', errors='replace')
+    except Exception:
+        # cp437 인코딩 실패 시 그냥 utf-8로 시도
+        return member.filename
+
+
+class _LimitedReader:
+    """
+    ZIP 멤버를 읽으면서 실제 해제된 바이트 수로 제한 검사
+    - 헤더에 적힌 크기는 조작될 수 있으므로 읽는 도중에도 확인
+    """
+
+    def __init__(self, src, member: zipfile.ZipInfo, total_read: int):
+        self._src = src
+        self._member = member
+        self._read = 0
+        self.total_read = total_read
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._src.read(size)
+        self._read += len(chunk)
+        self.total_read += len(chunk)
+
+        if self.total_read > MAX_TOTAL_SIZE:
+            raise ArchiveLimitError("압축 해제 후 전체 크기가 제한을 초과했습니다.")
+        if self._read > RATIO_CHECK_MIN_SIZE and self._read > max(self._member.compress_size, 1) * MAX_RATIO:
+            raise ArchiveLimitError(f"압축률이 비정상적으로 높은 파일입니다: {self._member.filename}")
+        return chunk
+
+
+def check_limits(members):
+    """헤더 기준 사전 검사 (파일 수, 선언된 전체 크기, 파일별 압축률)"""
+    if len(members) > MAX_MEMBERS:
+        raise ArchiveLimitError(f"ZIP 안의 파일 수가 제한({MAX_MEMBERS}개)을 초과했습니다.")
+    if sum(m.file_size for m in members) > MAX_TOTAL_SIZE:
+        raise ArchiveLimitError("압축 해제 후 전체 크기가 제한을 초과했습니다.")
+    for m in members:
+        if m.file_size > RATIO_CHECK_MIN_SIZE and m.file_size > max(m.compress_size, 1) * MAX_RATIO:
+            raise ArchiveLimitError(f"압축률이 비정상적으로 높은 파일입니다: {m.filename}")
+
+
+def extract_to_temp(zip_path: str):
+    """
+    ZIP의 각 멤버를 chunk 단위로 임시 파일에 풀고
+    [(파일 이름, 임시 경로, 크기, sha256), ...] 반환
+    - 블로킹 함수 (threadpool에서 호출), 멤버 하나를 통째로 메모리에 올리지 않음
+    - 제한 초과/오류 시 이미 만든 임시 파일은 지우고 예외를 다시 발생
+    """
+    extracted = []
+    try:
+        with zipfile.ZipFile(zip_path, "r") as zip_ref:
+            members = [m for m in zip_ref.infolist() if not m.is_dir()]
+            check_limits(members)
+
+            total_read = 0
+            for member in members:
+                filename = os.path.basename(decode_member_name(member))
+                with zip_ref.open(member) as member_file:
+                    reader = _LimitedReader(member_file, member, total_read)
+                    tmp_path, size, file_hash = write_temp(reader)
+                    total_read = reader.total_read
+                extracted.append((filename, tmp_path, size, file_hash))
+    except Exception:
+        for _, tmp_path, _, _ in extracted:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        raise
+    return extracted
@@ -0,0 +1,297 @@
+# app/utils/archive_cache.py
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from app.utils.storage import UPLOAD_DIR
+from app.utils.zipstream import iter_zip
+
+CACHE_DIR = os.getenv("ARCHIVE_CACHE_DIR", os.path.join(UPLOAD_DIR, "archive_cache"))
+CACHE_MAX_BYTES = int(os.getenv("ARCHIVE_CACHE_MAX_BYTES", str(5 * 1024 ** 3)))   # 캐시 전체 크기 상한 (기본 5GB)
+CHUNK_SIZE = 64 * 1024
+STALE_TMP_AGE = 24 * 3600   # 이보다 오래된 임시 파일은 중단된 작업으로 보고 삭제
+# 만드는 중인 아카이브 1개를 동시에 따라 읽는 최대 요청 수 (따라 읽는 요청은 threadpool 스레드를 잡고 기다림)
+MAX_FOLLOWERS = int(os.getenv("ARCHIVE_CACHE_MAX_FOLLOWERS", "16"))
+
+
+class ArchiveBusy(Exception):
+    """같은 아카이브를 따라 읽는 요청이 MAX_FOLLOWERS개 이상 (바로 거절)"""
+
+
+def content_version(entries) -> str:
+    """
+    ZIP에 들어갈 (경로, ZIP 내부 이름) 목록의 해시 = 아카이브 내용 버전
+    - blob 경로에 내용 해시가 들어 있으므로 업로드/삭제/압축 해제/카테고리 변경/분류 결과
+      (분류 서버가 DB에 직접 기록하는 것 포함) 중 무엇이 바뀌어도 값이 달라짐
+    - 다운로드 라우트가 어차피 읽는 FILES 행으로 계산하므로 추가 쿼리 없음
+    """
+    raw = json.dumps(sorted(entries), ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _scope(kind: str, name: str = None) -> str:
+    """같은 폴더 안에서 아카이브 종류 구분 (전체 / 카테고리별)"""
+    raw = f"{kind}:{name or ''}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _iter_file(f):
+    with f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+class _Build:
+    """
+    만드는 중인 아카이브 1개
+    - 압축 스레드가 임시 파일에 쓰고 size를 늘림, 받는 쪽은 size까지만 읽고 기다림
+    """
+
+    def __init__(self, tmp_path: str):
+        self.tmp_path = tmp_path
+        self.size = 0
+        self.done = False
+        self.error = None
+        self.readers = 0
+        self.stored = False
+        self._cond = threading.Condition()
+
+    def advance(self, n: int):
+        with self._cond:
+            self.size += n
+            self._cond.notify_all()
+
+    def finish(self, error: Exception = None):
+        with self._cond:
+            self.error = error
+            self.done = True
+            self._cond.notify_all()
+
+    def follow(self):
+        """처음부터 끝까지 (아직 안 써진 부분은 기다렸다가) 읽음"""
+        with open(self.tmp_path, "rb") as f:
+            pos = 0
+            while True:
+                with self._cond:
+                    while self.size == pos and not self.done:
+                        self._cond.wait()
+                    size, done, error = self.size, self.done, self.error
+                if error is not None:
+                    raise RuntimeError(f"아카이브 생성 실패: {error}")
+                while pos < size:
+                    chunk = f.read(min(CHUNK_SIZE, size - pos))
+                    if not chunk:
+                        break
+                    pos += len(chunk)
+                    yield chunk
+                if done and pos >= size:
+                    return
+
+
+class ArchiveCache:
+    """
+    폴더/카테고리 ZIP을 디스크에 보관
+    - 파일 이름: {CACHE_DIR}/{folder_id}/{scope}-{version}.zip
+    - 내용 버전이 바뀌면 다른 파일이 되므로 무효화 처리가 따로 필요 없음
+      (같은 scope의 예전 버전은 새 버전 저장 시 삭제)
+    - 전체 크기가 CACHE_MAX_BYTES를 넘으면 가장 오래 안 쓴 것부터 삭제 (LRU)
+    - 같은 아카이브의 동시 생성은 1번으로 합침 (stream)
+    """
+
+    def __init__(self, root: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES,
+                 max_followers: int = MAX_FOLLOWERS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_followers = max_followers
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # 경로 -> 크기 (오래 안 쓴 순)
+        self._total = 0
+        self._loaded = False
+        self._building = {}             # 경로 -> 만드는 중인 _Build
+
+    def _load(self):
+        """처음 쓸 때 디스크에 남아 있는 캐시를 마지막 사용 시각 순으로 등록"""
+        if self._loaded:
+            return
+        self._loaded = True
+        found = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                stat = os.stat(path)
+                if not name.endswith(".zip"):
+                    # 다른 워커가 지금 만드는 중일 수 있으므로 오래된 것만 삭제
+                    if stat.st_mtime < time.time() - STALE_TMP_AGE:
+                        os.remove(path)
+                    continue
+                found.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(found):
+            self._entries[path] = size
+            self._total += size
+
+    def path_for(self, folder_id: int, kind: str, name: str, version: str) -> str:
+        return os.path.join(self.root, str(folder_id), f"{_scope(kind, name)}-{version}.zip")
+
+    def lookup(self, path: str):
+        """캐시에 있으면 경로 (최근 사용으로 표시), 없으면 None"""
+        with self._lock:
+            self._load()
+            if not os.path.exists(path):
+                if path in self._entries:
+                    self._total -= self._entries.pop(path)
+                return None
+            if path in self._entries:
+                self._entries.move_to_end(path)
+            else:
+                # 다른 워커가 만든 캐시
+                size = os.path.getsize(path)
+                self._entries[path] = size
+                self._total += size
+        try:
+            os.utime(path)      # 재시작 후에도 LRU 순서 유지
+        except OSError:
+            pass
+        return path
+
+    def stream(self, path: str, entries):
+        """
+        캐시에 없는 아카이브를 만들면서 전송
+        - 같은 아카이브(같은 경로 = 같은 내용 버전)를 이미 만드는 중이면 새로 압축하지 않고
+          그 출력 파일을 따라 읽음 → 동시에 N명이 받아도 압축은 1번
+        - 압축은 요청과 분리된 스레드에서 진행되므로 먼저 시작한 사람이 끊어도 나머지는 계속 받음
+        - 다 만들어지고 읽는 사람이 모두 끝나면 캐시에 등록
+        - 따라 읽는 요청이 max_followers개 이상이면 ArchiveBusy
+        """
+        with self._lock:
+            build = self._building.get(path)
+            if build is not None and build.readers >= self.max_followers:
+                raise ArchiveBusy()
+            if build is None:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                build = self._building[path] = _Build(f"{path}.{uuid.uuid4().hex}.tmp")
+                open(build.tmp_path, "wb").close()     # 따라 읽는 쪽이 바로 열 수 있게 먼저 생성
+                threading.Thread(target=self._run_build, args=(path, build, entries), daemon=True).start()
+        return self._iter_output(path, build, entries)
+
+    def _run_build(self, path: str, build, entries):
+        try:
+            with open(build.tmp_path, "wb") as out:
+                for chunk in iter_zip(entries):
+                    out.write(chunk)
+                    out.flush()
+                    build.advance(len(chunk))
+            build.finish()
+        except Exception as e:
+            print(f"[아카이브 생성 실패] {path}, error={e}")
+            build.finish(error=e)
+        self._settle(path, build)
+
+    def _iter_output(self, path: str, build, entries):
+        f = None
+        with self._lock:
+            stored = build.stored
+            if not stored:
+                build.readers += 1
+            elif build.error is None:
+                # 시작 전에 이미 끝나서 캐시로 옮겨짐 → 삭제(LRU/폴더 삭제)와 겹치지 않게 잠근 채로 열어 둠
+                try:
+                    f = open(path, "rb")
+                except FileNotFoundError:
+                    pass
+        if stored:
+            if build.error is not None:
+                raise RuntimeError(f"아카이브 생성 실패: {build.error}")
+            if f is None:
+                # 옮긴 직후 삭제됨 → 다시 만듦
+                yield from self.stream(path, entries)
+                return
+            yield from _iter_file(f)
+            return
+        try:
+            yield from build.follow()
+        finally:
+            with self._lock:
+                build.readers -= 1
+            self._settle(path, build)
+
+    def _settle(self, path: str, build):
+        """압축이 끝났고 읽는 사람이 없으면 임시 파일을 캐시로 옮기거나(성공) 지움(실패)"""
+        with self._lock:
+            if not build.done or build.readers > 0 or build.stored:
+                return
+            build.stored = True
+            if self._building.get(path) is build:
+                del self._building[path]
+            if build.error is None:
+                # stored로 바뀐 뒤 읽기 시작하는 요청이 옮기기 전 경로를 보지 않도록 잠근 채로 옮김
+                try:
+                    self._store(build.tmp_path, path)
+                except OSError as e:
+                    print(f"[아카이브 캐시 저장 실패] {e}")     # 전송 중 폴더 삭제 등
+                return
+        if os.path.exists(build.tmp_path):
+            os.remove(build.tmp_path)
+
+    def _store(self, tmp_path: str, path: str):
+        """임시 파일을 캐시로 옮기고 등록 (self._lock을 잡은 상태에서 호출)"""
+        os.replace(tmp_path, path)
+        size = os.path.getsize(path)
+        scope = os.path.basename(path).split("-", 1)[0]
+        folder_dir = os.path.dirname(path)
+
+        self._load()
+        # 같은 scope의 예전 버전 삭제
+        for name in os.listdir(folder_dir):
+            old = os.path.join(folder_dir, name)
+            if old != path and name.startswith(scope + "-") and name.endswith(".zip"):
+                self._remove(old)
+        if path in self._entries:
+            self._total -= self._entries.pop(path)
+        self._entries[path] = size
+        self._total += size
+        self._evict()
+
+    def _remove(self, path: str):
+        size = self._entries.pop(path, None)
+        if size is not None:
+            self._total -= size
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def drop_folder(self, folder_id: int):
+        """폴더 삭제 시 그 폴더의 캐시 전부 삭제"""
+        folder_dir = os.path.join(self.root, str(folder_id))
+        with self._lock:
+            self._load()
+            prefix = folder_dir + os.sep
+            for path in [p for p in self._entries if p.startswith(prefix)]:
+                self._remove(path)
+        shutil.rmtree(folder_dir, ignore_errors=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._load()
+            return {
+                "files": len(self._entries),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "building": len(self._building),
+            }
+
+
+archive_cache = ArchiveCache()
@@ -0,0 +1,59 @@
+# app/utils/bcrypt_bench.py
+"""
+bcrypt cost(rounds)별 해시 시간 측정 → 지연 시간 예산 안에서 가장 높은 cost 추천
+
+    python -m app.utils.bcrypt_bench [--budget-ms 250] [--min-rounds 10] [--max-rounds 14] [--samples 5]
+
+운영 서버와 같은 CPU에서 실행할 것
+추천 값은 BCRYPT_ROUNDS, 예상 처리량은 PASSWORD_HASH_WORKERS 설정 참고용
+"""
+import argparse
+import statistics
+import time
+
+from passlib.hash import bcrypt
+
+from app.utils.security import HASH_WORKERS
+
+SAMPLE_PASSWORD = "benchmark1234"
+
+
+def measure(rounds: int, samples: int) -> float:
+    """rounds로 해시 samples번, 중앙값(초)"""
+    hasher = bcrypt.using(rounds=rounds)
+    hasher.hash(SAMPLE_PASSWORD)    # 첫 호출(백엔드 로드) 제외
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash(SAMPLE_PASSWORD)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="bcrypt cost 선택용 벤치마크")
+    parser.add_argument("--budget-ms", type=float, default=250.0, help="해시 1회 허용 지연 시간 (ms)")
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=14)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=HASH_WORKERS, help="해시 풀 프로세스 수")
+    args = parser.parse_args()
+
+    recommended = None
+    print(f"{'rounds':>6} {'median(ms)':>11} {'login/s (x' + str(args.workers) + ')':>16}")
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        elapsed = measure(rounds, args.samples)
+        print(f"{rounds:>6} {elapsed * 1000:>11.1f} {args.workers / elapsed:>16.1f}")
+        if elapsed * 1000 <= args.budget_ms:
+            recommended = rounds
+        else:
+            break   # cost가 1 오르면 시간은 약 2배, 더 측정할 필요 없음
+
+    if recommended is None:
+        print(f"\n{args.min_rounds} rounds도 예산 {args.budget_ms}ms를 넘습니다.")
+    else:
+        print(f"\n추천: BCRYPT_ROUNDS={recommended} (예산 {args.budget_ms}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+# app/utils/classifier.py
+import asyncio
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+import httpx
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import ClassifyChunk, ClassifyJob, File
+from app.utils.folder_stats import mark_dirty
+
+CLASSIFICATOR_URL = os.getenv("CLASSIFICATOR_URL", "http://localhost:8002/new_file/")
+
+CHUNK_SIZE = int(os.getenv("CLASSIFY_CHUNK_SIZE", "100"))               # chunk 1개당 파일 수
+MAX_CONCURRENCY = int(os.getenv("CLASSIFY_MAX_CONCURRENCY", "4"))       # 워커 1개의 동시 전송 수
+PER_USER_CONCURRENCY = int(os.getenv("CLASSIFY_PER_USER_CONCURRENCY", "2"))
+MAX_ATTEMPTS = 5
+REQUEST_TIMEOUT = 60.0
+POLL_INTERVAL = 5.0
+CLAIM_TIMEOUT = 300.0       # 전송중(1) 상태로 이 시간 넘게 남은 chunk는 다시 전송
+MAX_BACKOFF = 300.0
+
+
+# ------------------------------
+# 작업 등록
+# ------------------------------
+def submit_job(db: Session, user_id: int, folder_id: int, mode: str, files: List[dict],
+               version: int = None) -> ClassifyJob:
+    """
+    분류 작업을 등록하고 CHUNK_SIZE 단위 chunk로 나눠 저장 (commit은 호출한 쪽에서)
+    - files: [{"FILE_ID":..., "FILE_TYPE":...}, ...]
+    - version: 요청 시점의 폴더 CATEGORY_VERSION, chunk가 전달되면 그 파일들의 CLASSIFIED_VERSION이 됨
+    - 실제 전송은 commit 후 classification_worker.notify()로 깨운 워커가 처리
+    """
+    now = datetime.now()
+    chunks = [files[i:i + CHUNK_SIZE] for i in range(0, len(files), CHUNK_SIZE)]
+    job = ClassifyJob(
+        user_id=user_id,
+        folder_id=folder_id,
+        mode=mode,
+        status=0,
+        file_cnt=len(files),
+        chunk_cnt=len(chunks),
+        category_version=version,
+        created_at=now,
+        updated_at=now
+    )
+    for no, chunk in enumerate(chunks):
+        job.chunks.append(ClassifyChunk(
+            chunk_no=no,
+            user_id=user_id,
+            folder_id=folder_id,
+            payload=json.dumps(chunk),
+            file_cnt=len(chunk),
+            status=0,
+            attempts=0,
+            next_try_at=now,
+            updated_at=now
+        ))
+    db.add(job)
+    db.flush()      # JOB_ID 확보
+    mark_dirty(db, [folder_id])
+    return job
+
+
+def cancel_folder_jobs(db: Session, folder_id: int):
+    """
+    삭제되는 폴더의 분류 작업/chunk 제거 (폴더 삭제와 같은 트랜잭션)
+    - 이미 전송 중인 chunk는 _finish_chunk에서 작업 행이 없으면 그냥 지나감
+    """
+    db.query(ClassifyChunk).filter(ClassifyChunk.folder_id == folder_id).delete(synchronize_session=False)
+    db.query(ClassifyJob).filter(ClassifyJob.folder_id == folder_id).delete(synchronize_session=False)
+
+
+def job_status(db: Session, job: ClassifyJob) -> dict:
+    """작업 + chunk 상태 요약"""
+    counts = dict(
+        db.query(ClassifyChunk.status, func.count(ClassifyChunk.chunk_id))
+        .filter(ClassifyChunk.job_id == job.job_id)
+        .group_by(ClassifyChunk.status)
+        .all()
+    )
+    chunks = (
+        db.query(ClassifyChunk)
+        .filter(ClassifyChunk.job_id == job.job_id)
+        .order_by(ClassifyChunk.chunk_no)
+        .all()
+    )
+    return {
+        "job_id": job.job_id,
+        "folder_id": job.folder_id,
+        "mode": job.mode,
+        "status": job.status,      # 0: 대기, 1: 진행중, 2: 완료, 3: 일부 실패
+        "file_count": job.file_cnt,
+        "chunk_count": job.chunk_cnt,
+        "chunks_waiting": counts.get(0, 0),
+        "chunks_sending": counts.get(1, 0),
+        "chunks_done": counts.get(2, 0),
+        "chunks_failed": counts.get(3, 0),
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+        "chunks": [
+            {
+                "chunk_no": c.chunk_no,
+                "file_count": c.file_cnt,
+                "status": c.status,
+                "attempts": c.attempts,
+                "error": c.error
+            }
+            for c in chunks
+        ]
+    }
+
+
+# ------------------------------
+# 워커 (DB 작업은 threadpool에서)
+# ------------------------------
+def _claimable(now: datetime):
+    return or_(
+        and_(ClassifyChunk.status == 0, ClassifyChunk.next_try_at <= now),
+        and_(ClassifyChunk.status == 1,
+             ClassifyChunk.claimed_at < now - timedelta(seconds=CLAIM_TIMEOUT))
+    )
+
+
+def _claim_chunks(limit: int, busy_users: dict):
+    """
+    공정하게 다음 chunk들을 선점
+    - 사용자별 순번, 폴더별 순번 순으로 정렬해 한 사용자/폴더의 큰 작업이 다른 작업을 막지 않게 함
+    - 이 워커에서 PER_USER_CONCURRENCY만큼 전송 중인 사용자는 건너뜀
+    - 조건부 UPDATE로 선점하므로 여러 프로세스가 같은 chunk를 보내지 않음
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.now()
+        user_rank = func.row_number().over(
+            partition_by=ClassifyChunk.user_id, order_by=ClassifyChunk.chunk_id).label("user_rank")
+        folder_rank = func.row_number().over(
+            partition_by=ClassifyChunk.folder_id, order_by=ClassifyChunk.chunk_id).label("folder_rank")
+        candidates = (
+            db.query(ClassifyChunk.chunk_id, ClassifyChunk.user_id, user_rank, folder_rank)
+            .filter(_claimable(now))
+            .subquery()
+        )
+        rows = (
+            db.query(candidates.c.chunk_id, candidates.c.user_id)
+            .order_by(candidates.c.user_rank, candidates.c.folder_rank, candidates.c.chunk_id)
+            .limit(limit * 4)
+            .all()
+        )
+
+        claimed = []
+        planned = dict(busy_users)
+        for chunk_id, user_id in rows:
+            if len(claimed) >= limit:
+                break
+            if planned.get(user_id, 0) >= PER_USER_CONCURRENCY:
+                continue
+            token = uuid.uuid4().hex
+            updated = (
+                db.query(ClassifyChunk)
+                .filter(ClassifyChunk.chunk_id == chunk_id, _claimable(now))
+                .update({
+                    ClassifyChunk.status: 1,
+                    ClassifyChunk.claim_token: token,
+                    ClassifyChunk.claimed_at: now,
+                    ClassifyChunk.updated_at: now
+                }, synchronize_session=False)
+            )
+            db.commit()
+            if not updated:
+                continue
+            chunk = db.query(ClassifyChunk).filter(ClassifyChunk.chunk_id == chunk_id).first()
+            planned[user_id] = planned.get(user_id, 0) + 1
+            claimed.append((chunk.chunk_id, chunk.job_id, user_id, token, json.loads(chunk.payload)))
+
+            # 작업 상태: 대기 → 진행중
+            (
+                db.query(ClassifyJob)
+                .filter(ClassifyJob.job_id == chunk.job_id, ClassifyJob.status == 0)
+                .update({ClassifyJob.status: 1, ClassifyJob.updated_at: now}, synchronize_session=False)
+            )
+            db.commit()
+        return claimed
+    finally:
+        db.close()
+
+
+def _finish_chunk(chunk_id: int, job_id: int, token: str, error: str = None):
+    """
+    chunk 결과 기록, 남은 chunk가 없으면 작업 완료 처리
+    - 작업 행을 먼저 잠가서, 같은 작업의 마지막 chunk들이 동시에 끝나도
+      남은 chunk 수를 차례로 세게 함 (서로의 미커밋 결과를 못 봐서 완료 처리가 빠지는 일 방지)
+
+    - 전달에 성공한 chunk의 파일만 CLASSIFIED_VERSION을 기록 (최종 실패한 파일은 NULL로 남아 delta 재분류 대상)
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.now()
+        job = db.query(ClassifyJob).filter(ClassifyJob.job_id == job_id).with_for_update().first()
+        if not job:
+            return      # 폴더 삭제로 작업이 취소됨
+        chunk = (
+            db.query(ClassifyChunk)
+            .filter(ClassifyChunk.chunk_id == chunk_id, ClassifyChunk.claim_token == token)
+            .first()
+        )
+        if not chunk:
+            return      # 시간 초과로 다른 워커가 다시 가져감
+
+        chunk.claim_token = None
+        chunk.updated_at = now
+        if error is None:
+            chunk.status = 2
+            chunk.error = None
+            if job.category_version is not None:
+                file_ids = [f["FILE_ID"] for f in json.loads(chunk.payload)]
+                (
+                    db.query(File)
+                    .filter(File.file_id.in_(file_ids), File.classified_version == None)
+                    .update({File.classified_version: job.category_version}, synchronize_session=False)
+                )
+            mark_dirty(db, [job.folder_id])     # 분류 결과는 분류 서버가 FILES에 직접 기록
+        else:
+            chunk.attempts = (chunk.attempts or 0) + 1
+            chunk.error = error[:1000]
+            if chunk.attempts >= MAX_ATTEMPTS:
+                chunk.status = 3
+            else:
+                chunk.status = 0
+                chunk.next_try_at = now + timedelta(seconds=min(2 ** chunk.attempts, MAX_BACKOFF))
+        db.flush()
+
+        remaining = (
+            db.query(func.count(ClassifyChunk.chunk_id))
+            .filter(ClassifyChunk.job_id == job_id, ClassifyChunk.status.in_([0, 1]))
+            .scalar()
+        )
+        if remaining == 0:
+            failed = (
+                db.query(func.count(ClassifyChunk.chunk_id))
+                .filter(ClassifyChunk.job_id == job_id, ClassifyChunk.status == 3)
+                .scalar()
+            )
+            job.status = 3 if failed else 2
+            job.updated_at = now
+        db.commit()
+    finally:
+        db.close()
+
+
+class ClassificationWorker:
+    """
+    CLASSIFY_CHUNKS를 분류 서버로 전송하는 백그라운드 작업
+    - 동시 전송 수는 MAX_CONCURRENCY, 사용자별로는 PER_USER_CONCURRENCY로 제한
+    - 실패한 chunk는 backoff 후 재시도, MAX_ATTEMPTS 초과 시 실패로 기록
+    """
+
+    def __init__(self):
+        self._wakeup = asyncio.Event()
+        self._client = None
+        self._task = None
+        self._running = set()       # 전송 중인 asyncio task
+        self._busy_users = {}       # user_id -> 전송 중인 chunk 수
+
+    async def start(self):
+        self._client = httpx.AsyncClient(timeout=REQUEST_TIMEOUT)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        for task in list(self._running):
+            task.cancel()
+        if self._client:
+            await self._client.aclose()
+
+    def notify(self):
+        """새 작업이 commit됐음을 알림"""
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self._fill()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[분류 워커 오류] {e}")
+
+    async def _fill(self):
+        """남은 동시 전송 자리만큼 chunk를 가져와 전송 시작"""
+        free = MAX_CONCURRENCY - len(self._running)
+        if free <= 0:
+            return
+        claimed = await run_in_threadpool(_claim_chunks, free, dict(self._busy_users))
+        for chunk_id, job_id, user_id, token, files in claimed:
+            self._busy_users[user_id] = self._busy_users.get(user_id, 0) + 1
+            task = asyncio.create_task(self._send(chunk_id, job_id, user_id, token, files))
+            self._running.add(task)
+
+    async def _send(self, chunk_id: int, job_id: int, user_id: int, token: str, files: List[dict]):
+        error = None
+        try:
+            res = await self._client.post(CLASSIFICATOR_URL, json={"files": files})
+            res.raise_for_status()
+            print(f"[분류 요청 전송 완료] job={job_id}, chunk={chunk_id}, {len(files)}개")
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"[분류 요청 실패] job={job_id}, chunk={chunk_id}, error={error}")
+
+        try:
+            await run_in_threadpool(_finish_chunk, chunk_id, job_id, token, error)
+        finally:
+            self._running.discard(asyncio.current_task())
+            self._busy_users[user_id] -= 1
+            if self._busy_users[user_id] <= 0:
+                del self._busy_users[user_id]
+            # 자리가 났으니 다음 chunk 확인
+            self._wakeup.set()
+
+
+classification_worker = ClassificationWorker()
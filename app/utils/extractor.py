@@ -0,0 +1,217 @@
+# app/utils/extractor.py
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+import httpx
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, insert, or_
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import ExtractOutbox, File
+from app.utils.folder_stats import mark_dirty
+
+EXTRACTOR_SERVER_URL = os.getenv("EXTRACTOR_SERVER_URL", "http://localhost:8001/new_file/")
+
+BATCH_WINDOW = float(os.getenv("EXTRACTOR_BATCH_WINDOW", "0.5"))   # 이 시간 동안 들어온 항목을 모아서 전송 (초)
+BATCH_SIZE = int(os.getenv("EXTRACTOR_BATCH_SIZE", "200"))         # 요청 1건당 최대 파일 수
+POLL_INTERVAL = 10.0        # 알림이 없어도 outbox를 확인하는 주기 (재시도, 다른 워커의 잔여분)
+CLAIM_TIMEOUT = 60.0        # 전송중(1) 상태로 이 시간 넘게 남은 항목은 다시 전송
+MAX_BACKOFF = 300.0
+MAX_ATTEMPTS = int(os.getenv("EXTRACTOR_MAX_ATTEMPTS", "8"))    # 이만큼 실패하면 실패(2)로 두고 더 보내지 않음
+
+
+def enqueue_extraction(db: Session, rows: List[dict]):
+    """
+    extractor로 보낼 파일을 outbox에 기록 (FILES insert와 같은 트랜잭션)
+    - 실제 전송은 commit 후 extractor_dispatcher.notify()로 깨운 dispatcher가 처리
+    """
+    now = datetime.now()
+    entries = [
+        {
+            "file_id": row["file_id"],
+            "file_type": row["file_type"],
+            "status": 0,
+            "attempts": 0,
+            "next_try_at": now,
+            "created_at": now
+        }
+        for row in rows
+    ]
+    if entries:
+        db.execute(insert(ExtractOutbox), entries)
+
+
+def discard_extraction(db: Session, folder_id: int = None, file_id: int = None):
+    """
+    삭제되는 폴더/파일의 outbox 항목 제거 (파일 삭제와 같은 트랜잭션, FILES 행보다 먼저)
+    - 이미 전송 중인 항목은 _finish_batch에서 행이 없으면 그냥 지나감
+    """
+    files = db.query(File.file_id)
+    files = files.filter(File.folder_id == folder_id) if file_id is None else files.filter(File.file_id == file_id)
+    (
+        db.query(ExtractOutbox)
+        .filter(ExtractOutbox.file_id.in_(files.scalar_subquery()))
+        .delete(synchronize_session=False)
+    )
+
+
+def _claimable(now: datetime):
+    return or_(
+        and_(ExtractOutbox.status == 0, ExtractOutbox.next_try_at <= now),
+        and_(ExtractOutbox.status == 1,
+             ExtractOutbox.claimed_at < now - timedelta(seconds=CLAIM_TIMEOUT))
+    )
+
+
+def _claim_batch():
+    """
+    전송할 항목을 최대 BATCH_SIZE개 선점
+    - 토큰으로 표시해 두므로 여러 워커/프로세스가 같은 항목을 중복 전송하지 않음
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.now()
+        ids = [
+            outbox_id for (outbox_id,) in
+            db.query(ExtractOutbox.outbox_id)
+            .filter(_claimable(now))
+            .order_by(ExtractOutbox.outbox_id)
+            .limit(BATCH_SIZE)
+            .all()
+        ]
+        if not ids:
+            return None, []
+
+        token = uuid.uuid4().hex
+        (
+            db.query(ExtractOutbox)
+            .filter(ExtractOutbox.outbox_id.in_(ids), _claimable(now))
+            .update({
+                ExtractOutbox.status: 1,
+                ExtractOutbox.claim_token: token,
+                ExtractOutbox.claimed_at: now
+            }, synchronize_session=False)
+        )
+        db.commit()
+
+        items = (
+            db.query(ExtractOutbox.file_id, ExtractOutbox.file_type)
+            .filter(ExtractOutbox.claim_token == token)
+            .all()
+        )
+        return token, [{"FILE_ID": file_id, "FILE_TYPE": file_type} for file_id, file_type in items]
+    finally:
+        db.close()
+
+
+def _finish_batch(token: str, error: str = None):
+    """
+    전송 성공 시 outbox에서 삭제, 실패 시 backoff 후 재시도하도록 되돌림
+    - MAX_ATTEMPTS번 실패한 항목은 실패(2)로 남겨둠 (ERROR에 사유, 다시 선점되지 않음)
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(ExtractOutbox).filter(ExtractOutbox.claim_token == token)
+        if error is None:
+            # 추출 결과는 extractor가 FILES에 직접 기록 → 폴더 통계 재계산 기간 연장
+            file_ids = [file_id for (file_id,) in query.with_entities(ExtractOutbox.file_id).all()]
+            if file_ids:
+                folder_ids = db.query(File.folder_id).filter(File.file_id.in_(file_ids)).distinct()
+                mark_dirty(db, [folder_id for (folder_id,) in folder_ids])
+            query.delete(synchronize_session=False)
+        else:
+            now = datetime.now()
+            for entry in query.all():
+                entry.attempts = (entry.attempts or 0) + 1
+                entry.claim_token = None
+                entry.error = error[:1000]
+                if entry.attempts >= MAX_ATTEMPTS:
+                    entry.status = 2
+                    print(f"[Extractor 전송 포기] file_id={entry.file_id}, {entry.attempts}회 실패")
+                else:
+                    entry.status = 0
+                    entry.next_try_at = now + timedelta(seconds=min(2 ** entry.attempts, MAX_BACKOFF))
+        db.commit()
+    finally:
+        db.close()
+
+
+class ExtractorDispatcher:
+    """
+    outbox에 쌓인 파일을 모아서 extractor 서버로 전송하는 백그라운드 작업
+    - keep-alive 되는 AsyncClient 하나를 재사용
+    - 짧은 시간(BATCH_WINDOW) 동안 들어온 항목을 한 요청으로 묶음
+    - 실패하면 outbox에 남겨두고 지수 backoff로 재시도 (작업 유실 없음)
+    - MAX_ATTEMPTS번 실패한 항목은 실패(2) 상태로 남겨 무한 재시도하지 않음
+    """
+
+    def __init__(self):
+        self._wakeup = asyncio.Event()
+        self._client = None
+        self._task = None
+
+    async def start(self):
+        self._client = httpx.AsyncClient(timeout=10.0)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._client:
+            await self._client.aclose()
+
+    def notify(self):
+        """새 항목이 commit됐음을 알림"""
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=POLL_INTERVAL)
+                # 바로 보내지 않고 잠깐 모았다가 전송
+                await asyncio.sleep(BATCH_WINDOW)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self._drain()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[Extractor dispatcher 오류] {e}")
+
+    async def _drain(self):
+        while True:
+            token, files = await run_in_threadpool(_claim_batch)
+            if token is None:
+                return
+            if not files:
+                continue
+            error = await self._send(files)
+            await run_in_threadpool(_finish_batch, token, error)
+            if error is not None:
+                return
+
+    async def _send(self, files: List[dict]):
+        """성공하면 None, 실패하면 오류 내용"""
+        try:
+            res = await self._client.post(EXTRACTOR_SERVER_URL, json={"files": files})
+            res.raise_for_status()
+            print(f"[Extractor 요청 전송 완료] {len(files)}개")
+            return None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"[Extractor 요청 실패] {len(files)}개, error={error}")
+            return error
+
+
+extractor_dispatcher = ExtractorDispatcher()
@@ -0,0 +1,305 @@
+# app/utils/folder_stats.py
+import asyncio
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import ClassifyChunk, ExtractOutbox, File, Folder, FolderStat
+
+RECONCILE_INTERVAL = float(os.getenv("FOLDER_STATS_RECONCILE_INTERVAL", "5"))    # 재계산 주기 (초)
+RECONCILE_BATCH = int(os.getenv("FOLDER_STATS_RECONCILE_BATCH", "100"))         # 한 번에 재계산하는 최대 폴더 수
+WATCH_WINDOW = float(os.getenv("FOLDER_STATS_WATCH_WINDOW", "600"))     # 마지막으로 작업을 넘긴 뒤 이 시간 동안 재계산 (초)
+SWEEP_INTERVAL = float(os.getenv("FOLDER_STATS_SWEEP_INTERVAL", "60"))   # 전체 폴더 순환 재계산 주기 (초)
+SWEEP_BATCH = int(os.getenv("FOLDER_STATS_SWEEP_BATCH", "20"))           # 순환 재계산 1회에 계산하는 폴더 수
+
+
+def _get(row, key):
+    return row[key] if isinstance(row, dict) else getattr(row, key)
+
+
+def file_stats(row) -> Counter:
+    """
+    파일 1개가 폴더 통계에 기여하는 값
+    - row: FILES insert용 dict 또는 File 객체
+    """
+    category = _get(row, "category")
+    stats = Counter({
+        "files": 1,
+        "bytes": _get(row, "file_size") or 0,
+        f"transform:{_get(row, 'is_transform') or 0}": 1,
+        f"classification:{_get(row, 'is_classification') or 0}": 1,
+    })
+    if category:
+        stats[f"category:{category}"] += 1
+    else:
+        stats["uncategorized"] += 1
+    return stats
+
+
+def stats_of(rows) -> Counter:
+    total = Counter()
+    for row in rows:
+        total.update(file_stats(row))
+    return total
+
+
+def apply_delta(db: Session, folder_id: int, added: Counter = None, removed: Counter = None):
+    """
+    폴더 통계를 증감 (commit은 호출한 쪽에서, 변경 작업과 같은 트랜잭션)
+    - added/removed: file_stats/stats_of로 만든 Counter
+    - Folder.file_cnt도 함께 맞춤
+    """
+    delta = Counter(added or {})
+    delta.subtract(removed or {})
+
+    for key, value in delta.items():
+        if value == 0:
+            continue
+        updated = (
+            db.query(FolderStat)
+            .filter(FolderStat.folder_id == folder_id, FolderStat.stat_key == key)
+            .update({FolderStat.stat_value: FolderStat.stat_value + value}, synchronize_session=False)
+        )
+        if updated:
+            continue
+        try:
+            with db.begin_nested():
+                db.add(FolderStat(folder_id=folder_id, stat_key=key, stat_value=value))
+        except IntegrityError:
+            # 다른 요청이 같은 키를 먼저 만듦
+            (
+                db.query(FolderStat)
+                .filter(FolderStat.folder_id == folder_id, FolderStat.stat_key == key)
+                .update({FolderStat.stat_value: FolderStat.stat_value + value}, synchronize_session=False)
+            )
+
+    if delta.get("files"):
+        (
+            db.query(Folder)
+            .filter(Folder.folder_id == folder_id)
+            .update({Folder.file_cnt: func.coalesce(Folder.file_cnt, 0) + delta["files"]},
+                    synchronize_session=False)
+        )
+
+
+def move_category(db: Session, folder_id: int, old_name, new_name, count: int):
+    """카테고리 이름 변경/삭제로 count개 파일의 카테고리가 옮겨졌을 때"""
+    if not count:
+        return
+    old_key = f"category:{old_name}" if old_name else "uncategorized"
+    new_key = f"category:{new_name}" if new_name else "uncategorized"
+    apply_delta(db, folder_id, added=Counter({new_key: count}), removed=Counter({old_key: count}))
+
+
+def mark_dirty(db: Session, folder_ids):
+    """
+    extractor/분류 서버에 작업을 넘긴 폴더 표시 (commit은 호출한 쪽에서)
+    - 두 서버는 결과(IS_TRANSFORM/IS_CLASSIFICATION/CATEGORY)를 FILES에 직접 기록하므로
+      이 프로세스에서 증감할 수 없음 → 표시된 폴더만 WATCH_WINDOW 동안 재계산해서 반영
+    """
+    folder_ids = sorted({folder_id for folder_id in folder_ids if folder_id is not None})
+    if folder_ids:
+        (
+            db.query(Folder)
+            .filter(Folder.folder_id.in_(folder_ids))
+            .update({Folder.stats_dirty_at: datetime.now()}, synchronize_session=False)
+        )
+
+
+def read_stats(db: Session, folder_ids) -> dict:
+    """{folder_id: {stat_key: 값}} (DB 쓰기 없음)"""
+    result = {folder_id: {} for folder_id in folder_ids}
+    if not result:
+        return result
+    rows = (
+        db.query(FolderStat.folder_id, FolderStat.stat_key, FolderStat.stat_value)
+        .filter(FolderStat.folder_id.in_(list(result)))
+        .all()
+    )
+    for folder_id, key, value in rows:
+        result[folder_id][key] = value
+    return result
+
+
+# ------------------------------
+# 재계산 (드리프트 보정)
+# ------------------------------
+def compute_stats(db: Session, folder_id: int) -> Counter:
+    """FILES에서 폴더 통계를 처음부터 계산"""
+    rows = (
+        db.query(
+            File.is_transform,
+            File.is_classification,
+            File.category,
+            func.count(File.file_id),
+            func.sum(File.file_size),
+        )
+        .filter(File.folder_id == folder_id)
+        .group_by(File.is_transform, File.is_classification, File.category)
+        .all()
+    )
+    stats = Counter()
+    for is_transform, is_classification, category, count, size in rows:
+        stats["files"] += count
+        stats["bytes"] += size or 0
+        stats[f"transform:{is_transform or 0}"] += count
+        stats[f"classification:{is_classification or 0}"] += count
+        if category:
+            stats[f"category:{category}"] += count
+        else:
+            stats["uncategorized"] += count
+    return stats
+
+
+def has_pending_work(db: Session, folder_id: int) -> bool:
+    """아직 extractor/분류 서버로 넘기지 못한(대기/전송중) 작업이 남아 있는지"""
+    outbox = (
+        db.query(ExtractOutbox.outbox_id)
+        .filter(
+            ExtractOutbox.status.in_([0, 1]),
+            ExtractOutbox.file_id.in_(db.query(File.file_id).filter(File.folder_id == folder_id)),
+        )
+        .first()
+    )
+    if outbox:
+        return True
+    chunk = (
+        db.query(ClassifyChunk.chunk_id)
+        .filter(ClassifyChunk.folder_id == folder_id, ClassifyChunk.status.in_([0, 1]))
+        .first()
+    )
+    return chunk is not None
+
+
+def reconcile_folder(db: Session, folder_id: int) -> int:
+    """
+    폴더 통계를 FILES 기준으로 다시 맞추고 고친 키 수 반환
+    - 폴더 행을 잠가서 같은 폴더의 업로드와 겹치지 않게 함
+      (다른 워커가 잠근 폴더는 건너뜀 → 여러 워커가 같은 폴더를 중복 계산하지 않음)
+    - extractor/분류 서버가 DB에서 직접 바꾼 상태값도 여기서 반영됨
+    - STATS_RECONCILED_AT 갱신 → 다음 배치에서는 다른 폴더가 먼저 계산됨
+    - 마지막 표시(mark_dirty) 후 WATCH_WINDOW가 지났고 남은 outbox/chunk가 없으면 표시 해제
+    """
+    folder = (
+        db.query(Folder)
+        .filter(Folder.folder_id == folder_id)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if not folder:
+        db.rollback()
+        return 0
+
+    actual = compute_stats(db, folder_id)
+    stored = read_stats(db, [folder_id])[folder_id]
+
+    fixed = 0
+    for key in set(actual) | set(stored):
+        value = actual.get(key, 0)
+        if stored.get(key) == value:
+            continue
+        fixed += 1
+        if value == 0:
+            db.query(FolderStat).filter(
+                FolderStat.folder_id == folder_id, FolderStat.stat_key == key
+            ).delete(synchronize_session=False)
+        elif key in stored:
+            db.query(FolderStat).filter(
+                FolderStat.folder_id == folder_id, FolderStat.stat_key == key
+            ).update({FolderStat.stat_value: value}, synchronize_session=False)
+        else:
+            db.add(FolderStat(folder_id=folder_id, stat_key=key, stat_value=value))
+
+    if (folder.file_cnt or 0) != actual.get("files", 0):
+        folder.file_cnt = actual.get("files", 0)
+        fixed += 1
+    now = datetime.now()
+    if (folder.stats_dirty_at is not None
+            and folder.stats_dirty_at < now - timedelta(seconds=WATCH_WINDOW)
+            and not has_pending_work(db, folder_id)):
+        folder.stats_dirty_at = None
+    folder.stats_reconciled_at = now
+    db.commit()
+    return fixed
+
+
+def _reconcile_batch(dirty_only: bool, batch: int) -> int:
+    """재계산한 지 오래된 폴더부터 최대 batch개 재계산 (dirty_only: 표시된 폴더만)"""
+    db = SessionLocal()
+    try:
+        fixed = 0
+        query = db.query(Folder.folder_id)
+        if dirty_only:
+            query = query.filter(Folder.stats_dirty_at != None)
+        folder_ids = [
+            folder_id for (folder_id,) in
+            query.order_by(Folder.stats_reconciled_at, Folder.folder_id)
+            .limit(batch)
+            .all()
+        ]
+        db.rollback()
+        for folder_id in folder_ids:
+            try:
+                fixed += reconcile_folder(db, folder_id)
+            except Exception as e:
+                db.rollback()
+                print(f"[폴더 통계 재계산 실패] folder_id={folder_id}, error={e}")
+        return fixed
+    finally:
+        db.close()
+
+
+def reconcile_dirty() -> int:
+    """표시된 폴더를 재계산한 지 오래된 순으로 최대 RECONCILE_BATCH개 재계산"""
+    return _reconcile_batch(True, RECONCILE_BATCH)
+
+
+def reconcile_sweep() -> int:
+    """표시와 무관하게 전체 폴더를 재계산한 지 오래된 순으로 SWEEP_BATCH개씩 재계산 (표시가 누락된 드리프트 보정)"""
+    return _reconcile_batch(False, SWEEP_BATCH)
+
+
+class StatsReconciler:
+    """
+    RECONCILE_INTERVAL마다 표시된(mark_dirty) 폴더의 통계를 재계산하는 백그라운드 작업
+    - FILES 전체를 훑지 않고, 최근 extractor/분류 서버에 작업을 넘긴 폴더만 계산
+    - SWEEP_INTERVAL마다 전체 폴더도 조금씩 돌아가며 계산
+    """
+
+    def __init__(self):
+        self._task = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_sweep = loop.time() + SWEEP_INTERVAL
+        while True:
+            try:
+                fixed = await run_in_threadpool(reconcile_dirty)
+                if loop.time() >= next_sweep:
+                    next_sweep = loop.time() + SWEEP_INTERVAL
+                    fixed += await run_in_threadpool(reconcile_sweep)
+                if fixed:
+                    print(f"[폴더 통계 보정] {fixed}건")
+            except Exception as e:
+                print(f"[폴더 통계 재계산 오류] {e}")
+            await asyncio.sleep(RECONCILE_INTERVAL)
+
+
+stats_reconciler = StatsReconciler()
@@ -0,0 +1,130 @@
+# app/utils/folder_summary.py
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.models import File, Folder, FolderStat
+
+_STATUS_NAMES = {"0": "waiting", "1": "pending", "2": "done"}
+
+
+def _status_count(column, value):
+    return func.sum(case((column == value, 1), else_=0))
+
+
+def summarize_folders(db: Session, user_id: int = None, folder_ids=None) -> list:
+    """
+    폴더 목록 + 파일 수 / 상태별 수 / 카테고리별 수를 쿼리 1번으로 반환 (최신 작업순)
+    - FOLDERS LEFT JOIN FOLDER_STATS (변경 시 증감되는 통계)를 읽기만 함, FILES는 스캔하지 않음
+    """
+    query = (
+        db.query(
+            Folder.folder_id,
+            Folder.user_id,
+            Folder.folder_name,
+            Folder.last_work,
+            FolderStat.stat_key,
+            FolderStat.stat_value,
+        )
+        .outerjoin(FolderStat, FolderStat.folder_id == Folder.folder_id)
+    )
+    if user_id is not None:
+        query = query.filter(Folder.user_id == user_id)
+    if folder_ids is not None:
+        query = query.filter(Folder.folder_id.in_(folder_ids))
+
+    rows = query.order_by(Folder.last_work.desc().nullslast(), Folder.folder_id).all()
+
+    summaries = {}
+    for folder_id, owner_id, folder_name, last_work, key, value in rows:
+        summary = summaries.get(folder_id)
+        if summary is None:
+            summary = summaries[folder_id] = {
+                "folder_id": folder_id,
+                "user_id": owner_id,
+                "folder_name": folder_name,
+                "file_cnt": 0,
+                "file_bytes": 0,
+                "last_work": last_work.isoformat() if last_work else None,
+                "transform": {"waiting": 0, "pending": 0, "done": 0},
+                "classification": {"waiting": 0, "pending": 0, "done": 0},
+                "categories": {},
+                "uncategorized_cnt": 0
+            }
+        if key is None or not value:
+            continue    # 통계 없는 폴더 (LEFT JOIN의 빈 행)
+
+        if key == "files":
+            summary["file_cnt"] = value
+        elif key == "bytes":
+            summary["file_bytes"] = value
+        elif key == "uncategorized":
+            summary["uncategorized_cnt"] = value
+        elif key.startswith("category:"):
+            summary["categories"][key[len("category:"):]] = value
+        else:
+            kind, _, status = key.partition(":")
+            if kind in ("transform", "classification") and status in _STATUS_NAMES:
+                summary[kind][_STATUS_NAMES[status]] = value
+
+    return list(summaries.values())
+
+
+def _progress_entry(folder_id, total, t_waiting, t_pending, t_done, c_waiting, c_pending, c_done) -> dict:
+    total = total or 0
+    transform_done = t_done or 0
+    classification_done = c_done or 0
+    return {
+        "folder_id": folder_id,
+        "total": total,
+        "transform_done": transform_done,
+        "transform_pending": t_pending or 0,
+        "transform_waiting": t_waiting or 0,
+        "classification_done": classification_done,
+        "classification_pending": c_pending or 0,
+        "classification_waiting": c_waiting or 0,
+        "transform_rate": round((transform_done / total) * 100, 1) if total else 0,
+        "classification_rate": round((classification_done / total) * 100, 1) if total else 0
+    }
+
+
+def progress_from_summary(summary: dict) -> dict:
+    """summarize_folders 결과(FOLDER_STATS)로 folder_progress와 같은 형식의 진행 현황 생성 (FILES 집계 없음)"""
+    transform, classification = summary["transform"], summary["classification"]
+    return _progress_entry(
+        summary["folder_id"], summary["file_cnt"],
+        transform["waiting"], transform["pending"], transform["done"],
+        classification["waiting"], classification["pending"], classification["done"],
+    )
+
+
+def folder_progress(db: Session, folder_id: int = None, user_id: int = None) -> list:
+    """
+    변환/분류 진행 현황을 조건부 집계 쿼리 1번으로 계산
+    - folder_id: 해당 폴더만, user_id: 사용자의 모든 폴더
+    - 존재하지 않는 폴더는 결과에 없음, 파일 없는 폴더는 0으로 채워짐
+    """
+    query = (
+        db.query(
+            Folder.folder_id,
+            func.count(File.file_id),
+            _status_count(File.is_transform, 0),
+            _status_count(File.is_transform, 1),
+            _status_count(File.is_transform, 2),
+            _status_count(File.is_classification, 0),
+            _status_count(File.is_classification, 1),
+            _status_count(File.is_classification, 2),
+        )
+        .outerjoin(File, File.folder_id == Folder.folder_id)
+    )
+    if folder_id is not None:
+        query = query.filter(Folder.folder_id == folder_id)
+    if user_id is not None:
+        query = query.filter(Folder.user_id == user_id)
+
+    rows = (
+        query
+        .group_by(Folder.folder_id, Folder.last_work)
+        .order_by(Folder.last_work.desc().nullslast(), Folder.folder_id)
+        .all()
+    )
+    return [_progress_entry(*row) for row in rows]
@@ -0,0 +1,196 @@
+# app/utils/http_range.py
+import os
+import secrets
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+CHUNK_SIZE = 64 * 1024
+MAX_RANGES = 16         # 이보다 많은 구간 요청은 무시하고 전체 전송 (RFC 9110 허용)
+
+
+def file_etag(path: str, file_hash: str = None) -> str:
+    """
+    강한 ETag
+    - blob 파일은 내용 해시 그대로 (같은 내용이면 어느 경로/서버에서도 같은 값)
+    - 해시가 없는 예전 파일은 크기 + 수정 시각
+    """
+    if file_hash:
+        return f'"{file_hash}"'
+    stat = os.stat(path)
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def _etag_matches(header: str, etag: str, weak: bool) -> bool:
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if weak and candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def _not_modified_since(header: str, mtime: float) -> bool:
+    try:
+        return int(mtime) <= parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+def parse_range(header: str, size: int):
+    """
+    "bytes=0-99,200-" → [(0, 99), (200, size-1)] (겹치거나 붙은 구간은 합침)
+    - 형식이 잘못됐으면 None (Range 무시 → 전체 전송)
+    - 만족하는 구간이 하나도 없으면 [] (416)
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec:
+        return None
+
+    ranges = []
+    for part in spec.split(","):
+        start, sep, end = part.strip().partition("-")
+        if not sep:
+            return None
+        try:
+            if start == "":
+                # 끝에서 n바이트
+                length = int(end)
+                if length <= 0 or size == 0:
+                    continue    # 빈 파일에는 만족하는 구간이 없음 (416)
+                ranges.append((max(size - length, 0), size - 1))
+                continue
+            first = int(start)
+            last = int(end) if end else None
+        except ValueError:
+            return None
+        if last is not None and first > last:
+            return None
+        if first >= size:
+            continue
+        if last is None:
+            last = size - 1
+        ranges.append((first, min(last, size - 1)))
+
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    merged = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def _iter_range(path: str, first: int, last: int):
+    with open(path, "rb") as f:
+        f.seek(first)
+        remaining = last - first + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _iter_multipart(path: str, ranges, size: int, media_type: str, boundary: str):
+    for first, last in ranges:
+        yield (
+            f"--{boundary}\r\n"
+            f"Content-Type: {media_type}\r\n"
+            f"Content-Range: bytes {first}-{last}/{size}\r\n\r\n"
+        ).encode("ascii")
+        yield from _iter_range(path, first, last)
+        yield b"\r\n"
+    yield f"--{boundary}--\r\n".encode("ascii")
+
+
+def _multipart_length(ranges, size: int, media_type: str, boundary: str) -> int:
+    total = len(f"--{boundary}--\r\n")
+    for first, last in ranges:
+        total += len(
+            f"--{boundary}\r\n"
+            f"Content-Type: {media_type}\r\n"
+            f"Content-Range: bytes {first}-{last}/{size}\r\n\r\n"
+        )
+        total += last - first + 1 + 2
+    return total
+
+
+def range_file_response(
+    request: Request,
+    path: str,
+    etag: str,
+    media_type: str = "application/octet-stream",
+    headers: dict = None,
+) -> Response:
+    """
+    조건부 / 구간 요청을 처리하는 파일 응답
+    - If-None-Match(없으면 If-Modified-Since)가 맞으면 304
+    - Range가 있으면 206 (구간 1개: 그대로, 여러 개: multipart/byteranges), 범위 밖이면 416
+    - If-Range가 현재 ETag/Last-Modified와 다르면 Range를 무시하고 전체 200
+    """
+    stat = os.stat(path)
+    size = stat.st_size
+    last_modified = formatdate(stat.st_mtime, usegmt=True)
+    base_headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Accept-Ranges": "bytes",
+        **(headers or {}),
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag, weak=True):
+            return Response(status_code=304, headers=base_headers)
+    elif _not_modified_since(request.headers.get("if-modified-since"), stat.st_mtime):
+        return Response(status_code=304, headers=base_headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and if_range is not None:
+        # 강한 비교: 클라이언트가 가진 조각이 지금 파일과 같을 때만 이어받기
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            if if_range.strip() != etag:
+                range_header = None
+        elif if_range.strip() != last_modified:
+            range_header = None
+
+    ranges = parse_range(range_header, size) if range_header else None
+    if ranges is None:
+        return FileResponse(path, media_type=media_type, headers=base_headers, stat_result=stat)
+
+    if not ranges:
+        return Response(status_code=416, headers={**base_headers, "Content-Range": f"bytes */{size}"})
+
+    if len(ranges) == 1:
+        first, last = ranges[0]
+        return StreamingResponse(
+            _iter_range(path, first, last),
+            status_code=206,
+            media_type=media_type,
+            headers={
+                **base_headers,
+                "Content-Range": f"bytes {first}-{last}/{size}",
+                "Content-Length": str(last - first + 1),
+            },
+        )
+
+    boundary = secrets.token_hex(16)
+    return StreamingResponse(
+        _iter_multipart(path, ranges, size, media_type, boundary),
+        status_code=206,
+        media_type=f"multipart/byteranges; boundary={boundary}",
+        headers={
+            **base_headers,
+            "Content-Length": str(_multipart_length(ranges, size, media_type, boundary)),
+        },
+    )
@@ -0,0 +1,62 @@
+# app/utils/naming.py
+import os
+import re
+from sqlalchemy.orm import Session
+
+from app.models import File as FileModel, Folder
+
+_SUFFIX_RE = re.compile(r"^(.*)\((\d+)\)$")
+
+
+def _split(file_name: str):
+    """'보고서.PDF' -> ('보고서', 'pdf')"""
+    name, ext = os.path.splitext(file_name)
+    return name, ext.lstrip(".").lower()
+
+
+class NameResolver:
+    """
+    폴더 내 표시 이름 중복 처리 ('name.ext' → 'name(1).ext' → 'name(2).ext' ...)
+    - 폴더의 기존 이름을 배치당 한 번만 읽어 (stem, ext)별 다음 번호를 메모리에 유지
+    - 생성 시 폴더 행을 잠그므로(FOR UPDATE) 같은 폴더에 동시에 들어온 배치는
+      commit 전까지 직렬화됨 → insert 직전에 만들고 같은 트랜잭션에서 commit할 것
+    """
+
+    def __init__(self, db: Session, folder_id: int):
+        db.query(Folder).filter(Folder.folder_id == folder_id).with_for_update().first()
+
+        self._next = {}     # (stem, ext) -> 다음에 붙일 번호 (0이면 번호 없이 사용 가능)
+        names = (
+            db.query(FileModel.file_name)
+            .filter(FileModel.folder_id == folder_id)
+            .all()
+        )
+        for (file_name,) in names:
+            if file_name:
+                self._register(file_name)
+
+    def _bump(self, key, value: int):
+        if self._next.get(key, 0) < value:
+            self._next[key] = value
+
+    def _register(self, display_name: str):
+        stem, ext = os.path.splitext(display_name)
+        ext = ext[1:]
+        # 'stem.ext' 자체가 사용 중
+        self._bump((stem, ext), 1)
+        # 'base(n).ext' 형태면 base의 다음 번호는 n+1
+        m = _SUFFIX_RE.match(stem)
+        if m:
+            self._bump((m.group(1), ext), int(m.group(2)) + 1)
+
+    def resolve(self, file_name: str) -> str:
+        """업로드된 원본 이름 → 폴더 내에서 겹치지 않는 표시 이름"""
+        name, ext = _split(file_name)
+        count = self._next.get((name, ext), 0)
+        suffix = f".{ext}" if ext else ""     # 확장자 없는 이름은 점 없이
+        if count == 0:
+            display_name = f"{name}{suffix}"
+        else:
+            display_name = f"{name}({count}){suffix}"
+        self._register(display_name)
+        return display_name
@@ -0,0 +1,52 @@
+# app/utils/offload.py
+import os
+import urllib.parse
+
+from fastapi.responses import Response
+
+from app.utils.storage import UPLOAD_DIR
+
+# 파일 전송을 앞단 프록시에 맡기는 방식
+# - "" (기본): 파이썬 워커가 직접 전송
+# - "x-accel": nginx (X-Accel-Redirect, internal location으로 내부 이동)
+# - "x-sendfile": Apache mod_xsendfile / lighttpd (X-Sendfile, 실제 경로)
+FILE_OFFLOAD = os.getenv("FILE_OFFLOAD", "").strip().lower()
+
+# X-Accel-Redirect: OFFLOAD_ROOT 아래 경로를 OFFLOAD_PREFIX 아래 URI로 바꿔서 전달
+# (nginx의 internal location이 OFFLOAD_ROOT를 alias로 가리켜야 함, nginx/join-back.conf 참고)
+OFFLOAD_ROOT = os.path.abspath(os.getenv("FILE_OFFLOAD_ROOT", UPLOAD_DIR))
+OFFLOAD_PREFIX = "/" + os.getenv("FILE_OFFLOAD_PREFIX", "/_protected/").strip("/") + "/"
+
+
+def _internal_uri(path: str):
+    """OFFLOAD_ROOT 밖의 경로면 None (프록시에 노출하지 않음)"""
+    real = os.path.abspath(path)
+    try:
+        relative = os.path.relpath(real, OFFLOAD_ROOT)
+    except ValueError:
+        return None     # 다른 드라이브 (Windows)
+    if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+        return None
+    return OFFLOAD_PREFIX + urllib.parse.quote(relative.replace(os.sep, "/"))
+
+
+def offload_response(path: str, media_type: str, headers: dict = None):
+    """
+    프록시가 파일을 직접 보내도록 하는 빈 응답, 사용하지 않거나 맡길 수 없는 경로면 None
+    - 본문/Range/조건부 요청은 프록시가 처리, 여기서는 헤더(Content-Type, Content-Disposition)만
+    """
+    if FILE_OFFLOAD == "x-accel":
+        uri = _internal_uri(path)
+        if uri is None:
+            return None
+        offload_header = {"X-Accel-Redirect": uri}
+    elif FILE_OFFLOAD == "x-sendfile":
+        offload_header = {"X-Sendfile": os.path.abspath(path)}
+    else:
+        return None
+
+    return Response(
+        content=b"",
+        media_type=media_type,
+        headers={**(headers or {}), **offload_header},
+    )
@@ -0,0 +1,73 @@
+# app/utils/pagination.py
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+from app.models import File
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(uploaded_at, file_id: int) -> str:
+    """마지막 행의 (uploaded_at, file_id) → 다음 페이지 요청용 문자열"""
+    raw = json.dumps([uploaded_at.isoformat() if uploaded_at else None, file_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str):
+    try:
+        uploaded_at, file_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return (datetime.fromisoformat(uploaded_at) if uploaded_at else None), int(file_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="잘못된 cursor 값입니다.")
+
+
+def paginate_files(query, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    """
+    FILES 조회를 (uploaded_at DESC NULLS LAST, file_id DESC) 순서로 keyset 페이지 처리
+    - query는 File.file_id, File.uploaded_at 컬럼을 포함해야 함
+    - OFFSET 없이 마지막 행 다음부터 limit개만 읽음
+    - 시각이 있는 행 → 시각 없는 행 순서로 나눠서 읽음
+      (한 쿼리로 NULLS LAST 정렬하면 Oracle DESC 기본 순서(NULLS FIRST)인
+       (…, UPLOADED_AT, FILE_ID) 인덱스 순서와 달라 SORT ORDER BY가 생김,
+       UPLOADED_AT IS NOT NULL / IS NULL 구간은 각각 인덱스 순서 그대로 읽힘)
+    - (행 목록, 다음 cursor 또는 None) 반환
+    """
+    last_uploaded_at, last_file_id = decode_cursor(cursor) if cursor else (None, None)
+
+    rows = []
+    if not cursor or last_uploaded_at is not None:
+        # 시각이 있는 구간
+        dated = query.filter(File.uploaded_at != None)
+        if cursor:
+            dated = dated.filter(or_(
+                File.uploaded_at < last_uploaded_at,
+                and_(File.uploaded_at == last_uploaded_at, File.file_id < last_file_id)
+            ))
+        rows = (
+            dated
+            .order_by(File.uploaded_at.desc(), File.file_id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+    if len(rows) <= limit:
+        # 시각 없는 구간 (맨 뒤): file_id 순
+        undated = query.filter(File.uploaded_at == None)
+        if cursor and last_uploaded_at is None:
+            undated = undated.filter(File.file_id < last_file_id)
+        rows += (
+            undated
+            .order_by(File.file_id.desc())
+            .limit(limit + 1 - len(rows))
+            .all()
+        )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].uploaded_at, rows[-1].file_id)
+    return rows, next_cursor
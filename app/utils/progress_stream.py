@@ -0,0 +1,142 @@
+# app/utils/progress_stream.py
+import asyncio
+import os
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.database import SessionLocal
+from app.utils.folder_summary import progress_from_summary, summarize_folders
+
+POLL_INTERVAL = float(os.getenv("PROGRESS_POLL_INTERVAL", "2.0"))   # 구독자가 있는 폴더만 이 주기로 다시 읽음 (초)
+HEARTBEAT_INTERVAL = 15.0   # 변화가 없을 때 연결 유지용 ping
+
+
+def _load_progress(folder_id: int):
+    """
+    FOLDER_STATS에서 진행 현황을 읽음 (FILES GROUP BY 없이 폴더의 통계 행만)
+    - 이 서버의 변경은 같은 트랜잭션에서 증감되어 바로 보이고,
+      extractor/분류 서버가 바꾼 상태는 StatsReconciler가 표시된 폴더를 재계산할 때 반영됨
+    """
+    db = SessionLocal()
+    try:
+        summaries = summarize_folders(db, folder_ids=[folder_id])
+        return progress_from_summary(summaries[0]) if summaries else None
+    finally:
+        db.close()
+
+
+class _Subscriber:
+    """구독자 1명: 아직 못 보낸 변경분을 합쳐서 최신 값만 유지 (느린 클라이언트도 메모리 일정)"""
+
+    def __init__(self):
+        self.pending = {}
+        self.event = asyncio.Event()
+
+    def push(self, delta: dict):
+        self.pending.update(delta)
+        self.event.set()
+
+    def take(self) -> dict:
+        delta, self.pending = self.pending, {}
+        self.event.clear()
+        return delta
+
+
+class _FolderWatcher:
+    """
+    폴더 1개의 진행현황 감시
+    - 구독자 수와 관계없이 워커당 조회 1번으로 모든 구독자에게 전달
+    - 파일 상태는 extractor/분류 서버가 DB에 직접 바꾸므로 주기적으로 FOLDER_STATS를 다시 읽어서 변경분만 push
+    """
+
+    def __init__(self, folder_id: int, snapshot: dict):
+        self.folder_id = folder_id
+        self.last = snapshot
+        self.subscribers = set()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def wake(self):
+        self._wakeup.set()
+
+    def close(self):
+        self._task.cancel()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                current = await run_in_threadpool(_load_progress, self.folder_id)
+            except Exception as e:
+                print(f"[진행현황 조회 실패] folder_id={self.folder_id}, error={e}")
+                continue
+            if current is None:
+                continue
+
+            delta = {k: v for k, v in current.items() if self.last.get(k) != v}
+            self.last = current
+            if delta:
+                delta["folder_id"] = self.folder_id
+                for sub in self.subscribers:
+                    sub.push(delta)
+
+
+class ProgressHub:
+    """폴더별 진행현황 구독 관리 (프로세스 내)"""
+
+    def __init__(self):
+        self._watchers = {}     # folder_id -> _FolderWatcher
+        self._loop = None
+
+    async def subscribe(self, folder_id: int):
+        """
+        ("snapshot", 전체) 한 번 → 이후 ("progress", 변경분) / ("ping", None) 을 계속 생성
+        - 폴더가 없으면 아무것도 생성하지 않고 종료
+        """
+        self._loop = asyncio.get_running_loop()
+        watcher = self._watchers.get(folder_id)
+        if watcher is None:
+            snapshot = await run_in_threadpool(_load_progress, folder_id)
+            if snapshot is None:
+                return
+            watcher = self._watchers.get(folder_id)
+            if watcher is None:
+                watcher = self._watchers[folder_id] = _FolderWatcher(folder_id, snapshot)
+
+        sub = _Subscriber()
+        watcher.subscribers.add(sub)
+        try:
+            yield "snapshot", dict(watcher.last)
+            while True:
+                try:
+                    await asyncio.wait_for(sub.event.wait(), timeout=HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield "ping", None
+                    continue
+                yield "progress", sub.take()
+        finally:
+            watcher.subscribers.discard(sub)
+            if not watcher.subscribers and self._watchers.get(folder_id) is watcher:
+                watcher.close()
+                del self._watchers[folder_id]
+
+    def touch(self, folder_id: int):
+        """
+        이 서버에서 폴더 내용을 바꿨을 때 호출 → 다음 주기를 기다리지 않고 바로 다시 읽음
+        - 구독자가 없으면 아무 일도 하지 않음, 동기 라우트(threadpool)에서 호출해도 안전
+        """
+        watcher = self._watchers.get(folder_id)
+        if watcher is None or self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(watcher.wake)
+        except RuntimeError:
+            pass    # 이벤트 루프 종료 중
+
+
+progress_hub = ProgressHub()
@@ -1,12 +1,81 @@
 from passlib.context import CryptContext
 from jose import jwt
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import json
+import multiprocessing
+import os
 import secrets
+import threading
 
-SECRET_KEY = secrets.token_hex(32)
 ALGORITHM = "HS256"
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# ------------------------------
+# JWT 서명 키 (kid별, 교체 가능)
+# ------------------------------
+def load_signing_keys():
+    """
+    (서명에 쓸 kid, {kid: secret}) 반환 — 모든 워커/노드가 같은 설정을 읽어야 토큰이 서로 통함
+    - JWT_KEYS_FILE: {"active": "2025-01", "keys": {"2025-01": "...", "2024-12": "..."}} 형식의 JSON 파일
+    - JWT_SIGNING_KEYS: "kid:secret,kid:secret" (JWT_ACTIVE_KID로 서명 키 선택, 없으면 첫 번째)
+    - JWT_SECRET_KEY: 키 1개 (kid "default")
+    - 키 교체: 새 키를 추가하고 active로 지정 → 예전 키는 기존 토큰 만료 후 제거
+    - 아무 설정도 없으면 프로세스마다 임의 키 (개발용, 워커 1개에서만 동작)
+    """
+    keys_file = os.getenv("JWT_KEYS_FILE")
+    if keys_file:
+        with open(keys_file, encoding="utf-8") as f:
+            config = json.load(f)
+        keys = dict(config.get("keys") or {})
+        if not keys:
+            raise RuntimeError(f"JWT_KEYS_FILE({keys_file})에 keys가 없습니다.")
+        active = config.get("active") or next(iter(keys))
+    elif os.getenv("JWT_SIGNING_KEYS", "").strip():
+        keys = {}
+        for item in os.getenv("JWT_SIGNING_KEYS").split(","):
+            kid, _, secret = item.strip().partition(":")
+            if kid and secret:
+                keys[kid] = secret
+        if not keys:
+            raise RuntimeError("JWT_SIGNING_KEYS에 올바른 'kid:secret' 항목이 없습니다.")
+        active = os.getenv("JWT_ACTIVE_KID") or next(iter(keys))
+    elif os.getenv("JWT_SECRET_KEY"):
+        keys = {"default": os.getenv("JWT_SECRET_KEY")}
+        active = "default"
+    else:
+        print("[경고] JWT 서명 키 설정이 없어 임의 키를 사용합니다. (워커/노드 간 토큰 공유 불가)")
+        keys = {"default": secrets.token_hex(32)}
+        active = "default"
+
+    if active not in keys:
+        raise RuntimeError(f"JWT 서명 키 '{active}'가 설정에 없습니다.")
+    return active, keys
+
+
+ACTIVE_KID, SIGNING_KEYS = load_signing_keys()
+SECRET_KEY = SIGNING_KEYS[ACTIVE_KID]
+
+# verify_token 방식
+# - session: USERS.ACCESS_KEY / LAST_WORK 확인 (마지막 로그인 토큰만 유효, 30분 미사용 시 만료)
+# - stateless: JWT 서명/만료만 확인, DB 조회 없음 (토큰 만료 전까지 유효)
+AUTH_VERIFY_MODE = os.getenv("AUTH_VERIFY_MODE", "session").lower()
+
+# bcrypt cost (python -m app.utils.bcrypt_bench 로 지연 시간 예산에 맞게 선택)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# 비밀번호 해시 전용 프로세스 풀 (기본 threadpool과 분리)
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(os.cpu_count() or 2, 4))))
+HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(HASH_WORKERS * 8)))    # 실행 중 + 대기 최대 수
+# 워커 프로세스 시작 방식 (fork는 DB 연결/스레드까지 복사하므로 쓰지 않음)
+HASH_START_METHOD = os.getenv(
+    "PASSWORD_HASH_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn",
+)
 
 def hash_password(password: str) -> str:
     if len(password.encode("utf-8")) > 72:
@@ -18,16 +87,101 @@ def verify_password(plain_pw: str, hashed_pw: str) -> bool:
         plain_pw = plain_pw[:72]
     return pwd_context.verify(plain_pw, hashed_pw)
 
+class HashPoolBusy(Exception):
+    """해시 풀 대기열이 가득 참 (요청을 받지 말고 바로 거절)"""
+
+
+class PasswordHasher:
+    """
+    bcrypt를 전용 프로세스 풀에서 실행
+    - 로그인이 몰려도 폴더/파일 API가 쓰는 기본 threadpool을 점유하지 않음
+    - 실행 중 + 대기 작업이 HASH_MAX_PENDING 이상이면 HashPoolBusy
+    - 워커는 forkserver/spawn으로 시작 (이벤트 루프/DB 연결을 가진 프로세스를 fork하지 않음)
+    - 워커가 죽어 풀이 깨지면(BrokenProcessPool) 새 풀을 만들고 한 번 다시 실행
+    """
+
+    def __init__(self, workers: int = HASH_WORKERS, max_pending: int = HASH_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(HASH_START_METHOD),
+                )
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor):
+        """깨진 풀 제거 (다른 요청이 이미 새 풀로 바꿨으면 그대로 둠)"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def start(self):
+        """시작 시 워커 프로세스를 미리 띄움 (첫 로그인 요청이 프로세스 시작을 기다리지 않도록)"""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        await asyncio.gather(*(loop.run_in_executor(executor, os.getpid) for _ in range(self.workers)))
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HashPoolBusy()
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            for attempt in range(2):
+                executor = self._get_executor()
+                try:
+                    return await loop.run_in_executor(executor, func, *args)
+                except BrokenProcessPool:
+                    print("[비밀번호 해시 풀] 워커 프로세스 종료 감지, 풀을 다시 만듭니다.")
+                    self._discard(executor)
+                    if attempt:
+                        raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "pending": self._pending, "max_pending": self.max_pending}
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher()
+
+async def hash_password_async(password: str) -> str:
+    return await password_hasher.run(hash_password, password)
+
+async def verify_password_async(plain_pw: str, hashed_pw: str) -> bool:
+    return await password_hasher.run(verify_password, plain_pw, hashed_pw)
+
 def create_access_token(data: dict, expires_delta: timedelta = timedelta(hours=1)):
     to_encode = data.copy()
-    expire = datetime.utcnow() + expires_delta
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    now = datetime.utcnow()
+    to_encode.update({"iat": now, "exp": now + expires_delta})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM, headers={"kid": ACTIVE_KID})
 
 def decode_access_token(token: str):
     from jose import JWTError
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        # 헤더의 kid로 검증 키 선택 (kid 없는 예전 토큰은 현재 서명 키로)
+        kid = jwt.get_unverified_header(token).get("kid") or ACTIVE_KID
+        key = SIGNING_KEYS.get(kid)
+        if key is None:
+            raise JWTError(f"unknown kid: {kid}")
+        payload = jwt.decode(token, key, algorithms=[ALGORITHM])
         return payload
     except JWTError as e:
         raise JWTError("Invalid or expired token")
\ No newline at end of file
@@ -0,0 +1,132 @@
+# app/utils/session_cache.py
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import bindparam, or_, update
+
+from app.database import SessionLocal
+from app.models import User
+
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "60"))                     # 검증된 토큰을 DB 재확인 없이 믿는 시간 (초)
+LAST_WORK_FLUSH_INTERVAL = float(os.getenv("LAST_WORK_FLUSH_INTERVAL", "5"))    # last_work 일괄 반영 주기 (초)
+
+_users = User.__table__
+
+# 더 최근 값일 때만 갱신 (여러 워커/로그인과 겹쳐도 last_work가 뒤로 가지 않음)
+_flush_stmt = (
+    update(_users)
+    .where(_users.c.USER_ID == bindparam("uid"))
+    .where(or_(_users.c.LAST_WORK == None, _users.c.LAST_WORK < bindparam("lw")))
+    .values(LAST_WORK=bindparam("lw"))
+)
+
+
+class _Entry:
+    __slots__ = ("token", "last_work", "expires_at")
+
+    def __init__(self, token: str, last_work: datetime):
+        self.token = token
+        self.last_work = last_work
+        self.expires_at = time.monotonic() + TOKEN_CACHE_TTL
+
+
+class SessionCache:
+    """
+    verify_token용 프로세스 내 세션 캐시
+    - 사용자별 (토큰, last_work)를 TOKEN_CACHE_TTL 동안 보관 → 대부분의 검증은 DB 왕복 없음
+    - last_work 갱신은 모아뒀다가 LAST_WORK_FLUSH_INTERVAL마다 UPDATE 한 번으로 반영
+    - 이 프로세스에서 로그인하면 invalidate로 즉시 폐기, 다른 워커의 로그인은 TTL 안에 반영됨
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}      # user_id -> _Entry
+        self._dirty = {}        # user_id -> 아직 DB에 반영 안 된 last_work
+        self._task = None
+
+    def get(self, user_id: int, token: str):
+        """캐시에 같은 토큰이 있으면 last_work, 없거나 만료됐으면 None"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry.token != token:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            return entry.last_work
+
+    def load(self, user_id: int, token: str, last_work: datetime) -> datetime:
+        """DB에서 확인한 값을 캐시에 넣고, 아직 반영 안 된 더 최근 last_work가 있으면 그 값을 반환"""
+        with self._lock:
+            pending = self._dirty.get(user_id)
+            if pending is not None and (last_work is None or pending > last_work):
+                last_work = pending
+            self._entries[user_id] = _Entry(token, last_work)
+            return last_work
+
+    def touch(self, user_id: int, now: datetime):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                entry.last_work = now
+            self._dirty[user_id] = now
+
+    def invalidate(self, user_id: int):
+        """새 로그인 등으로 토큰이 바뀌었을 때"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._dirty.pop(user_id, None)
+
+    def flush(self) -> int:
+        """모아둔 last_work를 한 번에 DB에 반영하고 반영한 사용자 수 반환"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return 0
+
+        db = SessionLocal()
+        try:
+            db.execute(_flush_stmt, [{"uid": user_id, "lw": lw} for user_id, lw in dirty.items()])
+            db.commit()
+        except Exception:
+            db.rollback()
+            # 다음 주기에 다시 시도 (그 사이 더 최근 값이 생겼으면 그 값 유지)
+            with self._lock:
+                for user_id, lw in dirty.items():
+                    if self._dirty.get(user_id, lw) <= lw:
+                        self._dirty[user_id] = lw
+            raise
+        finally:
+            db.close()
+        return len(dirty)
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        # 종료 전에 남은 last_work 반영
+        try:
+            await run_in_threadpool(self.flush)
+        except Exception as e:
+            print(f"[last_work 반영 실패] {e}")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(LAST_WORK_FLUSH_INTERVAL)
+            try:
+                await run_in_threadpool(self.flush)
+            except Exception as e:
+                print(f"[last_work 반영 실패] {e}")
+
+
+session_cache = SessionCache()
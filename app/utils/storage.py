@@ -0,0 +1,252 @@
+# app/utils/storage.py
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from datetime import datetime
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import Blob
+
+UPLOAD_DIR = "../uploaded_files"
+BLOB_DIR = os.path.join(UPLOAD_DIR, "blobs")    # 실제 내용 (sha256 기준, 중복 없이 1개)
+TMP_DIR = os.path.join(UPLOAD_DIR, "tmp")       # 해시 계산 전 임시 저장
+CHUNK_SIZE = 1024 * 1024    # 1MB 단위로 복사 (업로드 1건당 메모리 사용량 상한)
+SWEEP_INTERVAL = float(os.getenv("BLOB_SWEEP_INTERVAL", "3600"))    # 고아 blob 정리 주기 (초)
+SWEEP_GRACE = float(os.getenv("BLOB_SWEEP_GRACE", "3600"))          # 이보다 최근 파일은 진행 중인 트랜잭션일 수 있어 건너뜀
+SWEEP_BATCH = 500
+
+
+def copy_to_path(src, dest_path: str, chunk_size: int = CHUNK_SIZE):
+    """
+    파일 객체(src)를 dest_path에 chunk 단위로 복사하면서 크기와 SHA-256을 계산
+    - 메모리에는 chunk 하나만 올라감
+    - 블로킹 I/O이므로 이벤트 루프가 아닌 threadpool에서 호출해야 함
+    """
+    sha = hashlib.sha256()
+    size = 0
+    try:
+        with open(dest_path, "wb") as f_out:
+            while True:
+                chunk = src.read(chunk_size)
+                if not chunk:
+                    break
+                sha.update(chunk)
+                f_out.write(chunk)
+                size += len(chunk)
+    except Exception:
+        # 중간에 실패하면 잘린 파일을 남기지 않음
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+    return size, sha.hexdigest()
+
+
+# ------------------------------
+# 내용 주소(content-addressed) 저장소
+# ------------------------------
+def blob_path_for(file_hash: str) -> str:
+    return os.path.join(BLOB_DIR, file_hash[:2], file_hash)
+
+
+def write_temp(src, chunk_size: int = CHUNK_SIZE):
+    """
+    src를 임시 파일로 저장하고 (임시 경로, 크기, sha256) 반환
+    - 블로킹 함수 (threadpool에서 호출)
+    """
+    os.makedirs(TMP_DIR, exist_ok=True)
+    tmp_path = os.path.join(TMP_DIR, uuid.uuid4().hex)
+    size, file_hash = copy_to_path(src, tmp_path, chunk_size)
+    return tmp_path, size, file_hash
+
+
+async def save_temp(src):
+    """write_temp의 비동기 버전"""
+    return await run_in_threadpool(write_temp, src)
+
+
+def acquire_blob(db: Session, tmp_path: str, size: int, file_hash: str) -> str:
+    """
+    임시 파일을 blob으로 등록하고 참조 수를 1 올린 뒤 blob 경로 반환
+    - 같은 내용이 이미 있으면 임시 파일은 버리고 기존 blob을 가리킴
+    - commit은 호출한 쪽에서 (FILES 행과 같은 트랜잭션)
+    - 파일은 commit 전에 blob 경로로 옮겨지므로, rollback되면 BLOBS 행 없는 파일이 남음
+      → sweep_orphan_blobs가 주기적으로 정리
+    """
+    path = blob_path_for(file_hash)
+
+    # 참조 수 증가 (행 잠금으로 동시 reclaim과 직렬화됨)
+    updated = (
+        db.query(Blob)
+        .filter(Blob.blob_hash == file_hash)
+        .update({Blob.ref_cnt: Blob.ref_cnt + 1}, synchronize_session=False)
+    )
+    if updated and os.path.exists(path):
+        os.remove(tmp_path)
+        return path
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(tmp_path, path)
+
+    if not updated:
+        try:
+            with db.begin_nested():
+                db.add(Blob(
+                    blob_hash=file_hash,
+                    blob_path=path,
+                    blob_size=size,
+                    ref_cnt=1,
+                    created_at=datetime.now()
+                ))
+        except IntegrityError:
+            # 다른 요청이 같은 내용을 먼저 등록함 → 참조만 증가
+            (
+                db.query(Blob)
+                .filter(Blob.blob_hash == file_hash)
+                .update({Blob.ref_cnt: Blob.ref_cnt + 1}, synchronize_session=False)
+            )
+    return path
+
+
+def release_blob(db: Session, file_hash: str, count: int = 1):
+    """
+    참조 수를 count만큼 감소 (행은 남겨둠)
+    - 실제 파일 삭제는 commit 후 reclaim_blobs에서 처리
+    """
+    (
+        db.query(Blob)
+        .filter(Blob.blob_hash == file_hash)
+        .update({Blob.ref_cnt: Blob.ref_cnt - count}, synchronize_session=False)
+    )
+
+
+def reclaim_blobs(db: Session, hashes):
+    """
+    참조가 0이 된 blob의 파일과 행을 삭제 (release_blob 트랜잭션 commit 이후 호출)
+    - 행을 잠근 상태에서 지우므로 같은 내용을 동시에 올리는 요청과 충돌하지 않음
+    """
+    for file_hash in set(h for h in hashes if h):
+        blob = (
+            db.query(Blob)
+            .filter(Blob.blob_hash == file_hash, Blob.ref_cnt <= 0)
+            .with_for_update()
+            .first()
+        )
+        if not blob:
+            db.rollback()
+            continue
+        try:
+            if os.path.exists(blob.blob_path):
+                os.remove(blob.blob_path)
+        except Exception as e:
+            print(f"[blob 삭제 실패] {file_hash}: {e}")
+            db.rollback()
+            continue
+        db.delete(blob)
+        db.commit()
+
+
+# ------------------------------
+# 고아 blob 정리
+# ------------------------------
+def _old_files(directory: str, cutoff: float):
+    """directory 아래에서 수정 시각이 cutoff 이전인 파일 (경로, mtime)"""
+    for dirpath, _, filenames in os.walk(directory):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+            if mtime < cutoff:
+                yield path, mtime
+
+
+def _remove_if_unchanged(path: str, mtime: float) -> bool:
+    """확인한 뒤 다른 요청이 같은 내용으로 다시 올렸으면(os.replace로 mtime 변경) 지우지 않음"""
+    try:
+        if os.stat(path).st_mtime != mtime:
+            return False
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+def sweep_orphan_blobs(db: Session, grace: float = SWEEP_GRACE) -> int:
+    """
+    BLOBS 행이 없는 blob 파일과 오래된 임시 파일을 삭제하고 삭제한 수 반환
+    - acquire_blob 후 rollback된 업로드가 남긴 파일이 대상
+    - grace보다 최근 파일은 아직 commit 전일 수 있으므로 건드리지 않음
+    """
+    cutoff = time.time() - grace
+    removed = 0
+
+    for path, mtime in _old_files(TMP_DIR, cutoff):
+        removed += _remove_if_unchanged(path, mtime)
+
+    batch = []
+
+    def flush():
+        nonlocal removed
+        known = {
+            h for (h,) in
+            db.query(Blob.blob_hash).filter(Blob.blob_hash.in_([h for h, _, _ in batch])).all()
+        }
+        db.rollback()
+        for file_hash, path, mtime in batch:
+            if file_hash not in known:
+                removed += _remove_if_unchanged(path, mtime)
+        batch.clear()
+
+    for path, mtime in _old_files(BLOB_DIR, cutoff):
+        batch.append((os.path.basename(path), path, mtime))
+        if len(batch) >= SWEEP_BATCH:
+            flush()
+    if batch:
+        flush()
+    return removed
+
+
+def _sweep():
+    db = SessionLocal()
+    try:
+        return sweep_orphan_blobs(db)
+    finally:
+        db.close()
+
+
+class BlobSweeper:
+    """SWEEP_INTERVAL마다 sweep_orphan_blobs를 실행하는 백그라운드 작업"""
+
+    def __init__(self):
+        self._task = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        while True:
+            try:
+                removed = await run_in_threadpool(_sweep)
+                if removed:
+                    print(f"[고아 blob 정리] {removed}개")
+            except Exception as e:
+                print(f"[고아 blob 정리 오류] {e}")
+            await asyncio.sleep(SWEEP_INTERVAL)
+
+
+blob_sweeper = BlobSweeper()
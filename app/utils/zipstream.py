@@ -0,0 +1,222 @@
+# app/utils/zipstream.py
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+BLOCK_SIZE = 1024 * 1024    # 압축 작업 단위 (파일을 이 크기로 나눠 스레드별로 압축)
+COMPRESS_LEVEL = int(os.getenv("ZIP_COMPRESS_LEVEL", "6"))
+ZIP_WORKERS = int(os.getenv("ZIP_WORKERS", str(os.cpu_count() or 2)))
+LOOKAHEAD = ZIP_WORKERS * 2     # 먼저 읽어서 압축을 맡겨두는 block 수 (메모리 ≈ LOOKAHEAD × BLOCK_SIZE × 2)
+
+# 이미 압축된 형식은 다시 압축해도 줄지 않으므로 그대로 저장 (docx/pptx/xlsx/hwpx도 내부가 ZIP)
+STORED_EXTENSIONS = {
+    "jpg", "jpeg", "png", "gif", "webp",
+    "docx", "pptx", "xlsx", "hwpx",
+    "zip", "7z", "gz", "rar",
+    "mp3", "mp4",
+}
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+_ZIP64_LIMIT = 0xFFFFFFFF
+_DEFAULT_VERSION = 20
+_ZIP64_VERSION = 45
+_CREATE_SYSTEM = 0 if os.name == "nt" else 3
+_DICT_SIZE = 32 * 1024      # deflate 창 크기 (이전 block 끝부분을 다음 block의 사전으로)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=ZIP_WORKERS, thread_name_prefix="zip")
+        return _executor
+
+
+def compression_for(arcname: str) -> int:
+    ext = os.path.splitext(arcname)[1].lstrip(".").lower()
+    return ZIP_STORED if ext in STORED_EXTENSIONS else ZIP_DEFLATED
+
+
+def _deflate_block(data: bytes, zdict: bytes, final: bool) -> bytes:
+    """
+    block 하나를 raw deflate로 압축 (zlib은 GIL을 놓으므로 스레드끼리 병렬)
+    - 마지막이 아닌 block은 SYNC_FLUSH로 바이트 경계에서 끝내므로 순서대로 이어 붙이면 하나의 deflate 스트림
+    - 이전 block의 끝 32KB를 사전으로 써서 block 경계에서 압축률이 떨어지지 않게 함
+    """
+    if zdict:
+        compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, -15, zdict=zdict)
+    else:
+        compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+def _dos_datetime(mtime: float):
+    t = time.localtime(mtime)
+    year = min(max(t.tm_year, 1980), 2107)
+    dos_date = (year - 1980) << 9 | t.tm_mon << 5 | t.tm_mday
+    dos_time = t.tm_hour << 11 | t.tm_min << 5 | t.tm_sec // 2
+    return dos_time, dos_date
+
+
+class _Member:
+    """
+    ZIP 항목 1개의 헤더 정보 (CRC/크기는 읽고 압축하면서 채움)
+    - 이름/버전/ZIP64 여부는 zipfile과 같은 규칙 (ASCII가 아니면 UTF-8 + 0x800,
+      4GB 가까운 파일만 ZIP64 → 그 외에는 버전 2.0, 로컬 헤더에 extra 없음)
+    - 로컬 헤더에 extra가 있으면 Info-ZIP unzip이 C 로캘에서 UTF-8 이름을 로컬/중앙에서 다르게 변환해
+      "mismatching local filename" 경고를 내므로 필요할 때만 ZIP64 extra를 붙임
+    """
+
+    def __init__(self, path: str, arcname: str):
+        st = os.stat(path)
+        name = arcname.replace(os.sep, "/").lstrip("/")
+        try:
+            self.name = name.encode("ascii")
+            self.flags = 0x08           # data descriptor
+        except UnicodeEncodeError:
+            self.name = name.encode("utf-8")
+            self.flags = 0x08 | 0x800   # + UTF-8 이름
+        self.method = compression_for(name)
+        self.dos_time, self.dos_date = _dos_datetime(st.st_mtime)
+        self.external_attr = (st.st_mode & 0xFFFF) << 16
+        # zipfile과 같은 기준 (압축 후 조금 커지는 경우까지 여유를 둠)
+        self.zip64 = st.st_size * 1.05 > _ZIP64_LIMIT
+        self.version = _ZIP64_VERSION if self.zip64 else _DEFAULT_VERSION
+        self.crc = 0
+        self.size = 0
+        self.compressed = 0
+        self.offset = 0
+
+    def local_header(self) -> bytes:
+        # 크기는 data descriptor에 (ZIP64이면 0xFFFFFFFF + ZIP64 extra(0))
+        if self.zip64:
+            extra = struct.pack("<HHQQ", 0x0001, 16, 0, 0)
+            size = _ZIP64_LIMIT
+        else:
+            extra = b""
+            size = 0
+        return struct.pack(
+            "<IHHHHHIIIHH", 0x04034B50, self.version, self.flags, self.method,
+            self.dos_time, self.dos_date, 0, size, size,
+            len(self.name), len(extra),
+        ) + self.name + extra
+
+    def data_descriptor(self) -> bytes:
+        if self.zip64:
+            return struct.pack("<IIQQ", 0x08074B50, self.crc, self.compressed, self.size)
+        if self.size >= _ZIP64_LIMIT or self.compressed >= _ZIP64_LIMIT:
+            raise RuntimeError(f"ZIP 항목이 시작할 때보다 커짐 (ZIP64 필요): {self.name.decode('utf-8')}")
+        return struct.pack("<IIII", 0x08074B50, self.crc, self.compressed, self.size)
+
+    def central_header(self) -> bytes:
+        fields = []
+        size, compressed, offset = self.size, self.compressed, self.offset
+        if size >= _ZIP64_LIMIT:
+            fields.append(size)
+            size = _ZIP64_LIMIT
+        if compressed >= _ZIP64_LIMIT:
+            fields.append(compressed)
+            compressed = _ZIP64_LIMIT
+        if offset >= _ZIP64_LIMIT:
+            fields.append(offset)
+            offset = _ZIP64_LIMIT
+        extra = struct.pack(f"<HH{len(fields)}Q", 0x0001, 8 * len(fields), *fields) if fields else b""
+        version = _ZIP64_VERSION if fields else self.version
+        return struct.pack(
+            "<IHHHHHHIIIHHHHHII", 0x02014B50, _CREATE_SYSTEM << 8 | version, version,
+            self.flags, self.method, self.dos_time, self.dos_date, self.crc, compressed, size,
+            len(self.name), len(extra), 0, 0, 0, self.external_attr, offset,
+        ) + self.name + extra
+
+
+def _end_records(count: int, cd_offset: int, cd_size: int) -> bytes:
+    records = b""
+    if count >= 0xFFFF or cd_offset >= _ZIP64_LIMIT or cd_size >= _ZIP64_LIMIT:
+        zip64_offset = cd_offset + cd_size
+        records += struct.pack(
+            "<IQHHIIQQQQ", 0x06064B50, 44, _CREATE_SYSTEM << 8 | _ZIP64_VERSION, _ZIP64_VERSION,
+            0, 0, count, count, cd_size, cd_offset,
+        )
+        records += struct.pack("<IIQI", 0x07064B50, 0, zip64_offset, 1)
+    records += struct.pack(
+        "<IHHHHIIH", 0x06054B50, 0, 0, min(count, 0xFFFF), min(count, 0xFFFF),
+        min(cd_size, _ZIP64_LIMIT), min(cd_offset, _ZIP64_LIMIT), 0,
+    )
+    return records
+
+
+def _read_blocks(path: str, block_size: int):
+    """(block, 마지막 여부) — 빈 파일도 빈 block 1개"""
+    with open(path, "rb") as f:
+        current = f.read(block_size)
+        while True:
+            following = f.read(block_size) if current else b""
+            yield current, not following
+            if not following:
+                return
+            current = following
+
+
+def iter_zip(entries, block_size: int = BLOCK_SIZE):
+    """
+    (실제 경로, ZIP 내부 이름) 목록을 받아 ZIP 바이트를 순서대로 생성
+    - 이미 압축된 형식(STORED_EXTENSIONS)은 그대로, 나머지는 block 단위로 스레드 풀에서 병렬 deflate
+    - 앞쪽 block을 내보내는 동안 뒤쪽 LOOKAHEAD개 block을 미리 압축 (파일 경계를 넘어서도)
+    - 전체 아카이브를 메모리에 만들지 않도록 크기/CRC는 data descriptor로 (4GB 넘는 항목/위치만 ZIP64)
+    """
+    executor = _get_executor()
+    pending = deque()       # (종류, 항목, 내용) — 내보낼 순서대로
+    central = []
+    offset = 0
+
+    def emit(kind, member, payload):
+        nonlocal offset
+        if kind == "header":
+            member.offset = offset
+            data = member.local_header()
+        elif kind == "data":
+            data = payload.result() if not isinstance(payload, bytes) else payload
+            member.compressed += len(data)
+        else:
+            data = member.data_descriptor()
+            central.append(member)
+        offset += len(data)
+        return data
+
+    try:
+        for path, arcname in entries:
+            member = _Member(path, arcname)
+            pending.append(("header", member, None))
+            zdict = b""
+            for block, final in _read_blocks(path, block_size):
+                member.crc = zlib.crc32(block, member.crc)
+                member.size += len(block)
+                if member.method == ZIP_STORED:
+                    pending.append(("data", member, block))
+                else:
+                    pending.append(("data", member, executor.submit(_deflate_block, block, zdict, final)))
+                    zdict = block[-_DICT_SIZE:]
+                while len(pending) > LOOKAHEAD:
+                    yield emit(*pending.popleft())
+            pending.append(("end", member, None))
+
+        while pending:
+            yield emit(*pending.popleft())
+
+        # 중앙 디렉터리
+        cd_offset = offset
+        directory = b"".join(member.central_header() for member in central)
+        yield directory + _end_records(len(central), cd_offset, len(directory))
+    finally:
+        # 중간에 끊기면 남은 압축 작업 취소
+        for kind, _, payload in pending:
+            if kind == "data" and not isinstance(payload, bytes):
+                payload.cancel()
@@ -0,0 +1,39 @@
+# tests/conftest.py
+"""
+Oracle 없이 SQLite 메모리 DB로 실행하는 테스트 공통 설정
+- Oracle 시퀀스 기본값(NEXTVAL)은 SQLite에서 NULL로 바꿔 rowid 자동 증가를 사용
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.sql.functions import next_value
+
+from app import models  # noqa: F401  (테이블 등록)
+from app.database import Base
+
+
+@compiles(next_value, "sqlite")
+def _sqlite_next_value(element, compiler, **kw):
+    return "NULL"
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine, autoflush=False)()
+    yield session
+    session.close()
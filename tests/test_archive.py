@@ -0,0 +1,84 @@
+# tests/test_archive.py
+import io
+import os
+import zipfile
+
+import pytest
+
+from app.utils import archive, storage
+from app.utils.archive import ArchiveLimitError, _LimitedReader, check_limits, extract_to_temp
+
+
+@pytest.fixture(autouse=True)
+def tmp_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "TMP_DIR", str(tmp_path / "tmp"))
+    return tmp_path / "tmp"
+
+
+def _zip(path, members, compression=zipfile.ZIP_STORED):
+    with zipfile.ZipFile(path, "w", compression) as zf:
+        for name, data in members:
+            zf.writestr(name, data)
+    return str(path)
+
+
+def test_extracts_members_to_temp_files(tmp_path, tmp_dir):
+    path = _zip(tmp_path / "a.zip", [("docs/a.txt", b"hello"), ("b.txt", b"world!")])
+    extracted = extract_to_temp(path)
+    assert [(name, size) for name, _, size, _ in extracted] == [("a.txt", 5), ("b.txt", 6)]
+    assert sorted(os.listdir(tmp_dir)) == sorted(os.path.basename(p) for _, p, _, _ in extracted)
+
+
+def test_member_count_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "MAX_MEMBERS", 2)
+    path = _zip(tmp_path / "a.zip", [(f"{i}.txt", b"x") for i in range(3)])
+    with pytest.raises(ArchiveLimitError, match="파일 수"):
+        extract_to_temp(path)
+
+
+def test_declared_total_size_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "MAX_TOTAL_SIZE", 10)
+    path = _zip(tmp_path / "a.zip", [("a.txt", b"x" * 6), ("b.txt", b"y" * 6)])
+    with pytest.raises(ArchiveLimitError, match="전체 크기"):
+        extract_to_temp(path)
+
+
+def test_declared_ratio_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "RATIO_CHECK_MIN_SIZE", 1024)
+    path = _zip(tmp_path / "a.zip", [("zeros.bin", b"\0" * 1024 * 1024)], zipfile.ZIP_DEFLATED)
+    with pytest.raises(ArchiveLimitError, match="압축률"):
+        extract_to_temp(path)
+
+
+def test_reader_enforces_limits_when_headers_lie(monkeypatch):
+    monkeypatch.setattr(archive, "RATIO_CHECK_MIN_SIZE", 4)
+    member = zipfile.ZipInfo("lie.bin")
+    member.compress_size = 1        # 헤더에는 작게 적혀 있지만 실제로는 더 많이 풀림
+    reader = _LimitedReader(io.BytesIO(b"x" * 1000), member, 0)
+    with pytest.raises(ArchiveLimitError, match="압축률"):
+        reader.read()
+
+    monkeypatch.setattr(archive, "MAX_TOTAL_SIZE", 10)
+    member.compress_size = 1000
+    reader = _LimitedReader(io.BytesIO(b"x" * 8), member, total_read=5)    # 앞 멤버까지 합산
+    with pytest.raises(ArchiveLimitError, match="전체 크기"):
+        reader.read()
+
+
+def test_check_limits_passes_small_archives():
+    members = [zipfile.ZipInfo("a.txt")]
+    members[0].file_size = members[0].compress_size = 10
+    check_limits(members)
+
+
+def test_member_failing_mid_read_leaves_no_temp_files(tmp_path, tmp_dir):
+    path = _zip(tmp_path / "a.zip", [("a.txt", b"first member"), ("b.txt", b"second member data")])
+    # 두 번째 멤버 내용을 망가뜨림 (CRC 불일치 → 읽는 도중 실패)
+    raw = bytearray(open(path, "rb").read())
+    offset = raw.index(b"second member data")
+    raw[offset:offset + 6] = b"XXXXXX"
+    open(path, "wb").write(bytes(raw))
+
+    with pytest.raises(zipfile.BadZipFile):
+        extract_to_temp(path)
+    assert os.listdir(tmp_dir) == []    # 먼저 풀린 멤버와 읽다 만 멤버의 임시 파일 모두 삭제
@@ -0,0 +1,86 @@
+# tests/test_archive_cache.py
+import os
+import threading
+import time
+
+import pytest
+
+from app.utils import archive_cache
+from app.utils.archive_cache import ArchiveBusy, ArchiveCache
+
+
+@pytest.fixture
+def fake_zip(monkeypatch):
+    """entries를 그대로 이어 붙이는 압축 대신, release 전까지 첫 조각 뒤에서 멈춤"""
+    state = {"builds": 0, "release": threading.Event()}
+
+    def iter_zip(entries):
+        state["builds"] += 1
+        yield b"head:"
+        state["release"].wait(5)
+        for _, data in entries:
+            yield data
+
+    monkeypatch.setattr(archive_cache, "iter_zip", iter_zip)
+    return state
+
+
+def _wait_for(condition):
+    deadline = time.time() + 5
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+
+def test_concurrent_streams_share_one_build(tmp_path, fake_zip):
+    cache = ArchiveCache(root=str(tmp_path))
+    path = cache.path_for(1, "folder", None, "v1")
+
+    first = cache.stream(path, [("a", b"AAA")])
+    second = cache.stream(path, [("a", b"AAA")])
+    assert next(first) == b"head:" and next(second) == b"head:"
+    fake_zip["release"].set()
+    assert b"".join(first) == b"AAA" and b"".join(second) == b"AAA"
+
+    assert fake_zip["builds"] == 1
+    assert cache.lookup(path) == path       # 읽는 사람이 모두 끝나면 캐시에 등록
+    assert cache.stats()["building"] == 0
+
+
+def test_followers_are_capped(tmp_path, fake_zip):
+    cache = ArchiveCache(root=str(tmp_path), max_followers=1)
+    path = cache.path_for(1, "folder", None, "v1")
+
+    first = cache.stream(path, [("a", b"AAA")])
+    assert next(first) == b"head:"
+    with pytest.raises(ArchiveBusy):
+        cache.stream(path, [("a", b"AAA")])
+    fake_zip["release"].set()
+    assert b"".join(first) == b"AAA"
+
+
+def test_stored_archive_removed_before_read_is_rebuilt(tmp_path, fake_zip):
+    cache = ArchiveCache(root=str(tmp_path))
+    path = cache.path_for(1, "folder", None, "v1")
+    fake_zip["release"].set()
+
+    late = cache.stream(path, [("a", b"AAA")])     # 압축이 끝나 캐시로 옮겨진 뒤에야 읽기 시작
+    _wait_for(lambda: os.path.exists(path))
+    os.remove(path)                                 # 그 사이 LRU/폴더 삭제로 지워짐
+    assert b"".join(late) == b"head:AAA"
+    assert fake_zip["builds"] == 2
+
+
+def test_least_recently_used_archive_is_evicted(tmp_path, fake_zip):
+    fake_zip["release"].set()
+    cache = ArchiveCache(root=str(tmp_path), max_bytes=30)
+    paths = [cache.path_for(1, "category", name, "v1") for name in ("a", "b", "c")]
+
+    for path in paths[:2]:
+        b"".join(cache.stream(path, [("x", b"0123456")]))
+    cache.lookup(paths[0])                          # a를 최근 사용으로
+    b"".join(cache.stream(paths[2], [("x", b"0123456")]))
+
+    assert cache.lookup(paths[1]) is None           # 가장 오래 안 쓴 b만 삭제
+    assert cache.lookup(paths[0]) == paths[0] and cache.lookup(paths[2]) == paths[2]
+    assert cache.stats()["bytes"] <= 30
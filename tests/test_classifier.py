@@ -0,0 +1,54 @@
+# tests/test_classifier.py
+from sqlalchemy.orm import sessionmaker
+
+from app.models import ClassifyChunk, ClassifyJob, File, Folder, User
+from app.utils import classifier
+
+
+def _job(db, files, chunk_size, monkeypatch, version=None):
+    monkeypatch.setattr(classifier, "CHUNK_SIZE", chunk_size)
+    db.add(User(user_id=1, user_login_id="u", email="u@example.com", user_password="x"))
+    job = classifier.submit_job(db, 1, 1, "full", files, version)
+    db.commit()
+    return job
+
+
+def test_job_done_after_last_chunk(db, engine, monkeypatch):
+    monkeypatch.setattr(classifier, "SessionLocal", sessionmaker(bind=engine, autoflush=False))
+    files = [{"FILE_ID": i, "FILE_TYPE": "pdf"} for i in range(1, 4)]
+    job = _job(db, files, 2, monkeypatch)
+
+    claimed = classifier._claim_chunks(10, {})
+    assert len(claimed) == 2
+    (first_id, job_id, _, first_token, _), (second_id, _, _, second_token, _) = claimed
+
+    classifier._finish_chunk(first_id, job_id, first_token)
+    db.expire_all()
+    assert db.get(ClassifyJob, job.job_id).status == 1
+
+    classifier._finish_chunk(second_id, job_id, second_token)
+    db.expire_all()
+    assert db.get(ClassifyJob, job.job_id).status == 2
+    assert {c.status for c in db.query(ClassifyChunk)} == {2}
+
+
+def test_classified_version_only_for_delivered_chunks(db, engine, monkeypatch):
+    monkeypatch.setattr(classifier, "SessionLocal", sessionmaker(bind=engine, autoflush=False))
+    monkeypatch.setattr(classifier, "MAX_ATTEMPTS", 1)
+    db.add(Folder(folder_id=1, user_id=1, folder_name="f"))
+    for file_id in (1, 2):
+        db.add(File(file_id=file_id, user_id=1, folder_id=1, file_name=f"{file_id}.pdf",
+                    file_type="pdf", file_path="p", is_transform=2, is_classification=0))
+    files = [{"FILE_ID": 1, "FILE_TYPE": "pdf"}, {"FILE_ID": 2, "FILE_TYPE": "pdf"}]
+    job = _job(db, files, 1, monkeypatch, version=3)
+
+    (ok_id, job_id, _, ok_token, ok_files), (bad_id, _, _, bad_token, _) = classifier._claim_chunks(10, {})
+    classifier._finish_chunk(ok_id, job_id, ok_token)
+    classifier._finish_chunk(bad_id, job_id, bad_token, "ConnectError: refused")
+    db.expire_all()
+
+    delivered = ok_files[0]["FILE_ID"]
+    versions = {f.file_id: f.classified_version for f in db.query(File)}
+    assert versions[delivered] == 3
+    assert versions[3 - delivered] is None      # 최종 실패 → delta 재분류 대상
+    assert db.get(ClassifyJob, job.job_id).status == 3
@@ -0,0 +1,33 @@
+# tests/test_extractor.py
+from sqlalchemy.orm import sessionmaker
+
+from app.models import ExtractOutbox
+from app.utils import extractor
+
+
+def test_entry_fails_after_max_attempts(db, engine, monkeypatch):
+    monkeypatch.setattr(extractor, "SessionLocal", sessionmaker(bind=engine, autoflush=False))
+    monkeypatch.setattr(extractor, "MAX_ATTEMPTS", 2)
+
+    extractor.enqueue_extraction(db, [{"file_id": 1, "file_type": "pdf"}])
+    db.commit()
+
+    token, files = extractor._claim_batch()
+    assert files == [{"FILE_ID": 1, "FILE_TYPE": "pdf"}]
+    extractor._finish_batch(token, "HTTPStatusError: 500")
+    db.expire_all()
+    entry = db.query(ExtractOutbox).one()
+    assert (entry.status, entry.attempts) == (0, 1)
+
+    # backoff 무시하고 바로 다시 선점
+    entry.next_try_at = entry.created_at
+    db.commit()
+    token, files = extractor._claim_batch()
+    extractor._finish_batch(token, "HTTPStatusError: 500")
+    db.expire_all()
+    entry = db.query(ExtractOutbox).one()
+    assert (entry.status, entry.attempts, entry.error) == (2, 2, "HTTPStatusError: 500")
+
+    entry.next_try_at = entry.created_at
+    db.commit()
+    assert extractor._claim_batch() == (None, [])
@@ -0,0 +1,54 @@
+# tests/test_files.py
+from app.models import Blob, ClassifyChunk, ClassifyJob, ExtractOutbox, File, Folder, User
+from app.routers import files, folders
+from app.utils import classifier, storage
+from app.utils.archive_cache import archive_cache
+from app.utils.extractor import enqueue_extraction
+
+
+def _user_folder(db):
+    db.add(User(user_id=1, user_login_id="u", email="u@example.com", user_password="x"))
+    db.add(Folder(folder_id=1, user_id=1, folder_name="f"))
+    db.commit()
+
+
+def test_register_files_locks_blobs_in_hash_order(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "BLOB_DIR", str(tmp_path / "blobs"))
+    _user_folder(db)
+    acquired = []
+    acquire = files.acquire_blob
+    monkeypatch.setattr(files, "acquire_blob",
+                        lambda db, tmp, size, h: acquired.append(h) or acquire(db, tmp, size, h))
+
+    items = []
+    for file_id, content in ((10, b"zz"), (11, b"aa"), (12, b"zz")):
+        tmp = tmp_path / f"tmp{file_id}"
+        tmp.write_bytes(content)
+        _, size, file_hash = storage.write_temp(open(tmp, "rb"))
+        items.append((file_id, f"{file_id}.txt", _, size, file_hash))
+
+    rows = files.register_files(db, 1, 1, items)
+    db.commit()
+
+    assert [row["file_id"] for row in rows] == [10, 11, 12]     # 입력 순서 유지
+    assert acquired == sorted(item[4] for item in items)
+    assert {b.blob_hash: b.ref_cnt for b in db.query(Blob)} == {items[0][4]: 2, items[1][4]: 1}
+
+
+def test_delete_folder_cancels_pending_extraction_and_classification(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(archive_cache, "root", str(tmp_path / "archive_cache"))
+    _user_folder(db)
+    db.add(Folder(folder_id=2, user_id=1, folder_name="other"))
+    db.add(File(file_id=1, user_id=1, folder_id=1, file_name="a.pdf", file_type="pdf"))
+    db.add(File(file_id=2, user_id=1, folder_id=2, file_name="b.pdf", file_type="pdf"))
+    db.flush()
+    enqueue_extraction(db, [{"file_id": 1, "file_type": "pdf"}, {"file_id": 2, "file_type": "pdf"}])
+    classifier.submit_job(db, 1, 1, "full", [{"FILE_ID": 1, "FILE_TYPE": "pdf"}])
+    classifier.submit_job(db, 1, 2, "full", [{"FILE_ID": 2, "FILE_TYPE": "pdf"}])
+    db.commit()
+
+    folders.delete_folder(1, db)
+
+    assert [e.file_id for e in db.query(ExtractOutbox)] == [2]
+    assert [j.folder_id for j in db.query(ClassifyJob)] == [2]
+    assert [c.folder_id for c in db.query(ClassifyChunk)] == [2]
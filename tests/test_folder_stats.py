@@ -0,0 +1,82 @@
+# tests/test_folder_stats.py
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from app.models import ExtractOutbox, File, Folder, User
+from app.utils import folder_stats
+
+
+def _folder(db, folder_id):
+    db.add(Folder(folder_id=folder_id, user_id=1, folder_name=str(folder_id), file_cnt=0))
+    db.add(File(user_id=1, folder_id=folder_id, file_name="a.pdf", file_type="pdf",
+                file_size=10, is_transform=2, is_classification=0))
+
+
+def test_reconcile_only_marked_folders(db, engine, monkeypatch):
+    monkeypatch.setattr(folder_stats, "SessionLocal", sessionmaker(bind=engine, autoflush=False))
+    db.add(User(user_id=1, user_login_id="u", email="u@example.com", user_password="x"))
+    _folder(db, 1)
+    _folder(db, 2)
+    db.flush()
+    folder_stats.mark_dirty(db, [1])
+    db.commit()
+
+    assert folder_stats.reconcile_dirty() > 0
+    stats = folder_stats.read_stats(db, [1, 2])
+    assert stats[1]["transform:2"] == 1 and stats[1]["files"] == 1
+    assert stats[2] == {}       # 표시 안 된 폴더는 건드리지 않음
+
+    # WATCH_WINDOW 안에서는 표시 유지, 지나면 마지막으로 한 번 계산 후 해제
+    db.expire_all()
+    assert db.get(Folder, 1).stats_dirty_at is not None
+    db.get(Folder, 1).stats_dirty_at = datetime.now() - timedelta(seconds=folder_stats.WATCH_WINDOW + 1)
+    db.commit()
+    folder_stats.reconcile_dirty()
+    db.expire_all()
+    assert db.get(Folder, 1).stats_dirty_at is None
+
+
+def test_dirty_batch_rotates_and_keeps_folders_with_pending_work(db, engine, monkeypatch):
+    monkeypatch.setattr(folder_stats, "SessionLocal", sessionmaker(bind=engine, autoflush=False))
+    monkeypatch.setattr(folder_stats, "RECONCILE_BATCH", 1)
+    db.add(User(user_id=1, user_login_id="u", email="u@example.com", user_password="x"))
+    _folder(db, 1)
+    _folder(db, 2)
+    db.flush()
+    folder_stats.mark_dirty(db, [1, 2])
+    db.commit()
+
+    # 같은 폴더만 반복해서 고르지 않고 재계산한 지 오래된 폴더부터 돌아감
+    folder_stats.reconcile_dirty()
+    folder_stats.reconcile_dirty()
+    stats = folder_stats.read_stats(db, [1, 2])
+    assert stats[1]["files"] == 1 and stats[2]["files"] == 1
+
+    # WATCH_WINDOW가 지나도 전송 대기 작업이 남아 있으면 표시 유지
+    expired = datetime.now() - timedelta(seconds=folder_stats.WATCH_WINDOW + 1)
+    file_id = db.query(File.file_id).filter(File.folder_id == 1).scalar()
+    db.add(ExtractOutbox(outbox_id=1, file_id=file_id, file_type="pdf", status=0, attempts=0))
+    db.get(Folder, 1).stats_dirty_at = expired
+    db.get(Folder, 2).stats_dirty_at = expired
+    db.commit()
+    monkeypatch.setattr(folder_stats, "RECONCILE_BATCH", 2)
+    folder_stats.reconcile_dirty()
+    db.expire_all()
+    assert db.get(Folder, 1).stats_dirty_at is not None
+    assert db.get(Folder, 2).stats_dirty_at is None
+
+
+def test_sweep_covers_unmarked_folders(db, engine, monkeypatch):
+    monkeypatch.setattr(folder_stats, "SessionLocal", sessionmaker(bind=engine, autoflush=False))
+    monkeypatch.setattr(folder_stats, "SWEEP_BATCH", 1)
+    db.add(User(user_id=1, user_login_id="u", email="u@example.com", user_password="x"))
+    _folder(db, 1)
+    _folder(db, 2)
+    db.commit()
+
+    assert folder_stats.reconcile_dirty() == 0      # 표시된 폴더 없음
+    folder_stats.reconcile_sweep()
+    folder_stats.reconcile_sweep()
+    stats = folder_stats.read_stats(db, [1, 2])
+    assert stats[1]["files"] == 1 and stats[2]["files"] == 1
@@ -0,0 +1,81 @@
+# tests/test_folder_summary.py
+from datetime import date
+
+from app.models import File, Folder, User
+from app.utils import folder_stats
+from app.utils.folder_summary import folder_progress, summarize_folders
+
+
+def _seed(db):
+    db.add(User(user_id=1, user_login_id="u", email="u@example.com", user_password="x"))
+    db.add(User(user_id=2, user_login_id="v", email="v@example.com", user_password="x"))
+    db.add(Folder(folder_id=1, user_id=1, folder_name="old", last_work=date(2024, 1, 1)))
+    db.add(Folder(folder_id=2, user_id=1, folder_name="new", last_work=date(2024, 6, 1)))
+    db.add(Folder(folder_id=3, user_id=1, folder_name="empty"))
+    db.add(Folder(folder_id=4, user_id=2, folder_name="other", last_work=date(2024, 3, 1)))
+    files = [
+        File(user_id=1, folder_id=1, file_name="a.pdf", file_size=10, is_transform=2, is_classification=2,
+             category="계약서"),
+        File(user_id=1, folder_id=1, file_name="b.pdf", file_size=20, is_transform=2, is_classification=1),
+        File(user_id=1, folder_id=1, file_name="c.pdf", file_size=5, is_transform=0, is_classification=0),
+        File(user_id=1, folder_id=2, file_name="d.hwp", file_size=7, is_transform=1, is_classification=0,
+             category="보고서"),
+        File(user_id=2, folder_id=4, file_name="e.pdf", file_size=1, is_transform=0, is_classification=0),
+    ]
+    db.add_all(files)
+    db.flush()
+    for folder_id in (1, 2, 4):
+        folder_stats.apply_delta(db, folder_id,
+                                 added=folder_stats.stats_of(f for f in files if f.folder_id == folder_id))
+    db.commit()
+
+
+def test_summary_counts_from_folder_stats(db):
+    _seed(db)
+    summaries = summarize_folders(db, user_id=1)
+
+    # 최신 작업순, 작업 기록 없는 폴더는 맨 뒤
+    assert [s["folder_id"] for s in summaries] == [2, 1, 3]
+    old = summaries[1]
+    assert old["file_cnt"] == 3 and old["file_bytes"] == 35
+    assert old["transform"] == {"waiting": 1, "pending": 0, "done": 2}
+    assert old["classification"] == {"waiting": 1, "pending": 1, "done": 1}
+    assert old["categories"] == {"계약서": 1} and old["uncategorized_cnt"] == 2
+    assert old["last_work"] == "2024-01-01"
+
+    # 통계 없는 폴더는 0으로 채움
+    empty = summaries[2]
+    assert empty["file_cnt"] == 0 and empty["categories"] == {} and empty["last_work"] is None
+
+
+def test_summary_filters_by_folder_ids(db):
+    _seed(db)
+    assert [s["folder_id"] for s in summarize_folders(db, folder_ids=[4, 2])] == [2, 4]
+    assert summarize_folders(db, folder_ids=[99]) == []
+
+
+def test_progress_counts_from_files(db):
+    _seed(db)
+    progress = folder_progress(db, user_id=1)
+
+    assert [p["folder_id"] for p in progress] == [2, 1, 3]
+    assert progress[1] == {
+        "folder_id": 1,
+        "total": 3,
+        "transform_done": 2,
+        "transform_pending": 0,
+        "transform_waiting": 1,
+        "classification_done": 1,
+        "classification_pending": 1,
+        "classification_waiting": 1,
+        "transform_rate": 66.7,
+        "classification_rate": 33.3,
+    }
+    # 파일 없는 폴더는 0, 비율도 0
+    assert progress[2]["total"] == 0 and progress[2]["transform_rate"] == 0
+
+
+def test_progress_for_one_folder(db):
+    _seed(db)
+    assert [p["folder_id"] for p in folder_progress(db, folder_id=4)] == [4]
+    assert folder_progress(db, folder_id=99) == []
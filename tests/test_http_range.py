@@ -0,0 +1,28 @@
+# tests/test_http_range.py
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.utils.http_range import parse_range, range_file_response
+
+
+def test_parse_range():
+    assert parse_range("bytes=0-99,50-199", 1000) == [(0, 199)]
+    assert parse_range("bytes=-5", 10) == [(5, 9)]
+    assert parse_range("bytes=2000-", 1000) == []
+    assert parse_range("bytes=-5", 0) == []
+    assert parse_range("bytes=0-", 0) == []
+    assert parse_range("items=0-1", 10) is None
+
+
+def test_suffix_range_on_empty_file_is_416(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    app = FastAPI()
+
+    @app.get("/file")
+    def get_file(request: Request):
+        return range_file_response(request, str(path), '"empty"', "text/plain")
+
+    res = TestClient(app).get("/file", headers={"Range": "bytes=-5"})
+    assert res.status_code == 416
+    assert res.headers["content-range"] == "bytes */0"
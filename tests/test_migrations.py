@@ -0,0 +1,127 @@
+# tests/test_migrations.py
+from sqlalchemy import create_engine
+
+from app.database import Base
+from app.migrations import steps
+
+
+class _Result:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+    def all(self):
+        return self.value
+
+
+class FakeOracle:
+    """
+    USER_TAB_COLUMNS / USER_SEQUENCES 조회에 정해진 값을 돌려주고 DDL은 기록만
+    - sequences: 시퀀스 이름 → 다음 NEXTVAL 값 (ALTER SEQUENCE INCREMENT BY 반영)
+    """
+
+    dialect = create_engine("oracle+oracledb://u:p@localhost/?service_name=x").dialect
+
+    def __init__(self, columns=(), max_ids=None, sequences=None):
+        self.columns = list(columns)
+        self.max_ids = max_ids or {}
+        self.sequences = dict(sequences or {})
+        self.increments = {}
+        self.ddl = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        params = params or {}
+        if "FROM USER_TAB_COLUMNS WHERE" in sql:
+            return _Result(int((params["t"], params["c"]) in self.columns))
+        if "FROM USER_TAB_COLUMNS" in sql:
+            return _Result(self.columns)
+        if "FROM USER_SEQUENCES" in sql:
+            return _Result(int(params["s"] in self.sequences))
+        if ".NEXTVAL FROM DUAL" in sql:
+            name = sql.split()[1].split(".")[0]
+            value = self.sequences[name]
+            self.sequences[name] = value + self.increments.get(name, 1)
+            return _Result(value)
+        if sql.startswith("ALTER SEQUENCE"):
+            _, _, name, _, _, increment = sql.split()
+            self.increments[name] = int(increment)
+        if sql.startswith("SELECT NVL(MAX("):
+            table = sql.rsplit(" ", 1)[-1]
+            return _Result(self.max_ids.get(table, 0))
+        self.ddl.append(sql)
+        return _Result(None)
+
+
+def test_sync_missing_columns_adds_only_absent_columns():
+    files = Base.metadata.tables["FILES"]
+    present = [("FILES", c.name) for c in files.columns if c.name not in ("FILE_HASH", "FILE_SIZE")]
+    conn = FakeOracle(columns=present)
+
+    steps.sync_missing_columns(conn, Base.metadata)
+
+    assert sorted(conn.ddl) == [
+        "ALTER TABLE FILES ADD (FILE_HASH VARCHAR2(64 CHAR))",
+        "ALTER TABLE FILES ADD (FILE_SIZE INTEGER)",
+    ]
+
+
+def test_sync_missing_columns_matches_lowercase_names_case_insensitively():
+    # USER_TAB_COLUMNS는 대문자, FoldersCategory는 소문자로 선언
+    present = [
+        (table.name.upper(), column.name.upper())
+        for table in Base.metadata.sorted_tables for column in table.columns
+    ]
+    conn = FakeOracle(columns=present)
+
+    steps.sync_missing_columns(conn, Base.metadata)
+
+    assert conn.ddl == []
+
+
+def test_sync_sequence_start_skips_ahead_without_dropping():
+    conn = FakeOracle(max_ids={"FILES": 120}, sequences={"FILE_ID_SEQ": 5})
+    steps.sync_sequence_start(conn, "FILE_ID_SEQ", "FILES", "FILE_ID")
+    assert conn.ddl == ["ALTER SEQUENCE FILE_ID_SEQ INCREMENT BY 116", "ALTER SEQUENCE FILE_ID_SEQ INCREMENT BY 1"]
+    assert conn.sequences["FILE_ID_SEQ"] == 122
+    assert conn.increments["FILE_ID_SEQ"] == 1
+
+    # 실제 NEXTVAL이 이미 MAX보다 크면 그대로
+    conn = FakeOracle(max_ids={"FILES": 120}, sequences={"FILE_ID_SEQ": 121})
+    steps.sync_sequence_start(conn, "FILE_ID_SEQ", "FILES", "FILE_ID")
+    assert conn.ddl == []
+
+    # 시퀀스가 없으면 MAX + 1부터 생성
+    conn = FakeOracle(max_ids={"FILES": 120})
+    steps.sync_sequence_start(conn, "FILE_ID_SEQ", "FILES", "FILE_ID")
+    assert conn.ddl == ["CREATE SEQUENCE FILE_ID_SEQ START WITH 121 INCREMENT BY 1"]
+
+
+def test_sequences_are_synced_only_by_a_versioned_step():
+    from app import migrations
+
+    assert not hasattr(migrations, "sync_sequences")
+    assert any(step is steps.v6_sequences for _, _, step in steps.STEPS)
+
+
+def test_check_plan_requires_index_and_no_sort_for_pages():
+    from app.migrations.check_plans import check_plan
+
+    ordered = [
+        ("SELECT STATEMENT", None, None),
+        ("COUNT", "STOPKEY", None),
+        ("TABLE ACCESS", "BY INDEX ROWID", "FILES"),
+        ("INDEX", "RANGE SCAN DESCENDING", "IX_FILES_FOLDER_UPLOADED"),
+    ]
+    sorted_plan = [
+        ("SELECT STATEMENT", None, None),
+        ("SORT", "ORDER BY", None),
+        ("TABLE ACCESS", "BY INDEX ROWID BATCHED", "FILES"),
+        ("INDEX", "RANGE SCAN", "IX_FILES_FOLDER_UPLOADED"),
+    ]
+    assert check_plan(ordered, "IX_FILES_FOLDER_UPLOADED", True) == []
+    assert check_plan(ordered, "IX_FILES_FOLDER_CAT_UPLOADED", True) == ["IX_FILES_FOLDER_CAT_UPLOADED 미사용"]
+    assert len(check_plan(sorted_plan, "IX_FILES_FOLDER_UPLOADED", True)) == 1
+    assert check_plan(sorted_plan, "IX_FILES_FOLDER_UPLOADED", False) == []
@@ -0,0 +1,37 @@
+# tests/test_naming.py
+from app.models import File, Folder, User
+from app.utils.naming import NameResolver
+
+
+def _resolver(db, existing=()):
+    db.add(User(user_id=1, user_login_id="u", email="u@example.com", user_password="x"))
+    db.add(Folder(folder_id=1, user_id=1, folder_name="f"))
+    for name in existing:
+        db.add(File(user_id=1, folder_id=1, file_name=name))
+    db.flush()
+    return NameResolver(db, 1)
+
+
+def test_suffixes_follow_existing_names(db):
+    resolver = _resolver(db, ["a.pdf", "a(1).pdf", "a(3).pdf", "b.hwp"])
+    assert resolver.resolve("a.pdf") == "a(4).pdf"
+    assert resolver.resolve("a.pdf") == "a(5).pdf"      # 같은 배치 안의 이름도 반영
+    assert resolver.resolve("b.pdf") == "b.pdf"         # 확장자가 다르면 다른 이름
+    assert resolver.resolve("c.PDF") == "c.pdf"
+    assert resolver.resolve("c.pdf") == "c(1).pdf"
+
+
+def test_suffixed_name_does_not_block_base_name(db):
+    resolver = _resolver(db, ["a(1).pdf"])
+    # 'a.pdf'는 비어 있지만 다음 번호는 'a(1)' 다음부터
+    assert resolver.resolve("a(1).pdf") == "a(1)(1).pdf"
+    assert resolver.resolve("a.pdf") == "a(2).pdf"
+
+
+def test_names_without_extension(db):
+    resolver = _resolver(db, ["README", "Makefile(1)"])
+    assert resolver.resolve("README") == "README(1)"
+    assert resolver.resolve("README") == "README(2)"
+    assert resolver.resolve("Makefile") == "Makefile(2)"
+    assert resolver.resolve("LICENSE") == "LICENSE"
+    assert resolver.resolve("README.md") == "README.md"
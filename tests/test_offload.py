@@ -0,0 +1,84 @@
+# tests/test_offload.py
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database import get_db
+from app.models import File, Folder, User
+from app.routers import download
+from app.utils import offload
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    root = tmp_path / "uploads"
+    (root / "blobs" / "ab").mkdir(parents=True)
+    monkeypatch.setattr(offload, "OFFLOAD_ROOT", str(root))
+    monkeypatch.setattr(offload, "OFFLOAD_PREFIX", "/_protected/")
+    return root
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(download.router)
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+def _add_file(db, path: str):
+    db.add(User(user_id=1, user_login_id="u", email="u@example.com", user_password="x"))
+    db.add(Folder(folder_id=1, user_id=1, folder_name="f"))
+    db.add(File(file_id=1, user_id=1, folder_id=1, file_name="보고서 1.pdf", file_path=path,
+                file_hash="ab" * 32))
+    db.commit()
+
+
+def test_internal_uri(root):
+    assert offload._internal_uri(str(root / "blobs" / "ab" / "한 글")) == \
+        "/_protected/blobs/ab/%ED%95%9C%20%EA%B8%80"
+    assert offload._internal_uri(str(root.parent / "secret.txt")) is None
+    assert offload._internal_uri(str(root / ".." / "secret.txt")) is None
+    assert offload._internal_uri(str(root / "blobs" / ".." / ".." / "uploads2" / "x")) is None
+    assert offload._internal_uri(str(root) + "2/x") is None      # 이름만 비슷한 옆 폴더
+
+
+def test_x_accel_redirect(db, client, root, monkeypatch):
+    monkeypatch.setattr(offload, "FILE_OFFLOAD", "x-accel")
+    _add_file(db, str(root / "blobs" / "ab" / "abcd"))     # 디스크에 없어도 (프록시가 판단)
+
+    res = client.get("/folders/download/file/1")
+    assert res.status_code == 200
+    assert res.headers["x-accel-redirect"] == "/_protected/blobs/ab/abcd"
+    assert res.headers["content-disposition"] == \
+        "attachment; filename*=UTF-8''%EB%B3%B4%EA%B3%A0%EC%84%9C%201.pdf"
+    assert res.content == b""
+
+
+def test_x_sendfile(db, client, root, monkeypatch):
+    monkeypatch.setattr(offload, "FILE_OFFLOAD", "x-sendfile")
+    path = root / "blobs" / "ab" / "abcd"
+    _add_file(db, str(path))
+
+    res = client.get("/folders/download/file/1")
+    assert res.status_code == 200
+    assert res.headers["x-sendfile"] == os.path.abspath(path)
+    assert "x-accel-redirect" not in res.headers
+    assert res.content == b""
+
+
+def test_served_in_process_when_unset(db, client, root, monkeypatch):
+    monkeypatch.setattr(offload, "FILE_OFFLOAD", "")
+    path = root / "blobs" / "ab" / "abcd"
+    path.write_bytes(b"0123456789")
+    _add_file(db, str(path))
+
+    res = client.get("/folders/download/file/1", headers={"Range": "bytes=2-4"})
+    assert res.status_code == 206
+    assert res.content == b"234"
+    assert "x-accel-redirect" not in res.headers and "x-sendfile" not in res.headers
+
+    path.unlink()
+    assert client.get("/folders/download/file/1").status_code == 404
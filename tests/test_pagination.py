@@ -0,0 +1,28 @@
+# tests/test_pagination.py
+from datetime import datetime
+
+from app.models import File, Folder, User
+from app.utils.pagination import paginate_files
+
+
+def test_pages_through_same_day_timestamps(db):
+    db.add(User(user_id=1, user_login_id="u", email="u@example.com", user_password="x"))
+    db.add(Folder(folder_id=1, user_id=1, folder_name="f"))
+    day = datetime(2024, 5, 1)
+    # file_id 순서와 업로드 시각 순서를 다르게
+    times = {1: day.replace(hour=9), 2: day.replace(hour=15), 3: day.replace(hour=9, minute=30),
+             4: day.replace(hour=15), 5: day.replace(hour=23, second=59), 6: None, 7: day}
+    for file_id, uploaded_at in times.items():
+        db.add(File(file_id=file_id, user_id=1, folder_id=1, file_name=f"{file_id}.pdf",
+                    uploaded_at=uploaded_at))
+    db.commit()
+
+    seen, cursor = [], None
+    for _ in range(len(times)):     # cursor가 앞으로 가지 않으면 끝나지 않으므로 횟수 제한
+        rows, cursor = paginate_files(
+            db.query(File.file_id, File.uploaded_at).filter(File.folder_id == 1), cursor, limit=2)
+        seen += [row.file_id for row in rows]
+        if cursor is None:
+            break
+
+    assert seen == [5, 4, 2, 3, 1, 7, 6]     # 시각 없는 행이 맨 뒤 (NULLS LAST)
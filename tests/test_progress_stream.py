@@ -0,0 +1,33 @@
+# tests/test_progress_stream.py
+from sqlalchemy.orm import sessionmaker
+
+from app.models import File, Folder, FolderStat, User
+from app.utils import progress_stream
+from app.utils.folder_summary import folder_progress
+
+
+def test_watcher_reads_folder_stats_instead_of_files(db, engine, monkeypatch):
+    monkeypatch.setattr(progress_stream, "SessionLocal", sessionmaker(bind=engine, autoflush=False))
+    db.add(User(user_id=1, user_login_id="u", email="u@example.com", user_password="x"))
+    db.add(Folder(folder_id=1, user_id=1, folder_name="f"))
+    db.add(File(user_id=1, folder_id=1, file_name="a.pdf", is_transform=2, is_classification=1))
+    db.add(File(user_id=1, folder_id=1, file_name="b.pdf", is_transform=0, is_classification=0))
+    db.add_all([
+        FolderStat(folder_id=1, stat_key="files", stat_value=2),
+        FolderStat(folder_id=1, stat_key="transform:2", stat_value=1),
+        FolderStat(folder_id=1, stat_key="transform:0", stat_value=1),
+        FolderStat(folder_id=1, stat_key="classification:1", stat_value=1),
+        FolderStat(folder_id=1, stat_key="classification:0", stat_value=1),
+    ])
+    db.commit()
+
+    # 통계가 맞으면 FILES 집계와 같은 값
+    assert progress_stream._load_progress(1) == folder_progress(db, folder_id=1)[0]
+    assert progress_stream._load_progress(2) is None
+
+    # 통계만 바꾸면 그대로 보임 (FILES는 다시 집계하지 않음)
+    db.query(FolderStat).filter(FolderStat.stat_key == "transform:0").delete()
+    db.query(FolderStat).filter(FolderStat.stat_key == "transform:2").update({FolderStat.stat_value: 2})
+    db.commit()
+    progress = progress_stream._load_progress(1)
+    assert progress["transform_done"] == 2 and progress["transform_rate"] == 100.0
@@ -0,0 +1,91 @@
+# tests/test_security.py
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import JWTError, jwt
+
+from app.database import get_async_db
+from app.models import User
+from app.routers import auth
+from app.utils import security
+
+
+class _FakeAsyncSession:
+    """로그인 라우트가 쓰는 scalar만 흉내 (비밀번호 확인 전에 끝나는 경로용)"""
+
+    async def scalar(self, statement):
+        return User(user_id=1, user_login_id="u", email="u@example.com", user_password="x")
+
+
+def test_login_returns_503_with_retry_after_when_hash_pool_is_full(monkeypatch):
+    monkeypatch.setattr(security, "password_hasher", security.PasswordHasher(workers=1, max_pending=0))
+    app = FastAPI()
+    app.include_router(auth.router)
+    app.dependency_overrides[get_async_db] = lambda: _FakeAsyncSession()
+
+    response = TestClient(app).post("/auth/login", json={"user_login_id": "u", "user_password": "pw"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_hasher_rebuilds_broken_pool():
+    hasher = security.PasswordHasher(workers=1, max_pending=4)
+
+    async def scenario():
+        await hasher.start()
+        with pytest.raises(BrokenProcessPool):
+            await hasher.run(os._exit, 1)       # 워커가 죽음 → 새 풀에서 다시 실행해도 죽음
+        return await hasher.run(os.getpid)      # 깨진 풀을 버리고 새 풀에서 실행
+
+    try:
+        assert asyncio.run(scenario()) != os.getpid()
+        assert hasher.stats()["pending"] == 0
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.parametrize("value", [",", "no-secret", "kid:"])
+def test_malformed_signing_keys_name_the_variable(monkeypatch, value):
+    monkeypatch.delenv("JWT_KEYS_FILE", raising=False)
+    monkeypatch.setenv("JWT_SIGNING_KEYS", value)
+    with pytest.raises(RuntimeError, match="JWT_SIGNING_KEYS"):
+        security.load_signing_keys()
+
+
+def test_blank_signing_keys_fall_through(monkeypatch):
+    monkeypatch.delenv("JWT_KEYS_FILE", raising=False)
+    monkeypatch.setenv("JWT_SIGNING_KEYS", " ")
+    monkeypatch.setenv("JWT_SECRET_KEY", "s")
+    assert security.load_signing_keys() == ("default", {"default": "s"})
+
+
+def _use_keys(monkeypatch, signing_keys: str, active: str):
+    monkeypatch.delenv("JWT_KEYS_FILE", raising=False)
+    monkeypatch.setenv("JWT_SIGNING_KEYS", signing_keys)
+    monkeypatch.setenv("JWT_ACTIVE_KID", active)
+    active_kid, keys = security.load_signing_keys()
+    monkeypatch.setattr(security, "ACTIVE_KID", active_kid)
+    monkeypatch.setattr(security, "SIGNING_KEYS", keys)
+    monkeypatch.setattr(security, "SECRET_KEY", keys[active_kid])
+
+
+def test_tokens_survive_kid_rotation(monkeypatch):
+    _use_keys(monkeypatch, "2024-12:old-secret", "2024-12")
+    old_token = security.create_access_token({"sub": "1"})
+
+    # 새 키를 추가하고 active로 → 새 토큰은 새 kid, 예전 토큰도 그대로 검증
+    _use_keys(monkeypatch, "2025-01:new-secret,2024-12:old-secret", "2025-01")
+    new_token = security.create_access_token({"sub": "2"})
+    assert jwt.get_unverified_header(new_token)["kid"] == "2025-01"
+    assert security.decode_access_token(old_token)["sub"] == "1"
+    assert security.decode_access_token(new_token)["sub"] == "2"
+
+    # 예전 키 제거 후에는 예전 토큰 거부
+    _use_keys(monkeypatch, "2025-01:new-secret", "2025-01")
+    assert security.decode_access_token(new_token)["sub"] == "2"
+    with pytest.raises(JWTError):
+        security.decode_access_token(old_token)
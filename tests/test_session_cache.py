@@ -0,0 +1,79 @@
+# tests/test_session_cache.py
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.models import User
+from app.utils import session_cache as session_cache_module
+from app.utils.session_cache import SessionCache
+
+T0 = datetime(2024, 5, 1, 9, 0)
+T1 = datetime(2024, 5, 1, 9, 10)
+T2 = datetime(2024, 5, 1, 9, 20)
+
+
+def test_get_returns_cached_last_work_until_ttl(monkeypatch):
+    cache = SessionCache()
+    assert cache.get(1, "token") is None
+    assert cache.load(1, "token", T0) == T0
+    assert cache.get(1, "token") == T0
+    assert cache.get(1, "other-token") is None      # 다른 토큰(새 로그인)은 캐시로 통과시키지 않음
+
+    monkeypatch.setattr(session_cache_module, "TOKEN_CACHE_TTL", 0)
+    cache.load(2, "token", T0)
+    assert cache.get(2, "token") is None            # TTL이 지나면 DB에서 다시 확인
+
+
+def test_invalidate_drops_entry_and_pending_last_work():
+    cache = SessionCache()
+    cache.load(1, "token", T0)
+    cache.touch(1, T1)
+    assert cache.get(1, "token") == T1
+    cache.invalidate(1)
+    assert cache.get(1, "token") is None
+    assert cache.flush() == 0
+
+
+def test_load_keeps_newer_unflushed_last_work():
+    cache = SessionCache()
+    cache.touch(1, T1)
+    assert cache.load(1, "token", T0) == T1     # DB 값이 아직 반영 안 된 값보다 오래됨
+
+
+def _seed(db, engine, monkeypatch):
+    monkeypatch.setattr(session_cache_module, "SessionLocal", sessionmaker(bind=engine, autoflush=False))
+    db.add(User(user_id=1, user_login_id="u", email="u@example.com", user_password="x", last_work=T1))
+    db.add(User(user_id=2, user_login_id="v", email="v@example.com", user_password="x"))
+    db.commit()
+
+
+def test_flush_writes_last_work_without_moving_it_back(db, engine, monkeypatch):
+    _seed(db, engine, monkeypatch)
+    cache = SessionCache()
+    cache.touch(1, T0)      # DB 값(T1)보다 오래됨 → 그대로
+    cache.touch(2, T2)
+    assert cache.flush() == 2
+    assert cache.flush() == 0
+
+    db.expire_all()
+    assert db.get(User, 1).last_work == T1
+    assert db.get(User, 2).last_work == T2
+
+
+def test_failed_flush_keeps_pending_values(db, engine, monkeypatch):
+    _seed(db, engine, monkeypatch)
+    cache = SessionCache()
+    cache.touch(2, T1)
+
+    # USERS 테이블이 없는 DB → UPDATE 실패
+    monkeypatch.setattr(session_cache_module, "SessionLocal", sessionmaker(bind=create_engine("sqlite://")))
+    with pytest.raises(OperationalError):
+        cache.flush()
+
+    monkeypatch.setattr(session_cache_module, "SessionLocal", sessionmaker(bind=engine, autoflush=False))
+    assert cache.flush() == 1
+    db.expire_all()
+    assert db.get(User, 2).last_work == T1
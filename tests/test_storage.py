@@ -0,0 +1,41 @@
+# tests/test_storage.py
+import os
+import time
+from datetime import datetime
+
+from app.models import Blob
+from app.utils import storage
+
+
+def _write(path: str, data: bytes = b"x", age: float = 0):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    if age:
+        old = time.time() - age
+        os.utime(path, (old, old))
+
+
+def test_sweep_removes_only_old_files_without_blob_row(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "BLOB_DIR", str(tmp_path / "blobs"))
+    monkeypatch.setattr(storage, "TMP_DIR", str(tmp_path / "tmp"))
+
+    kept_hash, orphan_hash, fresh_hash = "aa" + "1" * 62, "bb" + "2" * 62, "cc" + "3" * 62
+    kept = storage.blob_path_for(kept_hash)
+    orphan = storage.blob_path_for(orphan_hash)
+    fresh = storage.blob_path_for(fresh_hash)
+    _write(kept, age=7200)
+    _write(orphan, age=7200)        # rollback된 업로드가 남긴 파일
+    _write(fresh)                   # 아직 commit 전일 수 있는 파일
+    _write(str(tmp_path / "tmp" / "old"), age=7200)
+    _write(str(tmp_path / "tmp" / "new"))
+
+    db.add(Blob(blob_hash=kept_hash, blob_path=kept, blob_size=1, ref_cnt=1, created_at=datetime.now()))
+    db.commit()
+
+    assert storage.sweep_orphan_blobs(db, grace=3600) == 2
+    assert os.path.exists(kept)
+    assert not os.path.exists(orphan)
+    assert os.path.exists(fresh)
+    assert not os.path.exists(tmp_path / "tmp" / "old")
+    assert os.path.exists(tmp_path / "tmp" / "new")
@@ -0,0 +1,49 @@
+# tests/test_zipstream.py
+import os
+import shutil
+import subprocess
+import zipfile
+
+import pytest
+
+from app.utils.zipstream import iter_zip
+
+
+def _entries(tmp_path):
+    (tmp_path / "a.txt").write_bytes("가나다".encode("utf-8") * 1000)
+    (tmp_path / "b.png").write_bytes(os.urandom(3000))
+    (tmp_path / "empty.txt").write_bytes(b"")
+    return [
+        (str(tmp_path / "a.txt"), "폴더/한글 문서.txt"),
+        (str(tmp_path / "b.png"), "image.png"),
+        (str(tmp_path / "empty.txt"), "빈 파일.txt"),
+    ]
+
+
+def test_headers_match_zipfile(tmp_path):
+    entries = _entries(tmp_path)
+    archive = tmp_path / "out.zip"
+    archive.write_bytes(b"".join(iter_zip(entries, block_size=1024)))
+
+    reference = tmp_path / "ref.zip"
+    with zipfile.ZipFile(reference, "w", zipfile.ZIP_DEFLATED) as z:
+        for path, arcname in entries:
+            z.write(path, arcname)
+
+    with zipfile.ZipFile(archive) as ours, zipfile.ZipFile(reference) as ref:
+        assert ours.testzip() is None
+        for mine, theirs in zip(ours.infolist(), ref.infolist()):
+            assert mine.filename == theirs.filename
+            assert (mine.create_system, mine.create_version, mine.extract_version) == \
+                   (theirs.create_system, theirs.create_version, theirs.extract_version)
+            assert mine.flag_bits & 0x800 == theirs.flag_bits & 0x800
+            assert ours.read(mine) == ref.read(theirs)
+
+
+@pytest.mark.skipif(shutil.which("unzip") is None, reason="unzip 없음")
+def test_unzip_accepts_utf8_names_in_c_locale(tmp_path):
+    archive = tmp_path / "out.zip"
+    archive.write_bytes(b"".join(iter_zip(_entries(tmp_path))))
+    result = subprocess.run(["unzip", "-t", str(archive)], env={"LC_ALL": "C"}, capture_output=True)
+    assert result.returncode == 0, result.stdout
+    assert b"mismatching" not in result.stdout